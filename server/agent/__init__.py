@@ -7,18 +7,43 @@ from .state import AgentState
 from .nodes import (
     agent_node, 
     agent_node_with_streaming, 
+    aagent_node_with_streaming,
+    tool_calling_agent_node,
+    atool_calling_agent_node,
     tool_node, 
+    atool_node,
+    manage_history_node,
+    amanage_history_node,
+    record_turn_node,
+    arecord_turn_node,
+    check_cache_node,
+    acheck_cache_node,
+    cache_response_node,
+    recall_memories_node,
+    arecall_memories_node,
     decide_next_step,
-    parse_action_from_response
+    parse_action_from_response,
+    parse_actions_from_response
 )
 from .runnable import (
     get_agent_runnable,
     get_chat_history,
     get_current_input,
     get_agent_scratchpad,
+    format_agent_scratchpad,
+    get_turn_start,
     get_agent_prompt,
-    get_llm_with_tools
+    get_llm_with_tools,
+    get_llm,
+    get_tool_prompt_variables,
+    get_prompt_variables,
+    get_tool_calling_prompt_variables
 )
+from .history import HistoryManager, TokenCounter, get_history_manager
+from .semantic_cache import SemanticResponseCache, get_semantic_cache
+from .completion_cache import CompletionCache, completion_key, get_completion_cache
+from .memory_recall import render_memory_context, recall_memories, arecall_memories
+from .memory_extraction import MemoryExtractor, get_memory_extractor
 
 from .agent import Agent
 from .workflow import create_agent_workflow, get_workflow_visualization
@@ -30,17 +55,60 @@ __all__ = [
     # Nodes
     "agent_node",
     "agent_node_with_streaming", 
+    "aagent_node_with_streaming",
+    "tool_calling_agent_node",
+    "atool_calling_agent_node",
     "tool_node",
+    "atool_node",
+    "manage_history_node",
+    "amanage_history_node",
+    "record_turn_node",
+    "arecord_turn_node",
+    "check_cache_node",
+    "acheck_cache_node",
+    "cache_response_node",
+    "recall_memories_node",
+    "arecall_memories_node",
     "decide_next_step",
     "parse_action_from_response",
+    "parse_actions_from_response",
     
     # Runnable components
     "get_agent_runnable",
     "get_chat_history",
     "get_current_input", 
     "get_agent_scratchpad",
+    "format_agent_scratchpad",
+    "get_turn_start",
     "get_agent_prompt",
     "get_llm_with_tools",
+    "get_llm",
+    "get_tool_prompt_variables",
+    "get_prompt_variables",
+    "get_tool_calling_prompt_variables",
+
+    # History
+    "HistoryManager",
+    "TokenCounter",
+    "get_history_manager",
+
+    # Semantic cache
+    "SemanticResponseCache",
+    "get_semantic_cache",
+
+    # Completion cache
+    "CompletionCache",
+    "completion_key",
+    "get_completion_cache",
+
+    # Memory recall
+    "render_memory_context",
+    "recall_memories",
+    "arecall_memories",
+
+    # Memory extraction
+    "MemoryExtractor",
+    "get_memory_extractor",
 
     # Agent
     "Agent",
@@ -1,20 +1,50 @@
 from utils.logger import logger
+from core import constants
 from tools import register_default_tools
-from .workflow import create_agent_workflow
+from .workflow import create_agent_workflow, create_async_checkpointer
 from .state import AgentState
+from .memory_extraction import get_memory_extractor
 from psycopg import Connection as PGConnection
 from fastapi.responses import StreamingResponse
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, ToolMessage
-from langchain_core.messages import AIMessageChunk
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 
+# Checkpoint durability setting -> LangGraph durability mode
+DURABILITY_MODES = {
+    # Persist each super-step in the background while the next one runs
+    "per_step": "async",
+    # Persist once when the graph exits, successfully or with an error
+    "end_of_turn": "exit",
+}
+
 
 class Agent:
-    def __init__(self):
-        """Initialize the agent with configuration and workflow."""
+    def __init__(
+        self,
+        execution_mode: str = constants.AGENT_EXECUTION_MODE,
+        agent_mode: str = constants.AGENT_MODE,
+        durability: str = constants.CHECKPOINT_DURABILITY,
+    ):
+        """
+        Initialize the agent with configuration and workflow.
+
+        Args:
+            execution_mode: "async" to drive the graph with app.astream on the
+                event loop, "sync" for the threadpool-backed app.stream path
+            agent_mode: "react" for the text ReAct loop, "tool_calling" for
+                native function calling
+            durability: "per_step" to checkpoint after every node, or
+                "end_of_turn" to write a single checkpoint per turn
+        """
         logger.info("Initializing Agent...")
-  
+        if execution_mode not in ("async", "sync"):
+            raise ValueError(f"Unknown agent execution mode: {execution_mode}")
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown checkpoint durability: {durability}")
+        self.execution_mode = execution_mode
+        self.agent_mode = agent_mode
+        self.durability = durability
         
         # # Initialize database
         # self.db_connection = db_conn
@@ -22,27 +52,47 @@ class Agent:
         # Setup and Load tools
         register_default_tools()
         
-        # Create the agent workflow
-        self.app = create_agent_workflow()
+        # Create the agent workflow. The async graph needs an async
+        # checkpointer, which can only be opened inside the running loop,
+        # so it is compiled in setup().
+        self.app = None if self.use_async else create_agent_workflow(
+            agent_mode=agent_mode,
+            semantic_cache=constants.SEMANTIC_CACHE_ENABLED,
+            memory_recall=constants.MEMORY_RECALL_ENABLED,
+        )
 
-    def invoke(self, user_input: str, thread_id: str, user_id: str):
+    @property
+    def use_async(self) -> bool:
+        return self.execution_mode == "async"
+
+    async def setup(self):
+        """Compile the async workflow; call once from the application lifespan."""
+        if self.use_async and self.app is None:
+            checkpointer = await create_async_checkpointer()
+            self.app = create_agent_workflow(
+                use_async=True,
+                checkpointer=checkpointer,
+                agent_mode=self.agent_mode,
+                semantic_cache=constants.SEMANTIC_CACHE_ENABLED,
+                memory_recall=constants.MEMORY_RECALL_ENABLED,
+            )
+
+    def invoke(self, user_input: str, thread_id: str, user_id: str, is_guest: bool = False):
         """
         Return a StreamingResponse so FastAPI can stream back to the client.
+
+        Guests (X-Guest-Id) have no user row, so nothing is remembered about
+        them: their turns skip memory recall and extraction.
         """
-        return StreamingResponse(
-            self._stream_interaction(user_input, thread_id, user_id),
-            media_type="text/plain"
+        stream = (
+            self._astream_interaction(user_input, thread_id, user_id, is_guest)
+            if self.use_async
+            else self._stream_interaction(user_input, thread_id, user_id, is_guest)
         )
+        return StreamingResponse(stream, media_type="text/plain")
 
-    def _stream_interaction(
-        self,
-        user_input: str,
-        thread_id: str,
-        user_id: str
-    ) -> Generator[str, None, None]:
-        """
-        Stream an interaction with the agent, yielding token-by-token chunks.
-        """
+    def _build_run(self, user_input: str, thread_id: str, user_id: str, is_guest: bool = False) -> dict:
+        """Build the graph input and run options shared by both stream paths."""
         logger.debug(f"\n--- User input: {user_input} ---")
 
         initial_message = HumanMessage(content=user_input, name="user")
@@ -51,33 +101,102 @@ class Agent:
             "next_action": "respond",
             "actions": []
         }
+        return {
+            "input": initial_state,
+            "context": {"user_id": user_id},
+            "config": {
+                "configurable": {"thread_id": thread_id},
+                "metadata": {"user_id": user_id, "is_guest": is_guest},
+            },
+            # Nodes push Final Answer tokens through the stream writer, so
+            # Thought/Action text never reaches the client
+            "stream_mode": "custom",
+            "durability": DURABILITY_MODES[self.durability],
+        }
 
+    def _stream_interaction(
+        self,
+        user_input: str,
+        thread_id: str,
+        user_id: str,
+        is_guest: bool = False,
+    ) -> Generator[str, None, None]:
+        """
+        Stream an interaction with the agent, yielding token-by-token chunks.
+        """
         try:
-            stream_gen = self.app.stream(
-                input=initial_state,
-                context={"user_id": user_id},
-                config={
-                    "configurable": {"thread_id": thread_id},
-                    "metadata": {"user_id": user_id},
-                },
-                stream_mode="messages",  # 🔥 this gives AIMessageChunk
-            )
+            run = self._build_run(user_input, thread_id, user_id, is_guest)
+            stream_gen = self.app.stream(**run)
 
-            for step in stream_gen:
-                logger.debug(f"[Step received]: {step}")
+            for chunk in stream_gen:
+                if chunk:  # only yield if there's new text
+                    yield chunk
+
+            yield "[END]\n"
+            if self._extracts_memories(is_guest):
+                self._extract_memories(run, user_id)
+
+        except Exception as e:
+            logger.debug(f"❌ Error during interaction: {repr(e)}")
+            yield f"[ERROR]: {str(e)}\n"
 
-                # step[0] is usually the chunk
-                chunk = step[0]
-                if isinstance(chunk, AIMessageChunk):
-                    if chunk.content:  # only yield if there's new text
-                        yield chunk.content
+    async def _astream_interaction(
+        self,
+        user_input: str,
+        thread_id: str,
+        user_id: str,
+        is_guest: bool = False,
+    ) -> AsyncGenerator[str, None]:
+        """
+        Async counterpart of _stream_interaction, driven by app.astream so
+        tokens are produced on the event loop instead of the threadpool.
+        """
+        try:
+            run = self._build_run(user_input, thread_id, user_id, is_guest)
+            stream_gen = self.app.astream(**run)
+
+            async for chunk in stream_gen:
+                if chunk:
+                    yield chunk
 
             yield "[END]\n"
+            if self._extracts_memories(is_guest):
+                await self._aextract_memories(run, user_id)
 
         except Exception as e:
             logger.debug(f"❌ Error during interaction: {repr(e)}")
             yield f"[ERROR]: {str(e)}\n"
 
+    def _extracts_memories(self, is_guest: bool) -> bool:
+        # A guest's memories could not be stored, so skip the LLM call
+        return constants.MEMORY_WRITE_MODE == "background" and not is_guest
+
+    def _extract_memories(self, run: dict, user_id: str) -> None:
+        """
+        Hand the turn that just finished to the background memory extractor.
+
+        The turn is read here, right after it ended, so the worker never
+        sees a later turn of the same thread.
+        """
+        try:
+            self._submit_turn(self.app.get_state(run["config"]).values, user_id)
+        except Exception as e:
+            logger.error(f"Could not queue memory extraction: {e}")
+
+    async def _aextract_memories(self, run: dict, user_id: str) -> None:
+        """Async variant of _extract_memories."""
+        try:
+            self._submit_turn((await self.app.aget_state(run["config"])).values, user_id)
+        except Exception as e:
+            logger.error(f"Could not queue memory extraction: {e}")
+
+    def _submit_turn(self, values: dict, user_id: str) -> None:
+        from .runnable import get_turn_start
+
+        if not values or values.get("cache_hit"):
+            return
+        get_memory_extractor().submit(user_id, values["messages"][get_turn_start(values):])
+
     def display_conversation_history(self, thread_id: str) -> bool:
         """
         Display existing conversation history for a thread.
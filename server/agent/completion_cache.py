@@ -0,0 +1,270 @@
+"""
+Exact-match LLM completion cache for Helion.
+Retries, refreshes and regenerations often send byte-identical prompts;
+their streamed completions are replayed from here instead of the LLM.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from psycopg.types.json import Jsonb
+
+from core import constants
+from utils.logger import logger
+
+
+# age is returned so a promoted entry expires from memory when its row would
+_SELECT_SQL = """
+    UPDATE llm_completion_cache
+    SET hit_count = hit_count + 1
+    WHERE key = %(key)s
+      AND created_at > now() - make_interval(secs => %(ttl)s)
+    RETURNING chunks, extract(epoch FROM now() - created_at) AS age
+"""
+
+# ttl_seconds = 0: entries never expire
+_SELECT_NO_TTL_SQL = """
+    UPDATE llm_completion_cache
+    SET hit_count = hit_count + 1
+    WHERE key = %(key)s
+    RETURNING chunks, extract(epoch FROM now() - created_at) AS age
+"""
+
+_INSERT_SQL = """
+    INSERT INTO llm_completion_cache (key, model_name, chunks)
+    VALUES (%(key)s, %(model_name)s, %(chunks)s)
+    ON CONFLICT (key) DO UPDATE
+    SET chunks = EXCLUDED.chunks, created_at = now(), hit_count = 0
+"""
+
+# Expired rows are never read again; each purge removes a bounded batch
+# (via ix_llm_completion_cache_created_at) so a store never waits on a
+# large delete
+_PURGE_SQL = """
+    DELETE FROM llm_completion_cache
+    WHERE key IN (
+        SELECT key
+        FROM llm_completion_cache
+        WHERE created_at < now() - make_interval(secs => %(ttl)s)
+        LIMIT %(limit)s
+    )
+"""
+
+PURGE_BATCH_SIZE = 1000
+
+
+def completion_key(prompt, model_name: str, temperature: float, tool_names: str = "") -> str:
+    """
+    Content address of a completion request.
+
+    Args:
+        prompt: PromptValue (or string) sent to the model
+        model_name: Model the prompt is sent to
+        temperature: Sampling temperature
+        tool_names: Names of the tools bound to the model
+
+    Returns:
+        str: Hex sha256 digest
+    """
+    if hasattr(prompt, "to_messages"):
+        serialized = [
+            {"type": message.type, "content": message.content}
+            for message in prompt.to_messages()
+        ]
+    else:
+        serialized = str(prompt)
+    payload = json.dumps(
+        {
+            "prompt": serialized,
+            "model": model_name,
+            "temperature": temperature,
+            "tools": tool_names,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CompletionCache:
+    """
+    Two-tier cache of streamed completions, stored as their content chunks.
+
+    Lookups try the in-process LRU first, then the llm_completion_cache
+    table; a Postgres hit is promoted into the LRU. Storing writes both
+    tiers and, at most once per purge interval, deletes expired rows.
+    Both tiers expire entries ttl_seconds after they were stored (never
+    when it is 0). Database errors are logged and treated as misses.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = constants.COMPLETION_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = constants.COMPLETION_CACHE_TTL_SECONDS,
+        purge_interval_seconds: int = constants.COMPLETION_CACHE_PURGE_INTERVAL_SECONDS,
+        use_db: bool = constants.COMPLETION_CACHE_PERSIST,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.purge_interval_seconds = purge_interval_seconds
+        self.use_db = use_db
+        self._last_purge: Optional[float] = None
+        self._lock = threading.Lock()
+        # key -> (chunks, time.monotonic() at which the completion was stored)
+        self._entries: "OrderedDict[str, Tuple[List[str], float]]" = OrderedDict()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    @property
+    def _select_sql(self) -> str:
+        return _SELECT_SQL if self.ttl_seconds > 0 else _SELECT_NO_TTL_SQL
+
+    def get(self, key: str) -> Optional[List[str]]:
+        """
+        Look up a completion.
+
+        Returns:
+            List[str]: Content chunks in streamed order, or None on a miss
+        """
+        chunks = self._get_memory(key)
+        if chunks is not None or not self.use_db:
+            return self._count(chunks, from_db=False)
+
+        from core.database import pooled_connection
+
+        row = None
+        try:
+            with pooled_connection() as conn:
+                row = conn.execute(self._select_sql, {"key": key, "ttl": self.ttl_seconds}).fetchone()
+        except Exception as e:
+            logger.error(f"Completion cache lookup failed: {e}")
+        return self._count(self._promote(key, row), from_db=True)
+
+    async def aget(self, key: str) -> Optional[List[str]]:
+        """Async counterpart of get, using the shared async pool."""
+        chunks = self._get_memory(key)
+        if chunks is not None or not self.use_db:
+            return self._count(chunks, from_db=False)
+
+        from core.database import get_async_pool
+
+        row = None
+        try:
+            async with get_async_pool().connection() as conn:
+                cursor = await conn.execute(self._select_sql, {"key": key, "ttl": self.ttl_seconds})
+                row = await cursor.fetchone()
+        except Exception as e:
+            logger.error(f"Completion cache lookup failed: {e}")
+        return self._count(self._promote(key, row), from_db=True)
+
+    def put(self, key: str, model_name: str, chunks: List[str]) -> None:
+        """
+        Store a completion's content chunks.
+
+        Args:
+            key: completion_key of the request
+            model_name: Model that produced the completion
+            chunks: Content chunks in streamed order
+        """
+        if not chunks:
+            return
+        self._put_memory(key, chunks)
+        if not self.use_db:
+            return
+
+        from core.database import pooled_connection
+
+        try:
+            with pooled_connection() as conn:
+                conn.execute(_INSERT_SQL, {"key": key, "model_name": model_name, "chunks": Jsonb(chunks)})
+                if self._purge_due():
+                    conn.execute(_PURGE_SQL, {"ttl": self.ttl_seconds, "limit": PURGE_BATCH_SIZE})
+        except Exception as e:
+            logger.error(f"Completion cache store failed: {e}")
+
+    async def aput(self, key: str, model_name: str, chunks: List[str]) -> None:
+        """Async counterpart of put."""
+        if not chunks:
+            return
+        self._put_memory(key, chunks)
+        if not self.use_db:
+            return
+
+        from core.database import get_async_pool
+
+        try:
+            async with get_async_pool().connection() as conn:
+                await conn.execute(_INSERT_SQL, {"key": key, "model_name": model_name, "chunks": Jsonb(chunks)})
+                if self._purge_due():
+                    await conn.execute(_PURGE_SQL, {"ttl": self.ttl_seconds, "limit": PURGE_BATCH_SIZE})
+        except Exception as e:
+            logger.error(f"Completion cache store failed: {e}")
+
+    @property
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.db_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.db_hits) / lookups if lookups else 0.0,
+        }
+
+    def _purge_due(self) -> bool:
+        """Claim the next purge of expired rows; True at most once per interval."""
+        if self.ttl_seconds <= 0:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if self._last_purge is not None and now - self._last_purge < self.purge_interval_seconds:
+                return False
+            self._last_purge = now
+            return True
+
+    def _get_memory(self, key: str) -> Optional[List[str]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            chunks, stored_at = entry
+            if self.ttl_seconds > 0 and time.monotonic() - stored_at >= self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return chunks
+
+    def _put_memory(self, key: str, chunks: List[str], age: float = 0.0) -> None:
+        with self._lock:
+            self._entries[key] = (list(chunks), time.monotonic() - age)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _promote(self, key: str, row) -> Optional[List[str]]:
+        if row is None:
+            return None
+        # Keep the row's age so both tiers expire the entry together
+        self._put_memory(key, row["chunks"], float(row["age"]))
+        return row["chunks"]
+
+    def _count(self, chunks: Optional[List[str]], from_db: bool) -> Optional[List[str]]:
+        with self._lock:
+            if chunks is None:
+                self.misses += 1
+            elif from_db:
+                self.db_hits += 1
+            else:
+                self.memory_hits += 1
+        return chunks
+
+
+@lru_cache(maxsize=1)
+def get_completion_cache() -> CompletionCache:
+    """Process-wide completion cache."""
+    return CompletionCache()
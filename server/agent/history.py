@@ -0,0 +1,224 @@
+"""
+Conversation history management for Helion.
+Keeps the prompt inside a token budget by sending recent turns verbatim,
+shortening old tool observations and folding older turns into a rolling
+summary that lives in the checkpointed AgentState.
+"""
+
+import os
+from functools import lru_cache
+from typing import List, Optional
+from langchain_core.messages import BaseMessage, HumanMessage, ToolMessage, get_buffer_string
+
+from core import constants
+from utils.logger import logger
+
+
+class TokenCounter:
+    """Counts and truncates text with a local HuggingFace `tokenizers` model."""
+
+    # Rough characters-per-token ratio used when no tokenizer can be loaded
+    _CHARS_PER_TOKEN = 4
+
+    def __init__(self, tokenizer: str = constants.HISTORY_TOKENIZER):
+        """
+        Args:
+            tokenizer: Path to a tokenizer.json file or a pretrained tokenizer name
+        """
+        self._tokenizer = self._load(tokenizer)
+
+    @property
+    def exact(self) -> bool:
+        """False when counts are estimated because no tokenizer could be loaded."""
+        return self._tokenizer is not None
+
+    @classmethod
+    def _load(cls, tokenizer: str):
+        try:
+            from tokenizers import Tokenizer
+
+            if os.path.isfile(tokenizer):
+                return Tokenizer.from_file(tokenizer)
+            # Downloads from the Hugging Face Hub unless already cached
+            return Tokenizer.from_pretrained(tokenizer)
+        except Exception as e:
+            logger.error(
+                f"History tokenizer '{tokenizer}' could not be loaded ({e}); token counts are "
+                f"estimated at {cls._CHARS_PER_TOKEN} characters per token, so history budgets "
+                f"are approximate. Point HISTORY_TOKENIZER at a local tokenizer.json to fix this."
+            )
+            return None
+
+    def count(self, text: str) -> int:
+        """Number of tokens in text."""
+        if not text:
+            return 0
+        if self._tokenizer is None:
+            return max(1, len(text) // self._CHARS_PER_TOKEN)
+        return len(self._tokenizer.encode(text, add_special_tokens=False).ids)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut text down to at most max_tokens tokens."""
+        if self._tokenizer is None:
+            limit = max_tokens * self._CHARS_PER_TOKEN
+            return text if len(text) <= limit else text[:limit] + " ...[truncated]"
+
+        encoding = self._tokenizer.encode(text, add_special_tokens=False)
+        if len(encoding.ids) <= max_tokens:
+            return text
+        end = encoding.offsets[max_tokens - 1][1]
+        return text[:end] + " ...[truncated]"
+
+
+def _content_text(message: BaseMessage) -> str:
+    content = message.content
+    return content if isinstance(content, str) else str(content)
+
+
+def find_turn_start(messages: List[BaseMessage]) -> int:
+    """
+    Index of the HumanMessage that opened the current turn.
+
+    Scans backwards, so the cost is the length of the current turn only.
+    """
+    for index in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[index], HumanMessage):
+            return index
+    return len(messages)
+
+
+class HistoryManager:
+    """
+    Selects the chat history sent with each prompt.
+
+    Only messages after `summarized_upto` are sent verbatim. Tool
+    observations outside the most recent `keep_turns` turns are truncated.
+    When the window still exceeds the token budget, whole turns from the
+    front are handed to the summarizer and `summarized_upto` advances past
+    them, so the summary is extended incrementally and never rebuilt.
+    """
+
+    # Per-message framing overhead ("Human: ", separators, ...)
+    _MESSAGE_OVERHEAD = 4
+
+    def __init__(
+        self,
+        token_budget: int = constants.HISTORY_TOKEN_BUDGET,
+        keep_turns: int = constants.HISTORY_KEEP_TURNS,
+        observation_tokens: int = constants.HISTORY_OBSERVATION_TOKENS,
+        counter: Optional[TokenCounter] = None,
+    ):
+        self.token_budget = token_budget
+        self.keep_turns = keep_turns
+        self.observation_tokens = observation_tokens
+        self.counter = counter or TokenCounter()
+
+    def message_tokens(self, message: BaseMessage) -> int:
+        return self.counter.count(_content_text(message)) + self._MESSAGE_OVERHEAD
+
+    def window(
+        self,
+        messages: List[BaseMessage],
+        turn_start: int,
+        summarized_upto: int = 0,
+    ) -> List[BaseMessage]:
+        """
+        Messages to send as chat history for the turn starting at turn_start.
+
+        Args:
+            messages: Full message list from the state
+            turn_start: Index of the current turn's HumanMessage
+            summarized_upto: Messages before this index are in the summary
+
+        Returns:
+            List of history messages with old tool observations shortened
+        """
+        history = messages[summarized_upto:turn_start]
+        recent_from = self._recent_turns_start(history)
+        return [
+            self.compact(message) if index < recent_from else message
+            for index, message in enumerate(history)
+        ]
+
+    def plan_fold(
+        self,
+        messages: List[BaseMessage],
+        turn_start: int,
+        summarized_upto: int = 0,
+    ) -> Optional[int]:
+        """
+        Decide how far the summary has to advance to fit the token budget.
+
+        Returns:
+            New summarized_upto index, or None when the window already fits
+        """
+        window = self.window(messages, turn_start, summarized_upto)
+        tokens = [self.message_tokens(message) for message in window]
+        total = sum(tokens)
+        if total <= self.token_budget:
+            return None
+
+        # Only fold at turn boundaries, and never into the turns kept verbatim
+        recent_from = self._recent_turns_start(window)
+        boundaries = [
+            index for index, message in enumerate(window)
+            if isinstance(message, HumanMessage) and 0 < index <= recent_from
+        ]
+        if not boundaries:
+            return None
+
+        removed, previous = 0, 0
+        for boundary in boundaries:
+            removed += sum(tokens[previous:boundary])
+            previous = boundary
+            if total - removed <= self.token_budget:
+                break
+        return summarized_upto + previous
+
+    def render(self, messages: List[BaseMessage]) -> str:
+        """Render messages as plain "Human:/AI:" lines for prompts."""
+        return get_buffer_string(messages)
+
+    def _recent_turns_start(self, history: List[BaseMessage]) -> int:
+        if self.keep_turns <= 0:
+            return len(history)
+        starts = [
+            index for index, message in enumerate(history)
+            if isinstance(message, HumanMessage)
+        ]
+        if len(starts) < self.keep_turns:
+            return 0
+        return starts[-self.keep_turns]
+
+    def compact(self, message: BaseMessage) -> BaseMessage:
+        """Truncate a ToolMessage's content to observation_tokens."""
+        if not isinstance(message, ToolMessage):
+            return message
+        content = _content_text(message)
+        truncated = self.counter.truncate(content, self.observation_tokens)
+        if truncated is content:
+            return message
+        return message.model_copy(update={"content": truncated})
+
+
+@lru_cache(maxsize=1)
+def get_history_manager() -> HistoryManager:
+    """Process-wide HistoryManager; loaded at startup so tokenizer problems show up there."""
+    return HistoryManager()
+
+
+def render_chat_history(summary: Optional[str], history: List[BaseMessage]) -> str:
+    """
+    Render the rolling summary and the verbatim window for the ReAct prompt.
+
+    Args:
+        summary: Rolling summary of the turns folded out of the window
+        history: Messages returned by HistoryManager.window
+
+    Returns:
+        str: Chat history text
+    """
+    rendered = get_history_manager().render(history)
+    if summary:
+        return f"Summary of the earlier conversation: {summary}\n{rendered}".rstrip()
+    return rendered
@@ -0,0 +1,163 @@
+"""
+Background memory extraction for Helion.
+After a turn has been streamed, durable facts about the user are pulled out
+of it with one LLM call, embedded in one batch and merged into the user's
+memories on a small worker pool, so memory writes never hold up a reply.
+"""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Optional
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
+
+from core import constants
+from core.embeddings import embed_texts, RETRIEVAL_DOCUMENT
+from core.vector_store import get_vector_store
+from utils.logger import logger
+from .transcript import message_text
+
+
+IMPORTANCE_LEVELS = ("low", "medium", "high")
+
+
+def parse_extracted_facts(text: str) -> List[dict]:
+    """
+    Read the JSON array of facts from the extraction reply.
+
+    Tolerates code fences and text around the array; invalid entries are
+    skipped and duplicate contents kept once.
+
+    Returns:
+        List of {"content", "importance"} dicts
+    """
+    start, end = text.find("["), text.rfind("]")
+    if start == -1 or end <= start:
+        return []
+    try:
+        items = json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return []
+
+    facts, seen = [], set()
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        content = str(item.get("content") or "").strip()
+        if not content or content.lower() in seen:
+            continue
+        importance = item.get("importance")
+        seen.add(content.lower())
+        facts.append({
+            "content": content,
+            "importance": importance if importance in IMPORTANCE_LEVELS else "medium",
+        })
+    return facts
+
+
+def render_turn(turn: List[BaseMessage]) -> str:
+    """The user's input and the final answer of a turn, as plain lines."""
+    lines = [f"User: {message_text(message)}" for message in turn if isinstance(message, HumanMessage)]
+    if turn and isinstance(turn[-1], AIMessage) and message_text(turn[-1]):
+        lines.append(f"Assistant: {message_text(turn[-1])}")
+    return "\n".join(lines)
+
+
+class MemoryExtractor:
+    """
+    Bounded background pool that turns finished turns into memories.
+
+    At most max_pending turns are queued or running; further submissions
+    are dropped and logged instead of growing the backlog.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = constants.MEMORY_EXTRACTION_WORKERS,
+        max_pending: int = constants.MEMORY_EXTRACTION_MAX_PENDING,
+    ):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="memory-extract")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._stats_lock = threading.Lock()
+        self._stats = {"submitted": 0, "dropped": 0, "failed": 0, "inserted": 0, "merged": 0, "limit_reached": 0}
+
+    def submit(self, user_id: Optional[str], turn: List[BaseMessage]) -> bool:
+        """
+        Queue extraction of a finished turn.
+
+        The turn's messages are taken as they are now, so a later turn on
+        the same thread cannot change what gets extracted.
+
+        Args:
+            user_id: Owner of the memories
+            turn: The turn's messages, starting with its HumanMessage
+
+        Returns:
+            bool: False if nothing was queued
+        """
+        if not user_id or not turn:
+            return False
+        if not self._slots.acquire(blocking=False):
+            self._count("dropped")
+            logger.info(f"Memory extraction backlog full, skipping a turn of user {user_id}")
+            return False
+
+        self._count("submitted")
+        future = self._executor.submit(self._run, user_id, list(turn))
+        future.add_done_callback(lambda _: self._slots.release())
+        return True
+
+    def extract(self, turn: List[BaseMessage]) -> List[dict]:
+        """Ask the LLM for the durable facts in a turn."""
+        from prompts import get_memory_extraction_prompt
+        from .runnable import get_llm
+
+        text = render_turn(turn)
+        if not text:
+            return []
+        prompt = get_memory_extraction_prompt().invoke({"turn": text})
+        return parse_extracted_facts(message_text(get_llm().invoke(prompt)))
+
+    def process_turn(self, user_id: str, turn: List[BaseMessage]) -> List[str]:
+        """
+        Extract, embed and store the facts of one turn.
+
+        Returns:
+            List of store outcomes, one per fact
+        """
+        facts = self.extract(turn)
+        if not facts:
+            return []
+
+        vectors = embed_texts([fact["content"] for fact in facts], task_type=RETRIEVAL_DOCUMENT)
+        store = get_vector_store()
+        outcomes = []
+        for fact, vector in zip(facts, vectors):
+            outcome, _ = store.store(user_id, fact["content"], vector, fact["importance"])
+            self._count(outcome)
+            outcomes.append(outcome)
+        logger.debug(f"Extracted memories for user {user_id}: {outcomes}")
+        return outcomes
+
+    @property
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _run(self, user_id: str, turn: List[BaseMessage]) -> None:
+        try:
+            self.process_turn(user_id, turn)
+        except Exception as e:
+            self._count("failed")
+            logger.error(f"Memory extraction failed for user {user_id}: {e}")
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self._stats[key] = self._stats.get(key, 0) + 1
+
+
+@lru_cache(maxsize=1)
+def get_memory_extractor() -> MemoryExtractor:
+    """Process-wide memory extraction pool."""
+    return MemoryExtractor()
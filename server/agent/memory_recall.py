@@ -0,0 +1,89 @@
+"""
+Automatic memory recall for Helion.
+Fetches the user's memories most relevant to the current input before the
+agent runs and renders them as a compact prompt block, so personal
+questions are answered without a retrieve_memory round trip.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from core import constants
+from core.embeddings import embed_text, aembed_text, RETRIEVAL_QUERY
+from core.vector_store import get_vector_store
+from .history import TokenCounter, get_history_manager
+
+
+MEMORY_CONTEXT_HEADER = (
+    "What you remember about the user (use retrieve_memory only for anything not covered here):"
+)
+
+
+def render_memory_context(
+    memories: List[Dict[str, Any]],
+    token_budget: int = constants.MEMORY_RECALL_TOKEN_BUDGET,
+    counter: Optional[TokenCounter] = None,
+) -> str:
+    """
+    Render recalled memories as a bulleted block within a token budget.
+
+    Memories are taken most similar first until the next one would exceed
+    the budget.
+
+    Args:
+        memories: Search results, most similar first
+        token_budget: Maximum tokens of the rendered lines
+        counter: Token counter; the history manager's by default
+
+    Returns:
+        str: The block, or "" when no memory fits
+    """
+    counter = counter or get_history_manager().counter
+    lines, used = [], 0
+    for memory in memories:
+        line = f"- {memory['content']}"
+        tokens = counter.count(line)
+        if used + tokens > token_budget:
+            break
+        lines.append(line)
+        used += tokens
+    if not lines:
+        return ""
+    return "\n".join([MEMORY_CONTEXT_HEADER, *lines])
+
+
+def recall_memories(user_id: Optional[str], text: str) -> str:
+    """
+    Memory context for a user's input.
+
+    Args:
+        user_id: Owner of the memories; nothing is recalled without one
+        text: The current user input
+
+    Returns:
+        str: Rendered memory block, or "" when nothing relevant is stored
+    """
+    if not user_id or not text.strip():
+        return ""
+    memories = get_vector_store().search(
+        user_id,
+        embed_text(text, task_type=RETRIEVAL_QUERY),
+        top_k=constants.MEMORY_RECALL_TOP_K,
+        similarity_threshold=constants.MEMORY_RECALL_THRESHOLD,
+    )
+    return render_memory_context(memories)
+
+
+async def arecall_memories(user_id: Optional[str], text: str) -> str:
+    """Async counterpart of recall_memories; the search runs in a worker thread."""
+    if not user_id or not text.strip():
+        return ""
+    embedding = await aembed_text(text, task_type=RETRIEVAL_QUERY)
+    memories = await asyncio.to_thread(
+        get_vector_store().search,
+        user_id,
+        embedding,
+        top_k=constants.MEMORY_RECALL_TOP_K,
+        similarity_threshold=constants.MEMORY_RECALL_THRESHOLD,
+    )
+    return render_memory_context(memories)
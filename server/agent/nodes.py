@@ -3,16 +3,32 @@ Node implementations for the Helion workflow.
 Contains all the graph nodes including agent_node, tool_node, and their variants.
 """
 
-import re
-from typing import Literal
+import asyncio
+from typing import List, Literal
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from langgraph.config import get_stream_writer
 
 from .state import AgentState
+from core import constants
 from .runnable import get_agent_runnable
+from .history import find_turn_start, get_history_manager
+from .transcript import record_turn, arecord_turn, message_text
+from .semantic_cache import get_semantic_cache, replay_chunks, SCOPE_GUEST, SCOPE_USER
+from .completion_cache import completion_key, get_completion_cache
+from .memory_recall import recall_memories, arecall_memories
+from core.embeddings import embed_text, aembed_text
 from utils.logger import logger
-from utils.streaming import stream_response
-from utils.response_extractor import extract_final_answer
-from tools import get_all_tools, execute_tool
+from utils.streaming import (
+    stream_response,
+    astream_response,
+    stream_tool_calling_response,
+    astream_tool_calling_response,
+    replay_response,
+)
+from utils.react_parser import ReActStreamParser
+from tools import execute_tool, aexecute_tool
 
 
 
@@ -26,15 +42,146 @@ def parse_action_from_response(content: str) -> dict:
     Returns:
         dict: Action information if found, None otherwise
     """
-    action_match = re.search(r"Action:\s*(.+)", content)
-    input_match = re.search(r"Action Input:\s*(.+)", content)
+    return ReActStreamParser.parse(content).action_info
+
+
+def parse_actions_from_response(content: str) -> List[dict]:
+    """
+    Parses every Action / Action Input pair from an AIMessage content string.
     
-    if action_match and input_match:
-        return {
-            "action": action_match.group(1).strip(),
-            "action_input": input_match.group(1).strip()
-        }
-    return None
+    Args:
+        content: The content string from an AI message
+        
+    Returns:
+        List[dict]: Action information in the order the model wrote it
+    """
+    return ReActStreamParser.parse(content).actions
+
+
+def _current_turn_start(messages: List[BaseMessage]) -> int:
+    """Index of the HumanMessage that was just appended for this turn."""
+    # The new user message is always last when the turn starts
+    if messages and isinstance(messages[-1], HumanMessage):
+        return len(messages) - 1
+    return find_turn_start(messages)
+
+
+def _plan_history_fold(state: AgentState, turn_start: int):
+    """Return (messages, start, end) of the turns to fold, or None."""
+    messages = state["messages"]
+    summarized_upto = state.get("summarized_upto", 0)
+    manager = get_history_manager()
+    fold_to = manager.plan_fold(messages, turn_start, summarized_upto)
+    if fold_to is None:
+        return None
+    folded = [manager.compact(message) for message in messages[summarized_upto:fold_to]]
+    return folded, summarized_upto, fold_to
+
+
+def _history_summary_input(state: AgentState, folded: List[BaseMessage]) -> dict:
+    return {
+        "summary": state.get("summary") or "(none)",
+        "new_lines": get_history_manager().render(folded),
+    }
+
+
+def manage_history_node(state: AgentState) -> AgentState:
+    """
+    Keep the chat history inside the token budget before the agent runs.
+
+    Also records turn_start, so later steps of the turn can locate the
+    current input and scratchpad without scanning the message list.
+
+    When the verbatim window is too large, the oldest turns are summarized
+    into the rolling summary and summarized_upto advances past them. The
+    summary is checkpointed with the thread, so each turn is summarized once.
+    
+    Args:
+        state: Current agent state
+        
+    Returns:
+        turn_start, plus the updated summary fields when turns were folded
+    """
+    from .runnable import get_llm
+    from prompts import get_history_summary_prompt
+
+    turn_start = _current_turn_start(state["messages"])
+    plan = _plan_history_fold(state, turn_start)
+    if plan is None:
+        return {"turn_start": turn_start}
+    folded, start, end = plan
+
+    try:
+        prompt = get_history_summary_prompt().invoke(_history_summary_input(state, folded))
+        summary = get_llm().invoke(prompt).content
+    except Exception as e:
+        # Fall back to the unsummarized window; the fold is retried next turn
+        logger.error(f"Failed to summarize chat history: {e}")
+        return {"turn_start": turn_start}
+
+    logger.debug(f"Folded messages {start}-{end} into the history summary")
+    return {"summary": summary, "summarized_upto": end, "turn_start": turn_start}
+
+
+async def amanage_history_node(state: AgentState) -> AgentState:
+    """Async variant of manage_history_node."""
+    from .runnable import get_llm
+    from prompts import get_history_summary_prompt
+
+    turn_start = _current_turn_start(state["messages"])
+    plan = _plan_history_fold(state, turn_start)
+    if plan is None:
+        return {"turn_start": turn_start}
+    folded, start, end = plan
+
+    try:
+        prompt = await get_history_summary_prompt().ainvoke(_history_summary_input(state, folded))
+        summary = (await get_llm().ainvoke(prompt)).content
+    except Exception as e:
+        logger.error(f"Failed to summarize chat history: {e}")
+        return {"turn_start": turn_start}
+
+    logger.debug(f"Folded messages {start}-{end} into the history summary")
+    return {"summary": summary, "summarized_upto": end, "turn_start": turn_start}
+
+
+def _turn_input(state: AgentState) -> str:
+    messages = state["messages"]
+    turn_start = _current_turn_start(messages)
+    return message_text(messages[turn_start]) if turn_start < len(messages) else ""
+
+
+def recall_memories_node(state: AgentState, config: RunnableConfig) -> AgentState:
+    """
+    Recall the user's memories relevant to the current input.
+
+    Runs alongside manage_history, so the embedding call and the search
+    overlap with history management instead of costing a tool iteration.
+    With the semantic cache enabled it runs first instead, so the cache
+    lookup can tell whether the turn has memories to answer from.
+    
+    Args:
+        state: Current agent state
+        config: Run configuration carrying the user_id and is_guest
+        
+    Returns:
+        memory_context for the prompt ("" when nothing relevant is stored)
+    """
+    try:
+        return {"memory_context": recall_memories(_memory_user_id(config), _turn_input(state))}
+    except Exception as e:
+        # The agent can still fall back to the retrieve_memory tool
+        logger.error(f"Memory recall failed: {e}")
+        return {"memory_context": ""}
+
+
+async def arecall_memories_node(state: AgentState, config: RunnableConfig) -> AgentState:
+    """Async variant of recall_memories_node."""
+    try:
+        return {"memory_context": await arecall_memories(_memory_user_id(config), _turn_input(state))}
+    except Exception as e:
+        logger.error(f"Memory recall failed: {e}")
+        return {"memory_context": ""}
 
 
 def agent_node(state: AgentState) -> AgentState:
@@ -50,73 +197,293 @@ def agent_node(state: AgentState) -> AgentState:
     agent_runnable = get_agent_runnable()
     response = agent_runnable.invoke(state)
     
-    # Try to parse action info from response content
-    action_info = parse_action_from_response(response.content)
+    # Single pass over the response classifies action and final answer
+    parsed = ReActStreamParser.parse(response.content)
+    actions = parsed.actions
     
-    if action_info:
+    if actions:
         logger.debug("\n--- AGENT DECIDED TO CALL A TOOL ---")
         return {
             "messages": [response],
             "next_action": "call_tool",
-            "actions": [action_info]
+            "actions": actions
         }
     else:
         logger.debug("\n--- AGENT DECIDED TO RESPOND DIRECTLY ---")
-       # Extract clean final answer for display
-        clean_answer = extract_final_answer(response.content)
         # Create a new AIMessage with just the clean answer
-        clean_response = AIMessage(content=clean_answer, name="agent")
+        clean_response = AIMessage(content=parsed.final_answer, name="agent")
+        # Non-streaming node: hand the whole answer to the client at once
+        get_stream_writer()(parsed.final_answer)
         return {
             "messages": [clean_response],
             "next_action": "respond"
         }
 
 
+def _build_prompt_state(state: AgentState) -> dict:
+    """Assemble the ReAct prompt variables from the current graph state."""
+    from .runnable import get_prompt_variables
+
+    return get_prompt_variables(state)
+
+
+def _route_streamed_message(ai_message: AIMessage, parser: ReActStreamParser) -> AgentState:
+    """Turn a streamed AI message into the next state update."""
+    # 🚨 Tool calls were already detected while streaming (only 1 pass!)
+    actions = parser.actions
+
+    if actions:
+        logger.debug("--- AGENT DECIDED TO CALL A TOOL ---")
+        return {
+            "messages": [ai_message],
+            "next_action": "call_tool",
+            "actions": actions
+        }
+
+    # Otherwise, final answer
+    return {
+        "messages": [ai_message],
+        "next_action": "respond"
+    }
+
+
+def _completion_cache_key(formatted_prompt) -> str:
+    from .runnable import LLM_TEMPERATURE, get_tool_prompt_variables
+
+    return completion_key(
+        formatted_prompt,
+        constants.MODEL_NAME,
+        LLM_TEMPERATURE,
+        get_tool_prompt_variables()["tool_names"],
+    )
+
+
 def agent_node_with_streaming(state: AgentState) -> AgentState:
     from .runnable import get_llm_with_tools, get_agent_prompt
-    from .runnable import get_chat_history, get_current_input, get_agent_scratchpad
 
-    tools = get_all_tools()
     llm_with_tools = get_llm_with_tools()
     agent_prompt = get_agent_prompt()
 
-    # Build enhanced state
-    enhanced_state = {
-        "messages": state["messages"],
-        "tools": tools,
-        "tool_names": [t.name for t in tools],
-        "input": get_current_input(state["messages"]),
-        "chat_history": get_chat_history(state["messages"]),
-        "agent_scratchpad": get_agent_scratchpad(state["messages"]),
-    }
-
     # Format final prompt sent to LLM (ReAct)
-    formatted_prompt = agent_prompt.invoke(enhanced_state)
+    formatted_prompt = agent_prompt.invoke(_build_prompt_state(state))
+    writer = get_stream_writer()
+
+    if not constants.COMPLETION_CACHE_ENABLED:
+        # 🚀 STREAM the final LLM response; only Final Answer tokens reach the client
+        ai_message, parser = stream_response(llm_with_tools, formatted_prompt, on_token=writer)
+        return _route_streamed_message(ai_message, parser)
+
+    # Byte-identical prompts (retries, refreshes) replay the cached completion
+    cache = get_completion_cache()
+    key = _completion_cache_key(formatted_prompt)
+    chunks = cache.get(key)
+    if chunks is not None:
+        ai_message, parser = replay_response(chunks, on_token=writer)
+    else:
+        chunks = []
+        ai_message, parser = stream_response(
+            llm_with_tools, formatted_prompt, on_token=writer, record=chunks
+        )
+        cache.put(key, constants.MODEL_NAME, chunks)
 
-    # 🚀 STREAM the final LLM response
-    ai_message = stream_response(llm_with_tools, formatted_prompt)
+    return _route_streamed_message(ai_message, parser)
 
-    # 🚨 Detect tool call from streamed text (only 1 pass!)
-    action_info = parse_action_from_response(ai_message.content)
 
-    if action_info:
+async def aagent_node_with_streaming(state: AgentState) -> AgentState:
+    """
+    Async variant of agent_node_with_streaming.
+
+    Streams the LLM with astream so the node never blocks the event loop.
+    """
+    from .runnable import get_llm_with_tools, get_agent_prompt
+
+    llm_with_tools = get_llm_with_tools()
+    agent_prompt = get_agent_prompt()
+
+    formatted_prompt = await agent_prompt.ainvoke(_build_prompt_state(state))
+    writer = get_stream_writer()
+
+    if not constants.COMPLETION_CACHE_ENABLED:
+        ai_message, parser = await astream_response(llm_with_tools, formatted_prompt, on_token=writer)
+        return _route_streamed_message(ai_message, parser)
+
+    cache = get_completion_cache()
+    key = _completion_cache_key(formatted_prompt)
+    chunks = await cache.aget(key)
+    if chunks is not None:
+        ai_message, parser = replay_response(chunks, on_token=writer)
+    else:
+        chunks = []
+        ai_message, parser = await astream_response(
+            llm_with_tools, formatted_prompt, on_token=writer, record=chunks
+        )
+        await cache.aput(key, constants.MODEL_NAME, chunks)
+
+    return _route_streamed_message(ai_message, parser)
+
+
+def _route_tool_calling_message(ai_message: AIMessage) -> AgentState:
+    """Turn a native function-calling response into the next state update."""
+    if ai_message.tool_calls:
         logger.debug("--- AGENT DECIDED TO CALL A TOOL ---")
         return {
             "messages": [ai_message],
             "next_action": "call_tool",
-            "actions": [action_info]
+            "actions": [
+                {
+                    "action": tool_call["name"],
+                    "action_input": tool_call["args"],
+                    "tool_call_id": tool_call["id"],
+                }
+                for tool_call in ai_message.tool_calls
+            ]
         }
 
-    # Otherwise, final answer
     return {
         "messages": [ai_message],
         "next_action": "respond"
     }
 
 
+def tool_calling_agent_node(state: AgentState) -> AgentState:
+    """
+    Agent node for the native function-calling mode.
+
+    Reads structured tool_calls from the model output instead of parsing
+    Action/Action Input text, so the prompt carries no format instructions.
+    """
+    from .runnable import get_llm_with_tools, get_tool_calling_prompt_variables
+    from prompts import get_tool_calling_prompt
+
+    formatted_prompt = get_tool_calling_prompt().invoke(get_tool_calling_prompt_variables(state))
+
+    ai_message = stream_tool_calling_response(
+        get_llm_with_tools(), formatted_prompt, on_token=get_stream_writer()
+    )
+    logger.debug(f"Token usage: {ai_message.usage_metadata}")
+
+    return _route_tool_calling_message(ai_message)
+
+
+async def atool_calling_agent_node(state: AgentState) -> AgentState:
+    """Async variant of tool_calling_agent_node."""
+    from .runnable import get_llm_with_tools, get_tool_calling_prompt_variables
+    from prompts import get_tool_calling_prompt
+
+    formatted_prompt = await get_tool_calling_prompt().ainvoke(get_tool_calling_prompt_variables(state))
+
+    ai_message = await astream_tool_calling_response(
+        get_llm_with_tools(), formatted_prompt, on_token=get_stream_writer()
+    )
+    logger.debug(f"Token usage: {ai_message.usage_metadata}")
+
+    return _route_tool_calling_message(ai_message)
+
+
+def _unpack_action(action_info, index: int = 0) -> tuple:
+    """
+    Read tool name, arguments and call id from a dict or attribute-style action.
+
+    Args:
+        action_info: The action as parsed or as a structured tool call
+        index: Position of the action in its step
+
+    Returns:
+        tuple: tool name, tool arguments, tool call id
+    """
+    if isinstance(action_info, dict):
+        tool_name = action_info.get("action")
+        tool_args = action_info.get("action_input")
+        tool_call_id = action_info.get("tool_call_id")
+    else:
+        tool_name = getattr(action_info, "action", None)
+        tool_args = getattr(action_info, "action_input", None)
+        tool_call_id = getattr(action_info, "tool_call_id", None)
+    # ReAct actions have no call id; the position keeps two calls to the
+    # same tool in one step apart
+    return tool_name, tool_args, tool_call_id or f"{tool_name}-{index}"
+
+
+def _is_malformed(tool_name, tool_args) -> bool:
+    # Structured calls to argument-less tools legitimately carry {}
+    return not tool_name or tool_args is None or tool_args == ""
+
+
+def _malformed_tool_message(action_info, tool_call_id) -> ToolMessage:
+    logger.debug("ERROR: Malformed tool call item: {}", action_info)
+    return ToolMessage(
+        content="Error: Malformed tool call received.", 
+        tool_call_id=str(tool_call_id) if tool_call_id else "unknown"
+    )
+
+
+def _tool_output_message(tool_name: str, tool_call_id: str, output) -> ToolMessage:
+    logger.debug(f"Output from {tool_name}: {output}")
+    return ToolMessage(
+        content=output, 
+        name=tool_name,
+        tool_call_id=tool_call_id
+    )
+
+
+def _failed_tool_message(tool_name: str, tool_call_id: str, error: Exception) -> ToolMessage:
+    logger.debug(f"Error executing tool {tool_name}: {error}")
+    return ToolMessage(
+        content=f"Error: Failed to execute tool {tool_name}: {str(error)}", 
+        name=tool_name,
+        tool_call_id=tool_call_id
+    )
+
+
+# Shared, bounded pool for running independent tool calls side by side.
+# ContextThreadPoolExecutor copies the LangGraph runtime context into each
+# worker so tools can still call get_runtime().
+_tool_executor = ContextThreadPoolExecutor(
+    max_workers=constants.TOOL_MAX_CONCURRENCY,
+    thread_name_prefix="tool",
+)
+
+
+def _run_action(action_info, index: int = 0) -> ToolMessage:
+    """Execute a single action and wrap the outcome in a ToolMessage."""
+    logger.debug("\n--- PROCESSING TOOL CALL: {} ---", action_info)
+
+    tool_name, tool_args, tool_call_id = _unpack_action(action_info, index)
+
+    if _is_malformed(tool_name, tool_args):
+        return _malformed_tool_message(action_info, tool_call_id)
+
+    # Execute the tool
+    try:
+        output = execute_tool(tool_name, tool_args)
+        return _tool_output_message(tool_name, tool_call_id, output)
+    except Exception as e:
+        return _failed_tool_message(tool_name, tool_call_id, e)
+
+
+async def _arun_action(action_info, index: int, semaphore: asyncio.Semaphore) -> ToolMessage:
+    """Async counterpart of _run_action, bounded by the shared semaphore."""
+    logger.debug("\n--- PROCESSING TOOL CALL: {} ---", action_info)
+
+    tool_name, tool_args, tool_call_id = _unpack_action(action_info, index)
+
+    if _is_malformed(tool_name, tool_args):
+        return _malformed_tool_message(action_info, tool_call_id)
+
+    try:
+        async with semaphore:
+            output = await aexecute_tool(tool_name, tool_args)
+        return _tool_output_message(tool_name, tool_call_id, output)
+    except Exception as e:
+        return _failed_tool_message(tool_name, tool_call_id, e)
+
+
 def tool_node(state: AgentState) -> AgentState:
     """
     Tool execution node that processes tool calls and returns results.
+
+    Independent calls from the same LLM turn run concurrently; the
+    ToolMessages come back in the order the actions were requested.
     
     Args:
         state: Current agent state with tool actions to execute
@@ -128,45 +495,11 @@ def tool_node(state: AgentState) -> AgentState:
     
     logger.debug("Processing tool calls: {}", actions)
     
-    tool_outputs = []
-    for action_info in actions:
-        logger.debug("\n--- PROCESSING TOOL CALL: {} ---", action_info)
-        
-        if isinstance(action_info, dict):
-            tool_name = action_info.get("action")
-            tool_args = action_info.get("action_input")
-        else:
-            tool_name = getattr(action_info, "action", None)
-            tool_args = getattr(action_info, "action_input", None)
-            
-        if not tool_name or not tool_args:
-            logger.debug("ERROR: Malformed tool call item: {}", action_info)
-            tool_outputs.append(
-                ToolMessage(
-                    content="Error: Malformed tool call received.", 
-                    tool_call_id=str(tool_name) if tool_name else "unknown"
-                )
-            )
-            continue
-            
-        # Execute the tool
-        try:
-            output = execute_tool(tool_name, tool_args)
-            logger.debug(f"Output from {tool_name}: {output}")
-            tool_outputs.append(
-                ToolMessage(
-                    content=output, 
-                    tool_call_id=tool_name
-                )
-            )
-        except Exception as e:
-            logger.debug(f"Error executing tool {tool_name}: {e}")
-            tool_outputs.append(
-                ToolMessage(
-                    content=f"Error: Failed to execute tool {tool_name}: {str(e)}", 
-                    tool_call_id=tool_name
-                )
-            )
+    if len(actions) <= 1:
+        tool_outputs = [_run_action(action_info, i) for i, action_info in enumerate(actions)]
+    else:
+        # map() yields results in submission order, keeping the output deterministic
+        tool_outputs = list(_tool_executor.map(_run_action, actions, range(len(actions))))
             
     return {
         "messages": tool_outputs, 
@@ -174,6 +507,176 @@ def tool_node(state: AgentState) -> AgentState:
     }
 
 
+async def atool_node(state: AgentState) -> AgentState:
+    """
+    Async variant of tool_node.
+
+    Tools are awaited concurrently through ainvoke; sync tools are moved off
+    the event loop by LangChain's executor fallback.
+    """
+    actions = state["actions"]
+
+    logger.debug("Processing tool calls: {}", actions)
+
+    semaphore = asyncio.Semaphore(constants.TOOL_MAX_CONCURRENCY)
+    # gather() preserves argument order regardless of completion order
+    tool_outputs = await asyncio.gather(
+        *(_arun_action(action_info, i, semaphore) for i, action_info in enumerate(actions))
+    )
+
+    return {
+        "messages": list(tool_outputs),
+        "next_action": "respond"
+    }
+
+
+def _cache_hit_update(answer: str) -> AgentState:
+    """Replay a cached answer to the client and finish the turn with it."""
+    writer = get_stream_writer()
+    for chunk in replay_chunks(answer):
+        writer(chunk)
+    return {
+        "messages": [AIMessage(content=answer, name="agent")],
+        "next_action": "respond",
+        "turn_start": 0,
+        "cache_hit": True,
+    }
+
+
+def _skips_cache(state: AgentState) -> bool:
+    """Whether a turn must be answered by the agent rather than the cache."""
+    messages = state["messages"]
+    if len(messages) != 1 or not isinstance(messages[0], HumanMessage):
+        return True
+    # Cached answers were given without recalled memories, so they cannot
+    # stand in for an answer that would use this user's
+    return bool(state.get("memory_context"))
+
+
+def _cache_scope(config: RunnableConfig) -> str:
+    return SCOPE_GUEST if config.get("metadata", {}).get("is_guest") else SCOPE_USER
+
+
+def check_cache_node(state: AgentState, config: RunnableConfig) -> AgentState:
+    """
+    Answer the opening question of a new thread from the semantic cache.
+
+    Only the first turn of a thread is looked up, since later answers
+    depend on the conversation so far. With memory recall enabled this
+    runs after recall_memories and is skipped when memories were recalled.
+    Guests and signed-in users are answered from separate scopes.
+    
+    Args:
+        state: Current agent state
+        config: Run configuration carrying is_guest
+        
+    Returns:
+        The cached answer and cache_hit=True, or cache_hit=False on a miss
+    """
+    if _skips_cache(state):
+        return {"cache_hit": False}
+
+    question = message_text(state["messages"][0])
+    try:
+        answer = get_semantic_cache().lookup(question, embed_text(question), _cache_scope(config))
+    except Exception as e:
+        logger.error(f"Semantic cache lookup failed: {e}")
+        return {"cache_hit": False}
+
+    return _cache_hit_update(answer) if answer is not None else {"cache_hit": False}
+
+
+async def acheck_cache_node(state: AgentState, config: RunnableConfig) -> AgentState:
+    """Async variant of check_cache_node."""
+    if _skips_cache(state):
+        return {"cache_hit": False}
+
+    question = message_text(state["messages"][0])
+    try:
+        answer = get_semantic_cache().lookup(question, await aembed_text(question), _cache_scope(config))
+    except Exception as e:
+        logger.error(f"Semantic cache lookup failed: {e}")
+        return {"cache_hit": False}
+
+    return _cache_hit_update(answer) if answer is not None else {"cache_hit": False}
+
+
+def cache_response_node(state: AgentState, config: RunnableConfig) -> AgentState:
+    """
+    Store the answer to a new thread's opening question in the semantic cache.
+
+    Skipped when the answer came from the cache, when the turn used a
+    personal or time-sensitive tool, or when memories were recalled into it.
+    The answer is only reused for askers of the same scope (guest or not).
+    """
+    from .runnable import get_turn_start
+
+    turn_start = get_turn_start(state)
+    if state.get("cache_hit") or turn_start != 0:
+        return {}
+
+    turn = state["messages"][turn_start:]
+    cache = get_semantic_cache()
+    if cache.is_cacheable(turn, state.get("memory_context", "")):
+        cache.store(message_text(turn[0]), message_text(turn[-1]), scope=_cache_scope(config))
+    return {}
+
+
+def decide_after_cache(state: AgentState) -> Literal["record_turn", "manage_history"]:
+    """Skip the agent loop when the semantic cache answered the turn."""
+    return "record_turn" if state.get("cache_hit") else "manage_history"
+
+
+def _turn_thread_id(config: RunnableConfig):
+    return config.get("configurable", {}).get("thread_id")
+
+
+def _turn_user_id(config: RunnableConfig):
+    return config.get("metadata", {}).get("user_id")
+
+
+def _memory_user_id(config: RunnableConfig):
+    """The user whose memories the turn may recall; None for guests, who have none."""
+    if config.get("metadata", {}).get("is_guest"):
+        return None
+    return _turn_user_id(config)
+
+
+def record_turn_node(state: AgentState, config: RunnableConfig) -> AgentState:
+    """
+    Copy the finished turn into the chat_messages and chat_threads read models.
+    
+    Args:
+        state: Final agent state of the turn
+        config: Run configuration carrying the thread_id
+        
+    Returns:
+        Empty update; the state itself is unchanged
+    """
+    from .runnable import get_turn_start
+
+    record_turn(
+        _turn_thread_id(config),
+        state["messages"],
+        get_turn_start(state),
+        user_id=_turn_user_id(config),
+    )
+    return {}
+
+
+async def arecord_turn_node(state: AgentState, config: RunnableConfig) -> AgentState:
+    """Async variant of record_turn_node."""
+    from .runnable import get_turn_start
+
+    await arecord_turn(
+        _turn_thread_id(config),
+        state["messages"],
+        get_turn_start(state),
+        user_id=_turn_user_id(config),
+    )
+    return {}
+
+
 def decide_next_step(state: AgentState) -> Literal["tool_node", "respond_and_end"]:
     """
     Decision function to determine the next step in the workflow.
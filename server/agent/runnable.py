@@ -3,16 +3,19 @@ Agent runnable chain setup for Helion.
 Handles the creation and configuration of the agent's runnable chain.
 """
 
+from functools import lru_cache
 from typing import List
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, ToolMessage
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import render_text_description
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.schema import BaseMessage, PromptValue
 from langchain.schema.runnable import Runnable
 from typing import Sequence, Any
 from prompts import get_agent_prompt
-from tools import get_all_tools
+from tools import get_all_tools, get_registry_version
 from core.constants import MODEL_NAME
+from .history import find_turn_start, get_history_manager, render_chat_history
 
 
 def get_chat_history(messages: List[BaseMessage]) -> List[BaseMessage]:
@@ -30,34 +33,69 @@ def get_chat_history(messages: List[BaseMessage]) -> List[BaseMessage]:
     return messages[:-1]
 
 
-def get_current_input(messages: List[BaseMessage]) -> str:
+def get_turn_start(state: dict) -> int:
     """
-    Extract the content of the last HumanMessage as the current input.
+    Index of the HumanMessage that opened the current turn.
+
+    The index is recorded in state when the turn starts, so this is a
+    constant-time lookup; a backward scan is only needed for states that
+    predate the field.
+    
+    Args:
+        state: Current agent state
+        
+    Returns:
+        Index into state["messages"]
+    """
+    messages = state["messages"]
+    turn_start = state.get("turn_start")
+    if (
+        turn_start is not None
+        and 0 <= turn_start < len(messages)
+        and isinstance(messages[turn_start], HumanMessage)
+    ):
+        return turn_start
+    return find_turn_start(messages)
+
+
+def get_current_input(messages: List[BaseMessage], turn_start: int = None) -> str:
+    """
+    Extract the content of the HumanMessage that opened the current turn.
     
     Args:
         messages: List of conversation messages
+        turn_start: Index of the current turn's HumanMessage; the last
+            message is used when omitted
         
     Returns:
-        Content of the last human message
+        Content of the current human message
     """
-    if messages and isinstance(messages[-1], HumanMessage):
-        return messages[-1].content
+    if turn_start is None:
+        turn_start = len(messages) - 1
+    if 0 <= turn_start < len(messages) and isinstance(messages[turn_start], HumanMessage):
+        return messages[turn_start].content
     return ""
 
 
-def get_agent_scratchpad(messages: List[BaseMessage]) -> List[BaseMessage]:
+def get_agent_scratchpad(messages: List[BaseMessage], turn_start: int = None) -> List[BaseMessage]:
     """
     Extracts tool calls and tool outputs to form the agent_scratchpad.
     This is critical for ReAct to function properly.
+
+    Only the current turn's steps are included; earlier turns are already
+    part of the chat history.
     
     Args:
         messages: List of conversation messages
+        turn_start: Index of the current turn's HumanMessage
         
     Returns:
         List of AI and Tool messages for the scratchpad
     """
+    if turn_start is None:
+        turn_start = find_turn_start(messages)
     scratchpad = []
-    for msg in messages:
+    for msg in messages[turn_start + 1:]:
         if isinstance(msg, AIMessage):
             scratchpad.append(msg)
         elif isinstance(msg, ToolMessage):
@@ -65,6 +103,73 @@ def get_agent_scratchpad(messages: List[BaseMessage]) -> List[BaseMessage]:
     return scratchpad
 
 
+def format_agent_scratchpad(scratchpad: List[BaseMessage]) -> str:
+    """
+    Render scratchpad messages as ReAct text for the prompt.
+    
+    Args:
+        scratchpad: Messages returned by get_agent_scratchpad
+        
+    Returns:
+        str: Thought/Action text followed by one Observation per tool result
+    """
+    lines = []
+    for msg in scratchpad:
+        if isinstance(msg, ToolMessage):
+            lines.append(f"Observation: {msg.content}")
+        else:
+            lines.append(str(msg.content))
+    return "\n".join(lines)
+
+
+def get_prompt_variables(state: dict) -> dict:
+    """
+    Assemble the ReAct prompt variables from the current graph state.
+
+    Chat history is the token-budgeted window from the HistoryManager,
+    prefixed with the rolling summary of older turns.
+    
+    Args:
+        state: Current agent state
+        
+    Returns:
+        Dictionary of prompt variables
+    """
+    messages = state["messages"]
+    turn_start = get_turn_start(state)
+    history = get_history_manager().window(
+        messages, turn_start, state.get("summarized_upto", 0)
+    )
+    return {
+        "messages": messages,
+        **get_tool_prompt_variables(),
+        "input": get_current_input(messages, turn_start),
+        "chat_history": render_chat_history(state.get("summary"), history),
+        "agent_scratchpad": format_agent_scratchpad(get_agent_scratchpad(messages, turn_start)),
+        "memory_context": state.get("memory_context") or "",
+    }
+
+
+def get_tool_calling_prompt_variables(state: dict) -> dict:
+    """
+    Assemble the variables for the native function-calling prompt.
+
+    The history window is followed by every message of the current turn so
+    tool calls stay paired with their results.
+    """
+    messages = state["messages"]
+    turn_start = get_turn_start(state)
+    history = get_history_manager().window(
+        messages, turn_start, state.get("summarized_upto", 0)
+    )
+    summary = state.get("summary")
+    return {
+        "messages": history + messages[turn_start:],
+        "conversation_summary": f"Summary of the earlier conversation: {summary}" if summary else "",
+        "memory_context": state.get("memory_context") or "",
+    }
+
+
 # def get_agent_prompt():
 #     """
 #     Get the agent prompt template from LangChain Hub.
@@ -75,45 +180,97 @@ def get_agent_scratchpad(messages: List[BaseMessage]) -> List[BaseMessage]:
 #     return hub.pull("hwchase17/react-chat")
 
 
-def get_llm_with_tools() -> Runnable[PromptValue | str | Sequence[BaseMessage | list[str] | tuple[str, str] | str | dict[str, Any]], BaseMessage]:
+LLM_TEMPERATURE = 0.7
+
+
+@lru_cache(maxsize=8)
+def _build_llm_with_tools(model_name: str, temperature: float, registry_version: int):
+    """
+    Build the tool-bound chat model for one (model, temperature, tool set) key.
+
+    registry_version is only part of the cache key: a register/unregister in
+    the ToolRegistry bumps it, so the next lookup rebinds the new tool set.
+    """
+    tools = get_all_tools()
+
+    return ChatGoogleGenerativeAI(
+        model=model_name,
+        temperature=temperature,
+    ).bind_tools(tools)
+
+
+@lru_cache(maxsize=8)
+def _build_llm(model_name: str, temperature: float):
+    return ChatGoogleGenerativeAI(
+        model=model_name,
+        temperature=temperature,
+    )
+
+
+def get_llm(model_name: str = MODEL_NAME, temperature: float = 0.0):
     """
-    Initialize and configure the LLM with tools.
+    Get a plain (tool-less) chat model for auxiliary calls such as summaries.
     
     Returns:
-        Configured LLM instance with bound tools
+        Cached chat model instance
     """
+    return _build_llm(model_name, temperature)
+
+
+@lru_cache(maxsize=8)
+def _build_tool_prompt_variables(registry_version: int) -> dict:
+    """Render the tool descriptions for the ReAct prompt once per tool set."""
     tools = get_all_tools()
+    return {
+        "tools": render_text_description(tools),
+        "tool_names": ", ".join(t.name for t in tools),
+    }
+
+
+def get_tool_prompt_variables() -> dict:
+    """
+    Get the pre-rendered "tools" and "tool_names" prompt variables.
     
-    llm = ChatGoogleGenerativeAI(
-        model=MODEL_NAME,
-        temperature=0.7,
-    ).bind_tools(tools)
-    
-    return llm
+    Returns:
+        Dictionary with the rendered tool descriptions and tool names
+    """
+    return _build_tool_prompt_variables(get_registry_version())
 
 
-def get_agent_runnable():
+def get_llm_with_tools(model_name: str = MODEL_NAME, temperature: float = LLM_TEMPERATURE) -> Runnable[PromptValue | str | Sequence[BaseMessage | list[str] | tuple[str, str] | str | dict[str, Any]], BaseMessage]:
     """
-    Create and return the complete agent runnable chain.
+    Get the LLM configured with tools.
+
+    The client is cached per worker process, so its HTTP/gRPC channel is
+    reused across turns. It is rebuilt only when the tool set changes.
     
+    Args:
+        model_name: Gemini model to use
+        temperature: Sampling temperature
+        
     Returns:
-        Configured runnable chain for the agent
+        Configured LLM instance with bound tools
     """
+    return _build_llm_with_tools(model_name, temperature, get_registry_version())
 
-    tools = get_all_tools()
+
+@lru_cache(maxsize=8)
+def _build_agent_runnable(model_name: str, temperature: float, registry_version: int):
     agent_prompt = get_agent_prompt()
-    llm_with_tools = get_llm_with_tools()
+    llm_with_tools = _build_llm_with_tools(model_name, temperature, registry_version)
     
-    agent_runnable = (
-        RunnablePassthrough.assign(
-            tools=lambda x: tools,
-            tool_names=lambda x: [t.name for t in tools],
-            input=lambda x: get_current_input(x["messages"]),
-            chat_history=lambda x: get_chat_history(x["messages"]),
-            agent_scratchpad=lambda x: get_agent_scratchpad(x["messages"])
-        )
+    return (
+        RunnableLambda(get_prompt_variables)
         | agent_prompt
         | llm_with_tools
     )
+
+
+def get_agent_runnable(model_name: str = MODEL_NAME, temperature: float = LLM_TEMPERATURE):
+    """
+    Get the complete agent runnable chain, cached like get_llm_with_tools.
     
-    return agent_runnable
\ No newline at end of file
+    Returns:
+        Configured runnable chain for the agent
+    """
+    return _build_agent_runnable(model_name, temperature, get_registry_version())
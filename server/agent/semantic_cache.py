@@ -0,0 +1,208 @@
+"""
+Semantic response cache for Helion.
+Reuses answers to near-duplicate opening questions ("what can you do?")
+instead of running the full agent loop against the LLM.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from langchain_core.messages import BaseMessage, AIMessage, ToolMessage
+
+from core import constants
+from utils.logger import logger
+
+
+# Answers are only shared within a scope: guests never see an answer given
+# to a signed-in user and vice versa
+SCOPE_GUEST = "guest"
+SCOPE_USER = "user"
+
+
+@dataclass
+class CacheEntry:
+    """A cached answer and the normalized embedding of the input it answered."""
+    scope: str
+    question: str
+    answer: str
+    vector: np.ndarray
+    created_at: float
+
+
+class SemanticResponseCache:
+    """
+    In-process nearest-neighbour cache of final answers.
+
+    Entries expire after ttl_seconds and the least recently used entry is
+    evicted beyond max_entries. Lookups are one matrix-vector product over
+    the normalized embeddings of the caller's scope, which is cheap at the
+    configured size.
+    """
+
+    # Query embeddings remembered between a miss and the answer being stored
+    _MAX_PENDING = 256
+
+    def __init__(
+        self,
+        threshold: float = constants.SEMANTIC_CACHE_THRESHOLD,
+        ttl_seconds: int = constants.SEMANTIC_CACHE_TTL_SECONDS,
+        max_entries: int = constants.SEMANTIC_CACHE_MAX_ENTRIES,
+        skip_tools: Iterable[str] = constants.SEMANTIC_CACHE_SKIP_TOOLS,
+    ):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.skip_tools = frozenset(skip_tools)
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], CacheEntry]" = OrderedDict()
+        self._pending: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        # scope -> (keys, matrix of their vectors), rebuilt after any change
+        self._matrices: Dict[str, tuple] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, question: str, vector: np.ndarray, scope: str = SCOPE_USER) -> Optional[str]:
+        """
+        Find a cached answer for a question similar to this one.
+
+        Args:
+            question: The user's input
+            vector: Embedding of question
+            scope: SCOPE_GUEST or SCOPE_USER; only answers stored in the
+                same scope are returned
+
+        Returns:
+            str: Cached answer, or None on a miss
+        """
+        vector = _normalize(vector)
+        with self._lock:
+            self._expire()
+            best_key, best_score = self._nearest(scope, vector)
+            if best_key is not None and best_score >= self.threshold:
+                self._entries.move_to_end(best_key)
+                self.hits += 1
+                logger.debug(f"Semantic cache hit ({best_score:.3f}) for: {question}")
+                return self._entries[best_key].answer
+
+            self.misses += 1
+            self._pending[(scope, question)] = vector
+            self._pending.move_to_end((scope, question))
+            while len(self._pending) > self._MAX_PENDING:
+                self._pending.popitem(last=False)
+            return None
+
+    def store(
+        self,
+        question: str,
+        answer: str,
+        vector: Optional[np.ndarray] = None,
+        scope: str = SCOPE_USER,
+    ) -> bool:
+        """
+        Cache an answer.
+
+        Args:
+            question: The user's input
+            answer: Final answer given for it
+            vector: Embedding of question; taken from the preceding miss
+                when omitted
+            scope: SCOPE_GUEST or SCOPE_USER, as passed to lookup
+
+        Returns:
+            bool: True if the answer was cached
+        """
+        key = (scope, question)
+        with self._lock:
+            if vector is None:
+                vector = self._pending.pop(key, None)
+                if vector is None:
+                    return False
+            else:
+                vector = _normalize(vector)
+
+            self._entries[key] = CacheEntry(scope, question, answer, vector, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrices.clear()
+            return True
+
+    def is_cacheable(self, messages: List[BaseMessage], memory_context: str = "") -> bool:
+        """
+        Whether a finished turn's answer may be reused for other users.
+
+        Args:
+            messages: The turn's messages, starting with its HumanMessage
+            memory_context: Memories recalled into the turn's prompt
+
+        Returns:
+            bool: False if the turn used a personal or time-sensitive tool,
+            or was answered with the user's recalled memories in the prompt
+        """
+        # Recalled memories reach the prompt without a ToolMessage, so the
+        # answer may be personal even when no tool was called
+        if memory_context:
+            return False
+        for message in messages:
+            if isinstance(message, ToolMessage) and message.name in self.skip_tools:
+                return False
+        return bool(messages) and isinstance(messages[-1], AIMessage) and bool(messages[-1].content)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._pending.clear()
+            self._matrices.clear()
+
+    @property
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.ttl_seconds
+        # Entries are only re-ordered on use, so scan them all
+        expired = [key for key, entry in self._entries.items() if entry.created_at < cutoff]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._matrices.clear()
+
+    def _nearest(self, scope: str, vector: np.ndarray) -> tuple:
+        if scope not in self._matrices:
+            keys = [key for key in self._entries if key[0] == scope]
+            matrix = np.stack([self._entries[key].vector for key in keys]) if keys else None
+            self._matrices[scope] = (keys, matrix)
+        keys, matrix = self._matrices[scope]
+        if not keys:
+            return None, -1.0
+        scores = matrix @ vector
+        index = int(np.argmax(scores))
+        return keys[index], float(scores[index])
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+@lru_cache(maxsize=1)
+def get_semantic_cache() -> SemanticResponseCache:
+    """Process-wide semantic response cache."""
+    return SemanticResponseCache()
+
+
+def replay_chunks(answer: str) -> Iterable[str]:
+    """Split a cached answer into word-sized chunks, like a live stream."""
+    start = 0
+    for index, char in enumerate(answer):
+        if char == " " and index > start:
+            yield answer[start:index]
+            start = index
+    if start < len(answer):
+        yield answer[start:]
@@ -16,7 +16,17 @@ class AgentState(TypedDict):
         messages: List of conversation messages with automatic message addition
         next_action: Determines the next step in the workflow 
         actions: List of tool actions to be executed
+        summary: Rolling summary of the turns folded out of the history window
+        summarized_upto: Index of the first message not covered by summary
+        turn_start: Index of the HumanMessage that opened the current turn
+        cache_hit: True when the turn was answered from the semantic cache
+        memory_context: Memories recalled for the current input, rendered for the prompt
     """
     messages: Annotated[List[BaseMessage], add_messages]
     next_action: Literal["call_tool", "respond"]
-    actions: List[dict]
\ No newline at end of file
+    actions: List[dict]
+    summary: str
+    summarized_upto: int
+    turn_start: int
+    cache_hit: bool
+    memory_context: str
\ No newline at end of file
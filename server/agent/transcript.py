@@ -0,0 +1,179 @@
+"""
+Chat transcript read model for Helion.
+Copies each finished turn's messages into the chat_messages table, and
+keeps the chat_threads summary row current, so the history endpoints never
+have to load a LangGraph checkpoint.
+"""
+
+from typing import List, Optional
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
+
+from utils.logger import logger
+
+
+# Rewrites on conflict so a turn replayed after a lost checkpoint wins
+_UPSERT_MESSAGE_SQL = """
+    INSERT INTO chat_messages (thread_id, seq, message_id, role, content)
+    VALUES (%(thread_id)s, %(seq)s, %(message_id)s, %(role)s, %(content)s)
+    ON CONFLICT (thread_id, seq) DO UPDATE
+    SET message_id = EXCLUDED.message_id,
+        role = EXCLUDED.role,
+        content = EXCLUDED.content
+"""
+
+
+# The title is fixed by the first turn; later turns only move the preview
+_UPSERT_THREAD_SQL = """
+    INSERT INTO chat_threads (
+        thread_id, user_id, title, last_message_preview,
+        created_at, updated_at, message_count
+    )
+    VALUES (
+        %(thread_id)s, %(user_id)s, %(title)s, %(last_message_preview)s,
+        now(), now(), %(message_count)s
+    )
+    ON CONFLICT (thread_id) DO UPDATE
+    SET last_message_preview = EXCLUDED.last_message_preview,
+        updated_at = EXCLUDED.updated_at,
+        message_count = EXCLUDED.message_count
+"""
+
+TITLE_LENGTH = 50
+PREVIEW_LENGTH = 100
+
+
+def _shorten(text: str, length: int) -> str:
+    return text[:length] + ("..." if len(text) > length else "")
+
+
+def message_role(message: BaseMessage) -> str:
+    """Role name used by the client for a LangChain message."""
+    if isinstance(message, HumanMessage):
+        return "user"
+    if isinstance(message, AIMessage):
+        return "assistant"
+    return "tool"
+
+
+def message_text(message: BaseMessage) -> str:
+    """Message content as plain text, flattening multimodal content lists."""
+    content = message.content
+    if isinstance(content, list):
+        content = " ".join(
+            str(part.get("text", "")) if isinstance(part, dict) else str(part)
+            for part in content
+        )
+    return content if isinstance(content, str) else str(content or "")
+
+
+def build_transcript_rows(thread_id: str, messages: List[BaseMessage], start: int = 0) -> List[dict]:
+    """
+    Convert messages[start:] into chat_messages rows.
+
+    Args:
+        thread_id: Thread the messages belong to
+        messages: Full message list from the state
+        start: Index of the first message to convert
+
+    Returns:
+        List of row dictionaries keyed like the chat_messages columns
+    """
+    return [
+        {
+            "thread_id": thread_id,
+            "seq": seq,
+            "message_id": str(message.id) if message.id else None,
+            "role": message_role(message),
+            "content": message_text(message),
+        }
+        for seq, message in enumerate(messages[start:], start=start)
+    ]
+
+
+def build_thread_row(
+    thread_id: str,
+    user_id: str,
+    messages: List[BaseMessage],
+    start: int,
+) -> dict:
+    """
+    Build the chat_threads row for a thread after the turn at start.
+
+    Args:
+        thread_id: Thread the messages belong to
+        user_id: Owner of the thread
+        messages: Full message list from the state
+        start: Index of the turn's HumanMessage
+
+    Returns:
+        Row dictionary keyed like the chat_threads columns
+    """
+    turn_input = message_text(messages[start]) if start < len(messages) else ""
+    return {
+        "thread_id": thread_id,
+        "user_id": user_id,
+        "title": _shorten(turn_input, TITLE_LENGTH) or "New Chat",
+        "last_message_preview": _shorten(message_text(messages[-1]), PREVIEW_LENGTH) if messages else "",
+        "message_count": len(messages),
+    }
+
+
+def record_turn(
+    thread_id: Optional[str],
+    messages: List[BaseMessage],
+    start: int,
+    user_id: Optional[str] = None,
+) -> None:
+    """
+    Persist the messages of a finished turn and refresh the thread row.
+
+    Failures are logged and swallowed: the checkpoint remains the source of
+    truth and the turn must not fail because the read model could not be
+    written.
+    """
+    rows = build_transcript_rows(thread_id, messages, start) if thread_id else []
+    if not rows:
+        return
+
+    from core.database import pooled_connection
+
+    try:
+        with pooled_connection() as conn:
+            with conn.transaction():
+                with conn.cursor() as cursor:
+                    cursor.executemany(_UPSERT_MESSAGE_SQL, rows)
+                    if user_id:
+                        cursor.execute(
+                            _UPSERT_THREAD_SQL,
+                            build_thread_row(thread_id, user_id, messages, start),
+                        )
+    except Exception as e:
+        logger.error(f"Failed to record chat transcript for thread {thread_id}: {e}")
+
+
+async def arecord_turn(
+    thread_id: Optional[str],
+    messages: List[BaseMessage],
+    start: int,
+    user_id: Optional[str] = None,
+) -> None:
+    """Async counterpart of record_turn, using the shared async pool."""
+    rows = build_transcript_rows(thread_id, messages, start) if thread_id else []
+    if not rows:
+        return
+
+    from core.database import get_async_pool
+
+    try:
+        async with get_async_pool().connection() as conn:
+            async with conn.transaction():
+                async with conn.cursor() as cursor:
+                    await cursor.executemany(_UPSERT_MESSAGE_SQL, rows)
+                    if user_id:
+                        await cursor.execute(
+                            _UPSERT_THREAD_SQL,
+                            build_thread_row(thread_id, user_id, messages, start),
+                        )
+    except Exception as e:
+        logger.error(f"Failed to record chat transcript for thread {thread_id}: {e}")
+
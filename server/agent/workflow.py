@@ -6,92 +6,220 @@ from core.database import get_psycopg_db_connection
 from langgraph.graph import StateGraph, START, END
 
 from .state import AgentState
-from .nodes import agent_node, agent_node_with_streaming, tool_node, decide_next_step
+from .nodes import (
+    agent_node,
+    agent_node_with_streaming,
+    aagent_node_with_streaming,
+    tool_calling_agent_node,
+    atool_calling_agent_node,
+    tool_node,
+    atool_node,
+    manage_history_node,
+    amanage_history_node,
+    record_turn_node,
+    arecord_turn_node,
+    check_cache_node,
+    acheck_cache_node,
+    cache_response_node,
+    decide_after_cache,
+    recall_memories_node,
+    arecall_memories_node,
+    decide_next_step,
+)
 from psycopg import Connection
 from psycopg.rows import dict_row
 from langgraph.checkpoint.postgres import PostgresSaver
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
 
-def create_agent_workflow():
+
+def _report_checkpointer_setup_error(e: Exception):
+    """Report checkpointer setup failures, ignoring the benign ones."""
+    # Ignore DuplicateColumn error if it's already set up
+    if "DuplicateColumn" in str(e) or "already exists" in str(e):
+        print(f"Database setup warning (safe to ignore): {e}")
+    else:
+        print(f"Database setup error: {e}")
+
+
+def create_checkpointer() -> PostgresSaver:
+    """
+    Create the sync PostgresSaver used by the threadpool execution path.
+
+    Returns:
+        PostgresSaver backed by a psycopg connection pool
+    """
+    # Create the checkpointer with a connection pool
+    # This ensures we always get a fresh connection and avoid "connection closed" errors
+    from psycopg_pool import ConnectionPool
+    from core import constants
+
+    pool = ConnectionPool(
+        conninfo=constants.POSTGRES_CONNECTION_URI,
+        min_size=constants.CHECKPOINT_POOL_MIN_SIZE,
+        max_size=constants.CHECKPOINT_POOL_MAX_SIZE,
+        kwargs={
+            "autocommit": True,
+            "prepare_threshold": 0,
+            "row_factory": dict_row
+        }
+    )
+    checkpointer = PostgresSaver(pool)
+
+    # Setup the database tables
+    try:
+        checkpointer.setup()
+    except Exception as e:
+        _report_checkpointer_setup_error(e)
+
+    return checkpointer
+
+
+async def create_async_checkpointer() -> AsyncPostgresSaver:
+    """
+    Create the AsyncPostgresSaver used by the event-loop execution path.
+
+    Must be awaited from inside the running loop (e.g. the FastAPI lifespan).
+    Uses the shared pool from core.database, opening it if needed; the
+    lifespan closes it with close_async_pool() on shutdown.
+
+    Returns:
+        AsyncPostgresSaver backed by the shared async connection pool
+    """
+    from core.database import open_async_pool
+
+    pool = await open_async_pool()
+    checkpointer = AsyncPostgresSaver(pool)
+
+    try:
+        await checkpointer.setup()
+    except Exception as e:
+        _report_checkpointer_setup_error(e)
+
+    return checkpointer
+
+
+def create_agent_workflow(
+    use_async: bool = False,
+    checkpointer=None,
+    agent_mode: str = "react",
+    semantic_cache: bool = False,
+    memory_recall: bool = False,
+):
     """
     Create and compile the agent workflow graph.
-    
+
     Args:
-        db_connection: PostgreSQL database connection for checkpointing
-        
+        use_async: Register the async node variants so the graph can be
+            driven with app.astream on the event loop
+        checkpointer: Checkpointer to compile with; a sync PostgresSaver is
+            created when omitted
+        agent_mode: "react" to parse Thought/Action text, "tool_calling" to
+            dispatch the model's structured tool_calls
+        semantic_cache: Answer near-duplicate opening questions from the
+            semantic response cache
+        memory_recall: Recall relevant memories into the prompt alongside
+            history management
+
     Returns:
         Compiled LangGraph application
     """
     use_streaming = True
-    
+
     # Create the workflow
     workflow = StateGraph(AgentState)
-    
-    # Choose which agent node to use based on streaming preference
-    if use_streaming:
+
+    # Choose which agent node to use based on agent mode and streaming preference
+    if agent_mode == "tool_calling":
+        workflow.add_node("agent", atool_calling_agent_node if use_async else tool_calling_agent_node)
+        print("Using native function-calling agent node")
+    elif agent_mode != "react":
+        raise ValueError(f"Unknown agent mode: {agent_mode}")
+    elif use_async:
+        workflow.add_node("agent", aagent_node_with_streaming)
+        print("Using async streaming agent node")
+    elif use_streaming:
         workflow.add_node("agent", agent_node_with_streaming)
         print("Using streaming agent node")
     else:
         workflow.add_node("agent", agent_node)
         print("Using standard agent node")
-    
+
     # Add tool node
-    workflow.add_node("tool_node", tool_node)
-    
+    workflow.add_node("tool_node", atool_node if use_async else tool_node)
+
+    # Fold old turns into the rolling summary once per user turn
+    workflow.add_node("manage_history", amanage_history_node if use_async else manage_history_node)
+
+    # Copy the finished turn into the chat_messages read model
+    workflow.add_node("record_turn", arecord_turn_node if use_async else record_turn_node)
+
+    # Recall relevant memories into the prompt, in parallel with manage_history
+    # (or ahead of the cache lookup when the semantic cache is on)
+    prepare_nodes = ["manage_history"]
+    if memory_recall:
+        workflow.add_node("recall_memories", arecall_memories_node if use_async else recall_memories_node)
+        prepare_nodes.append("recall_memories")
+
     # Define the workflow edges
-    workflow.add_edge(START, "agent")
-    
+    if semantic_cache:
+        workflow.add_node("check_cache", acheck_cache_node if use_async else check_cache_node)
+        workflow.add_node("cache_response", cache_response_node)
+        # Recall runs before the lookup, so a turn with recalled memories is
+        # never answered from the cache
+        if memory_recall:
+            workflow.add_edge(START, "recall_memories")
+            workflow.add_edge("recall_memories", "check_cache")
+        else:
+            workflow.add_edge(START, "check_cache")
+        workflow.add_conditional_edges(
+            "check_cache",
+            decide_after_cache,
+            {
+                "record_turn": "record_turn",
+                "manage_history": "manage_history"
+            }
+        )
+        workflow.add_edge("manage_history", "agent")
+    else:
+        for node in prepare_nodes:
+            workflow.add_edge(START, node)
+        # The agent waits for every preparation step
+        workflow.add_edge(prepare_nodes if memory_recall else "manage_history", "agent")
+
     # Add conditional edges from agent
     workflow.add_conditional_edges(
         "agent",
         decide_next_step,
         {
             "tool_node": "tool_node",
-            "respond_and_end": END
+            "respond_and_end": "record_turn"
         }
     )
-    
+    if semantic_cache:
+        workflow.add_edge("record_turn", "cache_response")
+        workflow.add_edge("cache_response", END)
+    else:
+        workflow.add_edge("record_turn", END)
+
     # Tool node always goes back to agent
     workflow.add_edge("tool_node", "agent")
-    
-    # Create the checkpointer with a connection pool
-    # This ensures we always get a fresh connection and avoid "connection closed" errors
-    from psycopg_pool import ConnectionPool
-    from core import constants
-    
-    pool = ConnectionPool(
-        conninfo=constants.POSTGRES_CONNECTION_URI,
-        max_size=20,
-        kwargs={
-            "autocommit": True,
-            "prepare_threshold": 0,
-            "row_factory": dict_row
-        }
-    )
-    checkpointer = PostgresSaver(pool)
-    
-    # Setup the database tables
-    try:
-        checkpointer.setup()
-    except Exception as e:
-        # Ignore DuplicateColumn error if it's already set up
-        if "DuplicateColumn" in str(e) or "already exists" in str(e):
-            print(f"Database setup warning (safe to ignore): {e}")
-        else:
-            print(f"Database setup error: {e}")
-    
+
+    if checkpointer is None:
+        checkpointer = create_checkpointer()
+
     # Compile the workflow with checkpointing
     app = workflow.compile(checkpointer=checkpointer)
-    
+
     print("Agent workflow compiled successfully!")
     return app
 
 def get_workflow_visualization(app):
     """
     Get a visualization of the workflow graph (if mermaid is available).
-    
+
     Args:
         app: Compiled LangGraph application
-        
+
     Returns:
         Mermaid diagram string or None if not available
     """
@@ -99,4 +227,4 @@ def get_workflow_visualization(app):
         return app.get_graph().draw_mermaid()
     except Exception as e:
         print(f"Could not generate workflow visualization: {e}")
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,40 @@
+"""llm completion cache
+
+Revision ID: b8c9d0e1f2a3
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8c9d0e1f2a3'
+down_revision: Union[str, Sequence[str], None] = 'f6a7b8c9d0e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    if 'llm_completion_cache' not in inspector.get_table_names():
+        op.create_table('llm_completion_cache',
+            sa.Column('key', sa.String(length=64), nullable=False),
+            sa.Column('model_name', sa.String(), nullable=False),
+            sa.Column('chunks', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+            sa.Column('hit_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+            sa.PrimaryKeyConstraint('key')
+        )
+        op.create_index(op.f('ix_llm_completion_cache_created_at'), 'llm_completion_cache', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_llm_completion_cache_created_at'), table_name='llm_completion_cache')
+    op.drop_table('llm_completion_cache')
@@ -0,0 +1,37 @@
+"""embedding cache
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9d0e1f2a3b4'
+down_revision: Union[str, Sequence[str], None] = 'b8c9d0e1f2a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    if 'embedding_cache' not in inspector.get_table_names():
+        op.create_table('embedding_cache',
+            sa.Column('model', sa.String(), nullable=False),
+            sa.Column('task_type', sa.String(), nullable=False),
+            sa.Column('text_hash', sa.String(length=64), nullable=False),
+            sa.Column('embedding', sa.LargeBinary(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+            sa.PrimaryKeyConstraint('model', 'task_type', 'text_hash')
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('embedding_cache')
@@ -0,0 +1,41 @@
+"""semantic memory hnsw index
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd0e1f2a3b4c5'
+down_revision: Union[str, Sequence[str], None] = 'c9d0e1f2a3b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Searches rank by cosine distance (<=>), so the index needs
+    # vector_cosine_ops. HNSW indexes cannot hold user_id as well; the
+    # user filter is served in two ways instead:
+    #   - ix_semantic_memories_user_id (btree) when a user has few
+    #     memories, where an exact scan of their rows is cheapest
+    #   - this index when the planner prefers ordering by distance, with
+    #     hnsw.ef_search / hnsw.iterative_scan set per query so the filter
+    #     does not starve the top-k (see MEMORY_HNSW_* settings)
+    # CONCURRENTLY keeps the table writable while the graph builds
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_semantic_memories_embedding_hnsw
+            ON semantic_memories
+            USING hnsw (embedding vector_cosine_ops)
+            WITH (m = 16, ef_construction = 64)
+        """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_semantic_memories_embedding_hnsw")
@@ -0,0 +1,110 @@
+"""chat messages read model
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6g7h8i9
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f6a7b8c9d0'
+down_revision: Union[str, Sequence[str], None] = 'd4e5f6g7h8i9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BACKFILL_BATCH_SIZE = 500
+ROLES = {"human": "user", "ai": "assistant"}
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    existing_tables = inspector.get_table_names()
+
+    if 'chat_messages' not in existing_tables:
+        op.create_table('chat_messages',
+            sa.Column('thread_id', sa.String(), nullable=False),
+            sa.Column('seq', sa.Integer(), nullable=False),
+            sa.Column('message_id', sa.String(), nullable=True),
+            sa.Column('role', sa.String(), nullable=False),
+            sa.Column('content', sa.Text(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+            sa.PrimaryKeyConstraint('thread_id', 'seq')
+        )
+
+    # Backfill from the latest checkpoint of every existing thread
+    if 'checkpoints' in existing_tables:
+        _backfill_from_checkpoints(conn)
+
+
+def _backfill_from_checkpoints(conn) -> None:
+    """Copy the messages of each thread's latest checkpoint into chat_messages."""
+    from psycopg import Connection
+    from psycopg.rows import dict_row
+    from langgraph.checkpoint.postgres import PostgresSaver
+    from core import constants
+
+    thread_ids = [
+        row[0] for row in conn.execute(sa.text(
+            "SELECT DISTINCT thread_id FROM checkpoints WHERE checkpoint_ns = ''"
+        ))
+    ]
+    if not thread_ids:
+        return
+
+    insert = sa.text("""
+        INSERT INTO chat_messages (thread_id, seq, message_id, role, content, created_at)
+        VALUES (:thread_id, :seq, :message_id, :role, :content, COALESCE(CAST(:created_at AS TIMESTAMPTZ), now()))
+        ON CONFLICT (thread_id, seq) DO NOTHING
+    """)
+
+    # The saver decodes the serialized channel values for us
+    with Connection.connect(
+        constants.POSTGRES_CONNECTION_URI,
+        autocommit=True,
+        prepare_threshold=0,
+        row_factory=dict_row,
+    ) as saver_conn:
+        saver = PostgresSaver(saver_conn)
+        batch = []
+        for thread_id in thread_ids:
+            checkpoint_tuple = saver.get_tuple(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+            )
+            if checkpoint_tuple is None:
+                continue
+            checkpoint = checkpoint_tuple.checkpoint
+            messages = checkpoint.get("channel_values", {}).get("messages") or []
+            for seq, message in enumerate(messages):
+                batch.append({
+                    "thread_id": thread_id,
+                    "seq": seq,
+                    "message_id": str(message.id) if message.id else None,
+                    "role": ROLES.get(message.type, "tool"),
+                    "content": _message_text(message.content),
+                    "created_at": checkpoint.get("ts"),
+                })
+            if len(batch) >= BACKFILL_BATCH_SIZE:
+                conn.execute(insert, batch)
+                batch = []
+        if batch:
+            conn.execute(insert, batch)
+
+
+def _message_text(content) -> str:
+    if isinstance(content, list):
+        content = " ".join(
+            str(part.get("text", "")) if isinstance(part, dict) else str(part)
+            for part in content
+        )
+    return content if isinstance(content, str) else str(content or "")
+
+
+def downgrade() -> None:
+    op.drop_table('chat_messages')
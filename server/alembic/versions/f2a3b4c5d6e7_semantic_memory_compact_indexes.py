@@ -0,0 +1,50 @@
+"""semantic memory compact vector indexes
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a3b4c5d6e7'
+down_revision: Union[str, Sequence[str], None] = 'e1f2a3b4c5d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Candidate indexes for VECTOR_STORAGE_MODE=halfvec / binary (pgvector
+    # >= 0.7). They are expression indexes, so the compact copies live only
+    # in the index: nothing is added to the table, there is nothing to
+    # backfill and new rows are covered as they are written. Per vector:
+    #   - full (ix_semantic_memories_embedding_hnsw): 768 x 4 bytes
+    #   - halfvec: 768 x 2 bytes
+    #   - binary: 768 bits = 96 bytes
+    # The full vector in the table is what candidates are reranked against.
+    # ix_semantic_memories_embedding_hnsw stays: it is declared on the
+    # SemanticMemory model and serves VECTOR_STORAGE_MODE=full.
+    # CONCURRENTLY keeps the table writable while the graphs build
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_semantic_memories_embedding_halfvec_hnsw
+            ON semantic_memories
+            USING hnsw ((embedding::halfvec(768)) halfvec_cosine_ops)
+            WITH (m = 16, ef_construction = 64)
+        """)
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_semantic_memories_embedding_bit_hnsw
+            ON semantic_memories
+            USING hnsw ((binary_quantize(embedding)::bit(768)) bit_hamming_ops)
+            WITH (m = 16, ef_construction = 64)
+        """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_semantic_memories_embedding_bit_hnsw")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_semantic_memories_embedding_halfvec_hnsw")
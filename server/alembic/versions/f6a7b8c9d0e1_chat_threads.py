@@ -0,0 +1,97 @@
+"""chat threads index table
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a7b8c9d0e1'
+down_revision: Union[str, Sequence[str], None] = 'e5f6a7b8c9d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    existing_tables = inspector.get_table_names()
+
+    if 'chat_threads' not in existing_tables:
+        op.create_table('chat_threads',
+            sa.Column('thread_id', sa.String(), nullable=False),
+            sa.Column('user_id', sa.String(), nullable=False),
+            sa.Column('title', sa.String(), nullable=False),
+            sa.Column('last_message_preview', sa.String(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+            sa.Column('message_count', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('thread_id')
+        )
+        op.create_index(
+            'ix_chat_threads_user_updated',
+            'chat_threads',
+            ['user_id', sa.text('updated_at DESC'), sa.text('thread_id DESC')],
+            unique=False,
+        )
+
+    # Backfill from chat_messages; the owner only lives in checkpoint metadata
+    if 'checkpoints' in existing_tables:
+        conn.execute(sa.text("""
+            WITH owners AS (
+                SELECT DISTINCT ON (thread_id) thread_id, metadata->>'user_id' AS user_id
+                FROM checkpoints
+                WHERE checkpoint_ns = '' AND metadata->>'user_id' IS NOT NULL
+                ORDER BY thread_id, checkpoint_id DESC
+            ),
+            stats AS (
+                SELECT thread_id, count(*) AS message_count,
+                       min(created_at) AS created_at, max(created_at) AS updated_at
+                FROM chat_messages
+                GROUP BY thread_id
+            ),
+            titles AS (
+                SELECT DISTINCT ON (thread_id) thread_id, content
+                FROM chat_messages
+                WHERE role = 'user'
+                ORDER BY thread_id, seq
+            ),
+            previews AS (
+                SELECT DISTINCT ON (thread_id) thread_id, content
+                FROM chat_messages
+                ORDER BY thread_id, seq DESC
+            )
+            INSERT INTO chat_threads (
+                thread_id, user_id, title, last_message_preview,
+                created_at, updated_at, message_count
+            )
+            SELECT
+                stats.thread_id,
+                owners.user_id,
+                COALESCE(
+                    NULLIF(left(titles.content, 50)
+                        || CASE WHEN length(titles.content) > 50 THEN '...' ELSE '' END, ''),
+                    'New Chat'
+                ),
+                COALESCE(left(previews.content, 100)
+                    || CASE WHEN length(previews.content) > 100 THEN '...' ELSE '' END, ''),
+                stats.created_at,
+                stats.updated_at,
+                stats.message_count
+            FROM stats
+            JOIN owners ON owners.thread_id = stats.thread_id
+            LEFT JOIN titles ON titles.thread_id = stats.thread_id
+            LEFT JOIN previews ON previews.thread_id = stats.thread_id
+            ON CONFLICT (thread_id) DO NOTHING
+        """))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chat_threads_user_updated', table_name='chat_threads')
+    op.drop_table('chat_threads')
@@ -1,5 +1,7 @@
 # chat/router.py
-from fastapi import APIRouter, Depends, Request
+from typing import Optional
+from datetime import datetime
+from fastapi import APIRouter, Depends, Request, Query
 from sqlalchemy.orm import Session
 from core.database import get_orm_session
 from .service import ChatService
@@ -29,26 +31,43 @@ def send_message(
     chat_service: ChatService = Depends(get_chat_service),
 ):
     user_id = request.state.user['userId']
-    return chat_service.send_message(message, user_id)
+    is_guest = request.state.user.get('isGuest', False)
+    return chat_service.send_message(message, user_id, is_guest=is_guest)
 
 
 # IMPORTANT: More specific routes must come before generic ones
 @chat_router.get("/threads/list")
 def list_user_threads(
     request: Request,
+    limit: int = Query(50, ge=1, le=200),
+    before_updated_at: Optional[datetime] = Query(None),
+    before_thread_id: Optional[str] = Query(None),
     service: ChatService = Depends(get_chat_service)
 ):
     user_id = request.state.user['userId']
     print("user_id", user_id)
-    return service.list_user_threads(user_id)
+    return service.list_user_threads(
+        user_id,
+        limit=limit,
+        before_updated_at=before_updated_at,
+        before_thread_id=before_thread_id,
+    )
 
 
 
 @chat_router.get("/{thread_id}")
-def get_latest_messages(thread_id: str, service: ChatService = Depends(get_chat_service)):
+def get_latest_messages(
+    request: Request,
+    thread_id: str,
+    limit: int = Query(50, ge=1, le=200),
+    before_seq: Optional[int] = Query(None, ge=0),
+    service: ChatService = Depends(get_chat_service),
+):
     print(f"Fetching messages for thread_id: {thread_id}")
-    messages = service.get_latest_messages(thread_id)
+    user_id = request.state.user['userId']
+    messages = service.get_latest_messages(
+        thread_id, user_id, limit=limit, before_seq=before_seq
+    )
     print(f"Found {len(messages) if messages else 0} messages")
-    print(f"Messages: {messages}")
     return messages
 
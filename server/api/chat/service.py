@@ -1,5 +1,6 @@
 # chat/service.py
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from agent import Agent
@@ -15,7 +16,7 @@ class ChatService:
         self.db = db
         self.agent = agent
 
-    def send_message(self, message: ChatMessageDTO, user_id: str):
+    def send_message(self, message: ChatMessageDTO, user_id: str, is_guest: bool = False):
         thread_id = message.thread_id or str(uuid4())
 
         # return "Helloo"
@@ -24,65 +25,134 @@ class ChatService:
             user_input=message.user_input,
             thread_id=thread_id,
             user_id=user_id,
+            is_guest=is_guest,
         )
 
 
 
-    def get_latest_messages(self, thread_id: str, limit: int = 10) -> List[dict]:
+    def user_owns_thread(self, user_id: str, thread_id: str) -> bool:
         """
-        Retrieve the latest messages for a given thread_id using the agent state.
+        Check that a thread was created by the user.
+
+        chat_threads keeps the user of a thread's first turn, so this is a
+        primary key lookup.
         """
-        return self.agent.get_conversation_history(thread_id)
+        query = text("""
+            SELECT EXISTS (
+                SELECT 1
+                FROM chat_threads
+                WHERE thread_id = :thread_id
+                  AND user_id = :user_id
+            )
+        """)
+        return bool(self.db.execute(query, {"user_id": user_id, "thread_id": thread_id}).scalar())
 
-    def list_user_threads(self, user_id: str) -> List[dict]:
+    def get_latest_messages(
+        self,
+        thread_id: str,
+        user_id: str,
+        limit: int = 50,
+        before_seq: Optional[int] = None,
+    ) -> List[dict]:
         """
-        List all chat threads for a user by querying the checkpoints table.
-        Returns a list of threads with their metadata.
+        Retrieve the latest messages for a given thread_id from chat_messages.
+
+        Pages backwards with a keyset on seq: pass the smallest seq of the
+        previous page as before_seq to load older messages.
+
+        Args:
+            thread_id: Thread to read
+            user_id: Requesting user; other users' threads read as empty
+            limit: Maximum number of messages to return
+            before_seq: Only return messages older than this seq
+
+        Returns:
+            Messages in chronological order
         """
+        if not self.user_owns_thread(user_id, thread_id):
+            return []
+
         query = text("""
-            SELECT DISTINCT
-                thread_id,
-                MAX(checkpoint_id) as latest_checkpoint_id
-            FROM checkpoints
-            WHERE metadata->>'user_id' = :user_id
-            GROUP BY thread_id
-            ORDER BY latest_checkpoint_id DESC
+            SELECT seq, message_id, role, content, created_at
+            FROM chat_messages
+            WHERE thread_id = :thread_id
+              AND (CAST(:before_seq AS INTEGER) IS NULL OR seq < :before_seq)
+            ORDER BY seq DESC
+            LIMIT :limit
         """)
-        
-        result = self.db.execute(query, {"user_id": user_id})
-        threads = []
-        
-        for row in result:
-            thread_id = row.thread_id
-            # Get the first message to use as title
-            messages = self.get_latest_messages(thread_id, limit=1)
-            
-            title = "New Chat"
-            last_message = ""
-            
-            if messages:
-                first_msg = messages[0]
-                # Use first user message as title
-                if first_msg.get('role') == 'user':
-                    content = first_msg.get('content')
-                    
-                    # Handle potential list content (multimodal)
-                    if isinstance(content, list):
-                        content = " ".join([str(c.get('text', '')) for c in content if isinstance(c, dict) and 'text' in c])
-                    
-                    # Ensure content is string
-                    if not isinstance(content, str):
-                        content = str(content) if content is not None else ""
-                        
-                    title = content[:50] + ('...' if len(content) > 50 else '')
-                    last_message = content[:100]
-            
-            threads.append({
-                "id": thread_id,
-                "title": title,
-                "lastMessage": last_message,
-                "timestamp": None
-            })
-        
-        return threads
 
+        rows = self.db.execute(
+            query,
+            {"thread_id": thread_id, "before_seq": before_seq, "limit": limit},
+        ).all()
+
+        return [
+            {
+                "id": row.message_id or f"{thread_id}:{row.seq}",
+                "seq": row.seq,
+                "role": row.role,
+                "content": row.content,
+                "timestamp": row.created_at,
+            }
+            for row in reversed(rows)
+        ]
+
+    def list_user_threads(
+        self,
+        user_id: str,
+        limit: int = 50,
+        before_updated_at: Optional[datetime] = None,
+        before_thread_id: Optional[str] = None,
+    ) -> List[dict]:
+        """
+        List a user's chat threads, most recently active first.
+
+        Served by one indexed query on chat_threads. Pass the timestamp and
+        id of the last thread of the previous page to load the next page.
+
+        Args:
+            user_id: Owner of the threads
+            limit: Maximum number of threads to return
+            before_updated_at: Keyset cursor, updated_at of the last thread seen
+            before_thread_id: Keyset cursor, id of the last thread seen
+
+        Returns:
+            List of threads with their metadata
+        """
+        if before_updated_at is None:
+            query = text("""
+                SELECT thread_id, title, last_message_preview, updated_at, message_count
+                FROM chat_threads
+                WHERE user_id = :user_id
+                ORDER BY updated_at DESC, thread_id DESC
+                LIMIT :limit
+            """)
+        else:
+            query = text("""
+                SELECT thread_id, title, last_message_preview, updated_at, message_count
+                FROM chat_threads
+                WHERE user_id = :user_id
+                  AND (updated_at, thread_id) < (:before_updated_at, :before_thread_id)
+                ORDER BY updated_at DESC, thread_id DESC
+                LIMIT :limit
+            """)
+
+        result = self.db.execute(query, {
+            "user_id": user_id,
+            "limit": limit,
+            "before_updated_at": before_updated_at,
+            # An empty id sorts before every thread id, so the cursor
+            # timestamp alone bounds the page
+            "before_thread_id": before_thread_id or "",
+        })
+
+        return [
+            {
+                "id": row.thread_id,
+                "title": row.title,
+                "lastMessage": row.last_message_preview,
+                "timestamp": row.updated_at,
+                "messageCount": row.message_count,
+            }
+            for row in result
+        ]
@@ -1,11 +1,10 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 from uuid import UUID
 
 
 class MemoryCreateRequest(BaseModel):
-    user_id: str
     content: str
     importance: Optional[str] = "medium"
 
@@ -21,6 +20,31 @@ class SemanticMemoryDTO(BaseModel):
 
 
 class MemorySearchRequest(BaseModel):
+    search_text: str = Field(..., min_length=1)
+    similarity_threshold: float = Field(0.75, ge=0.0, le=1.0)
+    # Candidates per query reach top_k * MEMORY_RERANK_FACTOR, and
+    # hnsw.ef_search has to cover them
+    top_k: int = Field(5, ge=1, le=50)
+
+
+class MemorySearchResultDTO(SemanticMemoryDTO):
+    similarity: float
+
+
+class MemoryBatchSearchRequest(BaseModel):
+    # Every text is embedded, so the batch size is bounded like a page
+    search_texts: List[str] = Field(..., min_length=1, max_length=20)
+    similarity_threshold: float = Field(0.75, ge=0.0, le=1.0)
+    top_k: int = Field(5, ge=1, le=50)
+
+
+class MemoryBatchSearchResultDTO(BaseModel):
     search_text: str
-    similarity_threshold: float = 0.75
-    top_k: int = 5
+    results: List[MemorySearchResultDTO]
+
+
+class MemoryImportResultDTO(BaseModel):
+    rows: int
+    inserted: int
+    merged: int
+    skipped: int
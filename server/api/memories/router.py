@@ -1,9 +1,22 @@
 # memories/router.py
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, File, Query, Request, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from typing import Literal, Optional
+from datetime import datetime
+from uuid import UUID
 from core.database import get_orm_session
+from core.memory_transfer import MEDIA_TYPES
 from .service import MemoryService
-from .dto.dto import MemoryCreateRequest, MemorySearchRequest, SemanticMemoryDTO
+from .dto.dto import (
+    MemoryCreateRequest,
+    MemorySearchRequest,
+    MemoryBatchSearchRequest,
+    SemanticMemoryDTO,
+    MemorySearchResultDTO,
+    MemoryBatchSearchResultDTO,
+    MemoryImportResultDTO,
+)
 
 memories_router = APIRouter(prefix="/memories", tags=["Memories"])
 
@@ -12,37 +25,98 @@ def get_memory_service(db: Session = Depends(get_orm_session)) -> MemoryService:
     return MemoryService(db)
 
 
+# Every route acts on the signed-in user's own memories; guests are
+# rejected by AuthMiddleware before reaching them
+
 @memories_router.post("/", response_model=SemanticMemoryDTO)
 def create_memory(
-    request: MemoryCreateRequest,
+    request: Request,
+    memory: MemoryCreateRequest,
     service: MemoryService = Depends(get_memory_service),
 ):
+    user_id = request.state.user['userId']
     return service.add_memory(
-        user_id=request.user_id,
-        content=request.content,
-        importance=request.importance,
+        user_id=user_id,
+        content=memory.content,
+        importance=memory.importance,
     )
 
 
-@memories_router.get("/{user_id}", response_model=list[SemanticMemoryDTO])
-def list_memories(user_id: str, service: MemoryService = Depends(get_memory_service)):
-    return service.list_memories(user_id)
+@memories_router.get("/", response_model=list[SemanticMemoryDTO])
+def list_memories(
+    request: Request,
+    limit: int = Query(50, ge=1, le=200),
+    before_created_at: Optional[datetime] = Query(None),
+    before_id: Optional[UUID] = Query(None),
+    service: MemoryService = Depends(get_memory_service),
+):
+    user_id = request.state.user['userId']
+    return service.list_memories(
+        user_id,
+        limit=limit,
+        before_created_at=before_created_at,
+        before_id=before_id,
+    )
 
 
-@memories_router.post("/{user_id}/search", response_model=list[SemanticMemoryDTO])
+@memories_router.post("/search", response_model=list[MemorySearchResultDTO])
 def search_memories(
-    user_id: str,
-    request: MemorySearchRequest,
+    request: Request,
+    search: MemorySearchRequest,
     service: MemoryService = Depends(get_memory_service),
 ):
+    user_id = request.state.user['userId']
     return service.search_memories(
         user_id=user_id,
-        search_text=request.search_text,
-        similarity_threshold=request.similarity_threshold,
-        top_k=request.top_k,
+        search_text=search.search_text,
+        similarity_threshold=search.similarity_threshold,
+        top_k=search.top_k,
+    )
+
+
+@memories_router.post("/search/batch", response_model=list[MemoryBatchSearchResultDTO])
+def search_memories_batch(
+    request: Request,
+    search: MemoryBatchSearchRequest,
+    service: MemoryService = Depends(get_memory_service),
+):
+    user_id = request.state.user['userId']
+    return service.search_memories_batch(
+        user_id=user_id,
+        search_texts=search.search_texts,
+        similarity_threshold=search.similarity_threshold,
+        top_k=search.top_k,
+    )
+
+
+@memories_router.get("/export")
+def export_memories(
+    request: Request,
+    format: Literal["ndjson", "binary"] = Query("ndjson"),
+    service: MemoryService = Depends(get_memory_service),
+):
+    user_id = request.state.user['userId']
+    extension = "ndjson" if format == "ndjson" else "bin"
+    return StreamingResponse(
+        service.export_memories(user_id, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="memories.{extension}"'},
     )
 
 
-@memories_router.get("/{user_id}/count")
-def count_memories(user_id: str, service: MemoryService = Depends(get_memory_service)):
+# Only NDJSON is accepted here; binary and multi-user bulk imports go
+# through the CLI (python -m core.memory_transfer import)
+@memories_router.post("/import", response_model=MemoryImportResultDTO)
+def import_memories(
+    request: Request,
+    file: UploadFile = File(...),
+    service: MemoryService = Depends(get_memory_service),
+):
+    user_id = request.state.user['userId']
+    return service.import_memories(user_id, file.file)
+
+
+@memories_router.get("/count")
+def count_memories(request: Request, service: MemoryService = Depends(get_memory_service)):
+    user_id = request.state.user['userId']
     return {"count": service.count_memories(user_id)}
@@ -1,103 +1,173 @@
 # memories/service.py
-from typing import List, Optional
+from typing import BinaryIO, Dict, Iterator, List, Optional
 from sqlalchemy.orm import Session
 from core.database import get_orm_session
 from models import SemanticMemory
-# from sentence_transformers import SentenceTransformer
+from core.embeddings import embed_text, embed_texts, RETRIEVAL_QUERY, RETRIEVAL_DOCUMENT
+from core.vector_store import get_vector_store, STORE_LIMIT_REACHED
+from core import constants, memory_transfer
+from core.exceptions import ValidationException
 from sqlalchemy import func, text
+from datetime import datetime
+from uuid import UUID
 import logging
 
 logger = logging.getLogger(__name__)
 
+NIL_UUID = UUID(int=0)
+
 
 class MemoryService:
     def __init__(self, db: Session):
         self.db = db
-        # self.embedding_model = SentenceTransformer(
-        #     "sentence-transformers/all-MiniLM-L6-v2", trust_remote_code=True
-        # )
-
-    # def get_embedding(self, text: str, is_query: bool = False) -> List[float]:
-    #     try:
-    #         prefix = "search_query: " if is_query else "search_document: "
-    #         text = f"{prefix}{text}"
-    #         embedding = self.embedding_model.encode(text, convert_to_numpy=True)
-    #         return embedding.tolist()
-    #     except Exception as e:
-    #         logger.error(f"Error getting embedding: {e}")
-    #         return [0.0] * 768  # fallback vector
-    #         # return [0.0] * 384  # fallback vector
-
-    # def add_memory(self, user_id: str, content: str, importance: str = "medium"):
-    #     embedding = self.get_embedding(content, is_query=False)
-
-    #     new_memory = SemanticMemory(
-    #         user_id=user_id,
-    #         content=content,
-    #         importance=importance,
-    #         embedding=embedding,
-    #     )
-    #     self.db.add(new_memory)
-    #     self.db.commit()
-    #     self.db.refresh(new_memory)
-
-    #     return new_memory
-
-    # def list_memories(self, user_id: str) -> list[SemanticMemory]:
-    #     return (
-    #         self.db.query(SemanticMemory)
-    #         .filter(SemanticMemory.user_id == user_id)
-    #         .order_by(SemanticMemory.created_at.desc())
-    #         .all()
-    #     )
-
-    # def search_memories(
-    #     self,
-    #     user_id: str,
-    #     search_text: str,
-    #     similarity_threshold: float = 0.2,
-    #     top_k: int = 5,
-    # ):
-    #     # Generate query embedding
-    #     query_embedding = self.get_embedding(search_text, is_query=True)
-
-    #     sql = text("""
-    #         SELECT 
-    #             id,
-    #             content,
-    #             importance,
-    #             created_at,
-    #             1 - (embedding <=> (:embedding)::vector) AS similarity
-    #         FROM semantic_memories
-    #         WHERE user_id = :user_id
-    #         AND 1 - (embedding <=> (:embedding)::vector) > :threshold
-    #         ORDER BY similarity DESC
-    #         LIMIT :top_k
-    #     """)
-
-    #     rows = self.db.execute(
-    #         sql,
-    #         {
-    #             "embedding": f"[{','.join(map(str, query_embedding))}]",  # send as pgvector literal
-    #             "user_id": user_id,
-    #             "threshold": similarity_threshold,
-    #             "top_k": top_k,
-    #         }
-    #     ).fetchall()
-
-    #     # Convert rows to dicts so FastAPI can serialize them
-    #     results = [
-    #         {
-    #             "id": row.id,
-    #             "content": row.content,
-    #             "importance": row.importance,
-    #             "created_at": row.created_at,
-    #             "similarity": row.similarity,
-    #         }
-    #         for row in rows
-    #     ]
-
-    #     return results
+
+    def add_memory(self, user_id: str, content: str, importance: str = "medium") -> dict:
+        """
+        Store a memory, embedded with the shared embedding client.
+
+        Goes through the vector store like memories the agent saves, so
+        MEMORY_MAX_PER_USER applies and a near-duplicate is merged into the
+        existing memory instead of adding a row.
+
+        Returns:
+            The inserted or merged memory
+
+        Raises:
+            ValidationException: The user already has the maximum number of memories
+        """
+        outcome, memory = get_vector_store().store(
+            user_id,
+            content,
+            embed_text(content, task_type=RETRIEVAL_DOCUMENT),
+            importance,
+        )
+        if outcome == STORE_LIMIT_REACHED:
+            raise ValidationException(
+                "Memory limit reached",
+                detail=f"At most {constants.MEMORY_MAX_PER_USER} memories can be stored",
+            )
+        return memory
+
+    def list_memories(
+        self,
+        user_id: str,
+        limit: int = 50,
+        before_created_at: Optional[datetime] = None,
+        before_id: Optional[UUID] = None,
+    ) -> List[dict]:
+        """
+        List a user's memories, newest first.
+
+        Served by the ix_semantic_memories_user_created index. Pass the
+        timestamp and id of the last memory of the previous page to load the
+        next page.
+
+        Args:
+            user_id: Owner of the memories
+            limit: Maximum number of memories to return
+            before_created_at: Keyset cursor, created_at of the last memory seen
+            before_id: Keyset cursor, id of the last memory seen
+
+        Returns:
+            List of memories without their embeddings
+        """
+        if before_created_at is None:
+            query = text("""
+                SELECT id, user_id, content, importance, created_at
+                FROM semantic_memories
+                WHERE user_id = :user_id
+                ORDER BY created_at DESC, id DESC
+                LIMIT :limit
+            """)
+        else:
+            query = text("""
+                SELECT id, user_id, content, importance, created_at
+                FROM semantic_memories
+                WHERE user_id = :user_id
+                  AND (created_at, id) < (:before_created_at, :before_id)
+                ORDER BY created_at DESC, id DESC
+                LIMIT :limit
+            """)
+
+        result = self.db.execute(query, {
+            "user_id": user_id,
+            "limit": limit,
+            "before_created_at": before_created_at,
+            # The nil UUID sorts before every id, so the cursor timestamp
+            # alone bounds the page
+            "before_id": before_id or NIL_UUID,
+        })
+        return [dict(row) for row in result.mappings()]
+
+    def search_memories(
+        self,
+        user_id: str,
+        search_text: str,
+        similarity_threshold: float = 0.2,
+        top_k: int = 5,
+    ):
+        """
+        Search a user's memories by meaning.
+
+        The query is embedded with the shared embedding client and matched
+        through the configured vector store, like the retrieve_memory tool.
+        """
+        query_embedding = embed_text(search_text, task_type=RETRIEVAL_QUERY)
+
+        return get_vector_store().search(
+            user_id,
+            query_embedding,
+            top_k=top_k,
+            similarity_threshold=similarity_threshold,
+        )
+
+    def search_memories_batch(
+        self,
+        user_id: str,
+        search_texts: List[str],
+        similarity_threshold: float = 0.2,
+        top_k: int = 5,
+    ) -> List[dict]:
+        """
+        Search a user's memories for several queries at once.
+
+        All queries are embedded in one request and searched in one
+        database round trip.
+
+        Returns:
+            One {"search_text", "results"} entry per query, in request order
+        """
+        if not search_texts:
+            return []
+        embeddings = embed_texts(search_texts, task_type=RETRIEVAL_QUERY)
+        results = get_vector_store().search_many(
+            user_id,
+            embeddings,
+            top_k=top_k,
+            similarity_threshold=similarity_threshold,
+        )
+        return [
+            {"search_text": search_text, "results": query_results}
+            for search_text, query_results in zip(search_texts, results)
+        ]
+
+    def export_memories(self, user_id: str, fmt: str = memory_transfer.FORMAT_NDJSON) -> Iterator[bytes]:
+        """
+        Stream a user's memories, embeddings included, via COPY.
+        """
+        return memory_transfer.export_memories(fmt, [user_id])
+
+    def import_memories(self, user_id: str, file: BinaryIO) -> Dict[str, int]:
+        """
+        Load an NDJSON export into a user's memories.
+
+        Rows are stored like any other memory, so the per-user limit and
+        the near-duplicate merge apply.
+        """
+        try:
+            return memory_transfer.import_user_memories(file, user_id)
+        except ValueError as e:
+            raise ValidationException("Invalid memory import file", detail=str(e))
 
     # --- NEW: Count user memories ---
     def count_memories(self, user_id: str) -> int:
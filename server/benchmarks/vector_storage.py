@@ -0,0 +1,138 @@
+"""
+Benchmark: recall and latency of the VECTOR_STORAGE_MODE options.
+
+The in-process part needs neither Postgres nor pgvector: it builds a
+clustered set of unit vectors, quantizes it the way the compact indexes do
+(halfvec = float16, binary = sign bit per dimension) and measures recall@k
+of candidate pass + full-vector rerank against an exact float32 search,
+together with the bytes each mode stores per vector.
+
+With --pg-users the searches also run through PgVectorStore in every mode
+against the memories those users already have (the f2a3b4c5d6e7 indexes
+must exist), reporting latency and recall against an exact search of the
+same rows.
+
+Usage (from the server directory):
+    python -m benchmarks.vector_storage --vectors 10000,100000
+    python -m benchmarks.vector_storage --pg-users <user_id>,<user_id>
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from core.vector_store import STORAGE_FULL, STORAGE_HALFVEC, STORAGE_BINARY
+
+MODES = (STORAGE_FULL, STORAGE_HALFVEC, STORAGE_BINARY)
+
+
+def bytes_per_vector(mode: str, dim: int) -> int:
+    """Size of one vector in the mode's index, without per-entry overhead."""
+    if mode == STORAGE_HALFVEC:
+        return dim * 2
+    if mode == STORAGE_BINARY:
+        return (dim + 7) // 8
+    return dim * 4
+
+
+def clustered_vectors(rng: np.random.Generator, count: int, dim: int, clusters: int) -> np.ndarray:
+    """Unit vectors around a few centres, closer to real embeddings than pure noise."""
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centres[rng.integers(0, clusters, count)] + rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def candidate_pass(mode: str, vectors: np.ndarray, query: np.ndarray, limit: int) -> np.ndarray:
+    """Indices of the limit best vectors by the mode's compact representation."""
+    if mode == STORAGE_HALFVEC:
+        scores = vectors.astype(np.float16).astype(np.float32) @ query.astype(np.float16).astype(np.float32)
+    elif mode == STORAGE_BINARY:
+        bits = np.packbits(vectors > 0, axis=1)
+        query_bits = np.packbits(query > 0)
+        # Fewer differing bits is better
+        scores = -np.bitwise_count(bits ^ query_bits).sum(axis=1).astype(np.float32)
+    else:
+        scores = vectors @ query
+    limit = min(limit, scores.shape[0])
+    return np.argpartition(-scores, limit - 1)[:limit]
+
+
+def search(mode: str, vectors: np.ndarray, query: np.ndarray, top_k: int, rerank_factor: int) -> set:
+    limit = top_k if mode == STORAGE_FULL else top_k * rerank_factor
+    candidates = candidate_pass(mode, vectors, query, limit)
+    exact = vectors[candidates] @ query
+    return set(candidates[np.argsort(-exact)[:top_k]].tolist())
+
+
+def run_memory(sizes: list, dim: int, top_k: int, rerank_factor: int, repeat: int, clusters: int) -> None:
+    rng = np.random.default_rng(0)
+    print(f"{'mode':<8} | {'vectors':>8} | {'bytes/vector':>12} | {'recall@k':>8}")
+    print("-" * 46)
+    for size in sizes:
+        vectors = clustered_vectors(rng, size, dim, clusters)
+        queries = clustered_vectors(rng, repeat, dim, clusters)
+        truth = [search(STORAGE_FULL, vectors, query, top_k, 1) for query in queries]
+        for mode in MODES:
+            found = [search(mode, vectors, query, top_k, rerank_factor) for query in queries]
+            recall = statistics.mean(len(f & t) / len(t) for f, t in zip(found, truth))
+            print(f"{mode:<8} | {size:>8} | {bytes_per_vector(mode, dim):>12} | {recall:>8.3f}")
+
+
+def run_postgres(user_ids: list, top_k: int, rerank_factor: int, repeat: int) -> None:
+    from core.vector_store import InMemoryVectorStore, PgVectorStore
+
+    rng = np.random.default_rng(0)
+    exact = InMemoryVectorStore(backing=PgVectorStore(), max_users=len(user_ids))
+    # Queries near stored memories, like a user asking about something they said
+    queries = []
+    for i in range(repeat):
+        user_id = user_ids[i % len(user_ids)]
+        rows = exact.backing.load_user(user_id)
+        if not rows:
+            continue
+        vector = np.asarray(rows[rng.integers(0, len(rows))]["embedding"], dtype=np.float32)
+        queries.append((user_id, vector + rng.standard_normal(vector.shape[0]).astype(np.float32) * 0.02))
+    if not queries:
+        print("The given users have no memories")
+        return
+    truth = [{row["id"] for row in exact.search(user_id, query, top_k=top_k)} for user_id, query in queries]
+
+    print(f"{'mode':<8} | {'p50 ms':>8} | {'p95 ms':>8} | {'recall@k':>8}")
+    print("-" * 42)
+    for mode in MODES:
+        store = PgVectorStore(storage_mode=mode, rerank_factor=rerank_factor)
+        samples, recalls = [], []
+        for (user_id, query), expected in zip(queries, truth):
+            started = time.perf_counter()
+            found = {row["id"] for row in store.search(user_id, query, top_k=top_k)}
+            samples.append((time.perf_counter() - started) * 1000)
+            recalls.append(len(found & expected) / len(expected) if expected else 1.0)
+        samples.sort()
+        p95 = samples[max(int(len(samples) * 0.95) - 1, 0)]
+        print(f"{mode:<8} | {statistics.median(samples):>8.3f} | {p95:>8.3f} | {statistics.mean(recalls):>8.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", default="10000,100000",
+                        help="Comma separated collection sizes for the in-process part (default: %(default)s)")
+    parser.add_argument("--dim", type=int, default=768, help="Embedding dimension")
+    parser.add_argument("--clusters", type=int, default=50, help="Clusters in the generated vectors")
+    parser.add_argument("--top-k", type=int, default=5, help="Results per search")
+    parser.add_argument("--rerank-factor", type=int, default=4, help="Candidates per result in compact modes")
+    parser.add_argument("--repeat", type=int, default=200, help="Searches per size and mode")
+    parser.add_argument("--pg-users", default="",
+                        help="Comma separated existing user ids to also search through PgVectorStore")
+    args = parser.parse_args()
+
+    sizes = sorted(int(size) for size in args.vectors.split(","))
+    run_memory(sizes, args.dim, args.top_k, args.rerank_factor, args.repeat, args.clusters)
+    if args.pg_users:
+        run_postgres([u.strip() for u in args.pg_users.split(",") if u.strip()],
+                     args.top_k, args.rerank_factor, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
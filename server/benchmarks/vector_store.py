@@ -0,0 +1,91 @@
+"""
+Benchmark: memory search latency per VectorStore backend.
+
+Fills an InMemoryVectorStore (no backing store, so neither Postgres nor
+pgvector is needed) with random unit vectors for many users and times
+top-k searches at several memories-per-user sizes. With --pg-users the
+same random queries are also timed through PgVectorStore against the
+memories those users already have in semantic_memories.
+
+Usage (from the server directory):
+    python -m benchmarks.vector_store --memories 11,100,1000
+    python -m benchmarks.vector_store --pg-users <user_id>,<user_id>
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from core.vector_store import InMemoryVectorStore
+
+
+def time_searches(store, users: list, queries: np.ndarray, top_k: int) -> tuple:
+    """Median and p95 search latency in milliseconds."""
+    samples = []
+    for i, query in enumerate(queries):
+        started = time.perf_counter()
+        store.search(users[i % len(users)], query, top_k=top_k)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def random_vectors(rng: np.random.Generator, count: int, dim: int) -> np.ndarray:
+    vectors = rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def run_memory(sizes: list, users: int, dim: int, top_k: int, repeat: int) -> None:
+    rng = np.random.default_rng(0)
+    print(f"{'backend':<8} | {'memories/user':>13} | {'p50 ms':>8} | {'p95 ms':>8}")
+    print("-" * 47)
+    for size in sizes:
+        store = InMemoryVectorStore(backing=None, max_users=users)
+        user_ids = [f"user-{u}" for u in range(users)]
+        for user_id in user_ids:
+            for i, vector in enumerate(random_vectors(rng, size, dim)):
+                store.add(user_id, f"memory {i}", vector)
+
+        p50, p95 = time_searches(store, user_ids, random_vectors(rng, repeat, dim), top_k)
+        print(f"{'memory':<8} | {size:>13} | {p50:>8.3f} | {p95:>8.3f}")
+
+
+def run_postgres(user_ids: list, dim: int, top_k: int, repeat: int) -> None:
+    from core.vector_store import PgVectorStore
+
+    rng = np.random.default_rng(0)
+    queries = random_vectors(rng, repeat, dim)
+    pg = PgVectorStore()
+    cached = InMemoryVectorStore(backing=pg, max_users=len(user_ids))
+    # Load every user once so only the searches are timed
+    for user_id in user_ids:
+        cached.count(user_id)
+
+    for name, store in (("pgvector", pg), ("memory", cached)):
+        p50, p95 = time_searches(store, user_ids, queries, top_k)
+        memories = sum(pg.count(user_id) for user_id in user_ids) // len(user_ids)
+        print(f"{name:<8} | {memories:>13} | {p50:>8.3f} | {p95:>8.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--memories", default="11,100,1000",
+                        help="Comma separated memories per user to measure at (default: %(default)s)")
+    parser.add_argument("--users", type=int, default=100, help="Users in the in-memory store")
+    parser.add_argument("--dim", type=int, default=768, help="Embedding dimension")
+    parser.add_argument("--top-k", type=int, default=3, help="Results per search")
+    parser.add_argument("--repeat", type=int, default=2000, help="Timed searches per size")
+    parser.add_argument("--pg-users", default="",
+                        help="Comma separated existing user ids to also search through PgVectorStore")
+    args = parser.parse_args()
+
+    sizes = sorted(int(size) for size in args.memories.split(","))
+    run_memory(sizes, args.users, args.dim, args.top_k, args.repeat)
+    if args.pg_users:
+        run_postgres([u.strip() for u in args.pg_users.split(",") if u.strip()], args.dim, args.top_k, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,9 @@ import logging
 from typing import Optional, Generator, TYPE_CHECKING
 from psycopg import Connection
 from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool, ConnectionPool
+from contextlib import contextmanager
+import threading
 from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.declarative import declarative_base
@@ -115,6 +118,132 @@ def get_psycopg_db_connection() -> Connection:
     )
 
 
+# ---------------------------------------------------------
+# Shared sync connection pool (for tools and other thread-side queries)
+# ---------------------------------------------------------
+_psycopg_pool: Optional[ConnectionPool] = None
+_psycopg_pool_lock = threading.Lock()
+
+
+def get_psycopg_pool() -> ConnectionPool:
+    """
+    Return the process-wide sync psycopg pool, opening it on first use.
+
+    Connections are configured like get_psycopg_db_connection() (autocommit,
+    no prepared statements, dict rows), so callers can switch over without
+    changing their queries.
+    """
+    global _psycopg_pool
+    if _psycopg_pool is None:
+        with _psycopg_pool_lock:
+            if _psycopg_pool is None:
+                _psycopg_pool = ConnectionPool(
+                    conninfo=constants.POSTGRES_CONNECTION_URI,
+                    min_size=constants.DB_POOL_MIN_SIZE,
+                    max_size=constants.DB_POOL_MAX_SIZE,
+                    name="helion-sync",
+                    open=True,
+                    kwargs={
+                        "autocommit": True,
+                        "prepare_threshold": 0,
+                        "row_factory": dict_row,
+                    },
+                )
+    return _psycopg_pool
+
+
+@contextmanager
+def pooled_connection() -> Generator[Connection, None, None]:
+    """
+    Check a connection out of the shared pool for the duration of a block.
+
+    The connection is always returned to the pool, also on errors; an open
+    transaction is rolled back on return.
+
+    Usage:
+        with pooled_connection() as conn:
+            conn.execute(...)
+    """
+    with get_psycopg_pool().connection() as conn:
+        yield conn
+
+
+def get_pool_stats() -> dict:
+    """Usage counters of the shared pools (psycopg_pool get_stats())."""
+    stats = {}
+    if _psycopg_pool is not None:
+        stats["sync"] = _psycopg_pool.get_stats()
+    if _async_pool is not None:
+        stats["async"] = _async_pool.get_stats()
+    return stats
+
+
+def close_psycopg_pool() -> None:
+    """Close the sync pool on shutdown."""
+    global _psycopg_pool
+    if _psycopg_pool is not None:
+        pool, _psycopg_pool = _psycopg_pool, None
+        try:
+            pool.close()
+        except Exception as e:
+            logger.error(f"Error closing psycopg pool: {e}")
+
+
+# ---------------------------------------------------------
+# Shared async connection pool (for LangGraph AsyncPostgresSaver)
+# ---------------------------------------------------------
+_async_pool: Optional[AsyncConnectionPool] = None
+
+
+async def open_async_pool() -> AsyncConnectionPool:
+    """
+    Open the process-wide async psycopg pool.
+
+    Must be awaited inside the running event loop (the FastAPI lifespan),
+    since the pool's workers bind to it. Calling it again returns the
+    already-open pool.
+    """
+    global _async_pool
+    if _async_pool is None:
+        pool = AsyncConnectionPool(
+            conninfo=constants.POSTGRES_CONNECTION_URI,
+            min_size=constants.CHECKPOINT_POOL_MIN_SIZE,
+            max_size=constants.CHECKPOINT_POOL_MAX_SIZE,
+            open=False,
+            kwargs={
+                "autocommit": True,
+                "prepare_threshold": 0,
+                "row_factory": dict_row,
+            },
+        )
+        await pool.open()
+        _async_pool = pool
+        logger.info(
+            f"Async connection pool opened "
+            f"(min={constants.CHECKPOINT_POOL_MIN_SIZE}, max={constants.CHECKPOINT_POOL_MAX_SIZE})"
+        )
+    return _async_pool
+
+
+def get_async_pool() -> AsyncConnectionPool:
+    """Return the open async pool; open_async_pool() must have run first."""
+    if _async_pool is None:
+        raise RuntimeError("Async connection pool is not open; call open_async_pool() first")
+    return _async_pool
+
+
+async def close_async_pool() -> None:
+    """Close the async pool on shutdown, waiting for checked-out connections."""
+    global _async_pool
+    if _async_pool is not None:
+        pool, _async_pool = _async_pool, None
+        try:
+            await pool.close()
+            logger.info("Async connection pool closed")
+        except Exception as e:
+            logger.error(f"Error closing async connection pool: {e}")
+
+
 def close_psycopg_connection(connection: Optional[Connection]) -> None:
     """Close a psycopg3 connection safely."""
     if connection:
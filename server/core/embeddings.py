@@ -0,0 +1,501 @@
+"""
+Shared embedding client for Helion.
+Every embedding consumer goes through this module so they share one
+GoogleGenerativeAIEmbeddings client, one two-tier embedding cache (an
+in-process LRU bounded by bytes, backed by the embedding_cache table) and
+one micro-batching queue in front of the embedding API.
+"""
+
+import asyncio
+import hashlib
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import lru_cache
+from typing import List, Optional
+import numpy as np
+from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+from . import constants
+
+
+logger = logging.getLogger(__name__)
+
+# Gemini embedding task types
+RETRIEVAL_QUERY = "RETRIEVAL_QUERY"
+RETRIEVAL_DOCUMENT = "RETRIEVAL_DOCUMENT"
+
+_SELECT_SQL = """
+    SELECT embedding FROM embedding_cache
+    WHERE model = %(model)s AND task_type = %(task_type)s AND text_hash = %(text_hash)s
+"""
+
+_INSERT_SQL = """
+    INSERT INTO embedding_cache (model, task_type, text_hash, embedding)
+    VALUES (%(model)s, %(task_type)s, %(text_hash)s, %(embedding)s)
+    ON CONFLICT (model, task_type, text_hash) DO NOTHING
+"""
+
+
+@lru_cache(maxsize=4)
+def get_embedding_model(model_name: str = constants.EMBEDDING_MODEL_NAME) -> GoogleGenerativeAIEmbeddings:
+    """
+    Get the process-wide embedding client for a model.
+
+    Args:
+        model_name: Google embedding model name
+
+    Returns:
+        Cached GoogleGenerativeAIEmbeddings instance
+    """
+    return GoogleGenerativeAIEmbeddings(
+        model=model_name,
+        google_api_key=constants.GOOGLE_API_KEY,
+    )
+
+
+def text_hash(text: str) -> str:
+    """sha256 of the text, used as the cache key instead of the text itself."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier cache of embeddings keyed by (model, task type, sha256(text)).
+
+    Vectors are kept as float32 arrays; the in-process tier evicts least
+    recently used vectors once their total size exceeds max_bytes. The
+    Postgres tier stores the raw float32 bytes and survives restarts.
+    Database errors are logged and treated as misses.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = constants.EMBEDDING_CACHE_MAX_BYTES,
+        use_db: bool = constants.EMBEDDING_CACHE_PERSIST,
+    ):
+        self.max_bytes = max_bytes
+        self.use_db = use_db
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def get(self, model: str, task_type: str, text: str) -> Optional[np.ndarray]:
+        """
+        Look up a cached embedding.
+
+        Returns:
+            np.ndarray: float32 vector, or None on a miss
+        """
+        key = (model, task_type, text_hash(text))
+        vector = self._get_memory(key)
+        if vector is not None:
+            return vector
+        if self.use_db:
+            vector = self._get_db(key)
+        self._count(vector)
+        if vector is not None:
+            self._put_memory(key, vector)
+        return vector
+
+    async def aget(self, model: str, task_type: str, text: str) -> Optional[np.ndarray]:
+        """Async counterpart of get, using the shared async pool."""
+        key = (model, task_type, text_hash(text))
+        vector = self._get_memory(key)
+        if vector is not None:
+            return vector
+        if self.use_db:
+            vector = await self._aget_db(key)
+        self._count(vector)
+        if vector is not None:
+            self._put_memory(key, vector)
+        return vector
+
+    def put(self, model: str, task_type: str, text: str, vector: np.ndarray) -> None:
+        """Store an embedding in both tiers."""
+        key = (model, task_type, text_hash(text))
+        vector = np.asarray(vector, dtype=np.float32)
+        self._put_memory(key, vector)
+        if self.use_db:
+            self._put_db(key, vector)
+
+    async def aput(self, model: str, task_type: str, text: str, vector: np.ndarray) -> None:
+        """Async counterpart of put."""
+        key = (model, task_type, text_hash(text))
+        vector = np.asarray(vector, dtype=np.float32)
+        self._put_memory(key, vector)
+        if self.use_db:
+            await self._aput_db(key, vector)
+
+    def invalidate(self, model: Optional[str] = None, keep_current: bool = False) -> int:
+        """
+        Drop cached embeddings, e.g. after the embedding model changed.
+
+        Args:
+            model: Only drop entries of this model; all models when omitted
+            keep_current: Drop every model except EMBEDDING_MODEL_NAME
+
+        Returns:
+            int: Number of persistent rows deleted
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if self._matches(key[0], model, keep_current):
+                    self._bytes -= self._entries.pop(key).nbytes
+
+        if not self.use_db:
+            return 0
+
+        if keep_current:
+            sql, params = "DELETE FROM embedding_cache WHERE model <> %(model)s", {"model": constants.EMBEDDING_MODEL_NAME}
+        elif model:
+            sql, params = "DELETE FROM embedding_cache WHERE model = %(model)s", {"model": model}
+        else:
+            sql, params = "DELETE FROM embedding_cache", {}
+
+        from .database import pooled_connection
+
+        try:
+            with pooled_connection() as conn:
+                return conn.execute(sql, params).rowcount
+        except Exception as e:
+            logger.error(f"Embedding cache invalidation failed: {e}")
+            return 0
+
+    @property
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.db_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.db_hits) / lookups if lookups else 0.0,
+        }
+
+    @staticmethod
+    def _matches(entry_model: str, model: Optional[str], keep_current: bool) -> bool:
+        if keep_current:
+            return entry_model != constants.EMBEDDING_MODEL_NAME
+        return model is None or entry_model == model
+
+    def _get_memory(self, key: tuple) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+            return vector
+
+    def _put_memory(self, key: tuple, vector: np.ndarray) -> None:
+        if vector.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[key] = vector
+            self._bytes += vector.nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def _count(self, vector: Optional[np.ndarray]) -> None:
+        with self._lock:
+            if vector is None:
+                self.misses += 1
+            else:
+                self.db_hits += 1
+
+    @staticmethod
+    def _params(key: tuple, vector: Optional[np.ndarray] = None) -> dict:
+        params = {"model": key[0], "task_type": key[1], "text_hash": key[2]}
+        if vector is not None:
+            params["embedding"] = vector.tobytes()
+        return params
+
+    @staticmethod
+    def _decode(row) -> Optional[np.ndarray]:
+        if not row:
+            return None
+        # Copy so the array owns writable memory instead of the row's bytes
+        return np.frombuffer(row["embedding"], dtype=np.float32).copy()
+
+    def _get_db(self, key: tuple) -> Optional[np.ndarray]:
+        from .database import pooled_connection
+
+        try:
+            with pooled_connection() as conn:
+                return self._decode(conn.execute(_SELECT_SQL, self._params(key)).fetchone())
+        except Exception as e:
+            logger.error(f"Embedding cache lookup failed: {e}")
+            return None
+
+    async def _aget_db(self, key: tuple) -> Optional[np.ndarray]:
+        from .database import get_async_pool
+
+        try:
+            async with get_async_pool().connection() as conn:
+                cursor = await conn.execute(_SELECT_SQL, self._params(key))
+                return self._decode(await cursor.fetchone())
+        except Exception as e:
+            logger.error(f"Embedding cache lookup failed: {e}")
+            return None
+
+    def _put_db(self, key: tuple, vector: np.ndarray) -> None:
+        from .database import pooled_connection
+
+        try:
+            with pooled_connection() as conn:
+                conn.execute(_INSERT_SQL, self._params(key, vector))
+        except Exception as e:
+            logger.error(f"Embedding cache store failed: {e}")
+
+    async def _aput_db(self, key: tuple, vector: np.ndarray) -> None:
+        from .database import get_async_pool
+
+        try:
+            async with get_async_pool().connection() as conn:
+                await conn.execute(_INSERT_SQL, self._params(key, vector))
+        except Exception as e:
+            logger.error(f"Embedding cache store failed: {e}")
+
+
+@lru_cache(maxsize=1)
+def get_embedding_cache() -> EmbeddingCache:
+    """Process-wide embedding cache."""
+    return EmbeddingCache()
+
+
+def invalidate_embedding_cache(model: Optional[str] = None, keep_current: bool = False) -> int:
+    """
+    Invalidation hook for embedding model changes.
+
+    Call with keep_current=True after switching EMBEDDING_MODEL_NAME to drop
+    the vectors of every previous model.
+    """
+    return get_embedding_cache().invalidate(model=model, keep_current=keep_current)
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batching front end for the embedding API.
+
+    Callers submit single texts and get a Future back. A background thread
+    collects submissions for up to max_wait_ms or until max_batch_size
+    texts are queued, then sends each (model, task type) group as one
+    embed_documents call. Batches run on a small pool, so throughput under
+    concurrent writes grows with the batch size instead of the number of
+    requests.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = constants.EMBEDDING_BATCH_MAX_SIZE,
+        max_wait_ms: int = constants.EMBEDDING_BATCH_MAX_WAIT_MS,
+        max_concurrency: int = constants.EMBEDDING_BATCH_CONCURRENCY,
+    ):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="embed")
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.texts = 0
+
+    def submit(self, text: str, task_type: str, model_name: str) -> Future:
+        """
+        Queue a text for embedding.
+
+        Returns:
+            Future: Resolves to the float32 vector, or to the API error
+        """
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((model_name, task_type, text, future))
+        return future
+
+    def embed(
+        self,
+        text: str,
+        task_type: str,
+        model_name: str,
+        timeout: float = constants.EMBEDDING_BATCH_TIMEOUT_SECONDS,
+    ) -> np.ndarray:
+        """Submit a text and wait for its vector."""
+        future = self.submit(text, task_type, model_name)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # Drop it from the next batch if the worker has not taken it yet
+            future.cancel()
+            raise
+
+    async def aembed(
+        self,
+        text: str,
+        task_type: str,
+        model_name: str,
+        timeout: float = constants.EMBEDDING_BATCH_TIMEOUT_SECONDS,
+    ) -> np.ndarray:
+        """Async counterpart of embed; waits without blocking the event loop."""
+        future = asyncio.wrap_future(self.submit(text, task_type, model_name))
+        return await asyncio.wait_for(future, timeout=timeout)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "texts": self.texts,
+            "average_batch_size": self.texts / self.batches if self.batches else 0.0,
+            "queued": self._queue.qsize(),
+        }
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            groups: dict = {}
+            for model_name, task_type, text, future in batch:
+                # Callers that timed out (embed and aembed) cancelled their future
+                if future.set_running_or_notify_cancel():
+                    groups.setdefault((model_name, task_type), []).append((text, future))
+            for (model_name, task_type), items in groups.items():
+                self._executor.submit(self._embed_batch, model_name, task_type, items)
+
+    def _embed_batch(self, model_name: str, task_type: str, items: list) -> None:
+        texts = [text for text, _ in items]
+        try:
+            vectors = get_embedding_model(model_name).embed_documents(
+                texts, batch_size=self.max_batch_size, task_type=task_type
+            )
+        except Exception as e:
+            for _, future in items:
+                future.set_exception(e)
+            return
+
+        with self._stats_lock:
+            self.batches += 1
+            self.texts += len(texts)
+        for (_, future), vector in zip(items, vectors):
+            future.set_result(np.asarray(vector, dtype=np.float32))
+
+
+@lru_cache(maxsize=1)
+def get_embedding_batcher() -> EmbeddingBatcher:
+    """Process-wide embedding batcher."""
+    return EmbeddingBatcher()
+
+
+def _embed_uncached(text: str, task_type: str, model_name: str) -> np.ndarray:
+    if constants.EMBEDDING_BATCHING:
+        return get_embedding_batcher().embed(text, task_type, model_name)
+    model = get_embedding_model(model_name)
+    return np.asarray(model.embed_query(text, task_type=task_type), dtype=np.float32)
+
+
+async def _aembed_uncached(text: str, task_type: str, model_name: str) -> np.ndarray:
+    if constants.EMBEDDING_BATCHING:
+        return await get_embedding_batcher().aembed(text, task_type, model_name)
+    model = get_embedding_model(model_name)
+    return np.asarray(await model.aembed_query(text, task_type=task_type), dtype=np.float32)
+
+
+def embed_text(
+    text: str,
+    task_type: str = RETRIEVAL_QUERY,
+    model_name: str = constants.EMBEDDING_MODEL_NAME,
+) -> np.ndarray:
+    """
+    Embed a single text through the shared cache.
+
+    Args:
+        text: Text to embed
+        task_type: RETRIEVAL_QUERY or RETRIEVAL_DOCUMENT
+        model_name: Embedding model to use
+
+    Returns:
+        np.ndarray: float32 embedding vector
+    """
+    cache = get_embedding_cache()
+    vector = cache.get(model_name, task_type, text)
+    if vector is None:
+        vector = _embed_uncached(text, task_type, model_name)
+        cache.put(model_name, task_type, text, vector)
+    return vector
+
+
+async def aembed_text(
+    text: str,
+    task_type: str = RETRIEVAL_QUERY,
+    model_name: str = constants.EMBEDDING_MODEL_NAME,
+) -> np.ndarray:
+    """Async counterpart of embed_text."""
+    cache = get_embedding_cache()
+    vector = await cache.aget(model_name, task_type, text)
+    if vector is None:
+        vector = await _aembed_uncached(text, task_type, model_name)
+        await cache.aput(model_name, task_type, text, vector)
+    return vector
+
+
+def embed_texts(
+    texts: List[str],
+    task_type: str = RETRIEVAL_DOCUMENT,
+    model_name: str = constants.EMBEDDING_MODEL_NAME,
+) -> List[np.ndarray]:
+    """
+    Embed several texts through the shared cache in one API call.
+
+    Cached texts are served from the cache; the rest go out as a single
+    embed_documents request, bypassing the batcher since they are already
+    a batch.
+
+    Args:
+        texts: Texts to embed
+        task_type: RETRIEVAL_QUERY or RETRIEVAL_DOCUMENT
+        model_name: Embedding model to use
+
+    Returns:
+        List of float32 embedding vectors, in the order of texts
+    """
+    cache = get_embedding_cache()
+    vectors: List[Optional[np.ndarray]] = [cache.get(model_name, task_type, text) for text in texts]
+    missing = [index for index, vector in enumerate(vectors) if vector is None]
+    if missing:
+        embedded = get_embedding_model(model_name).embed_documents(
+            [texts[index] for index in missing],
+            batch_size=constants.EMBEDDING_BATCH_MAX_SIZE,
+            task_type=task_type,
+        )
+        for index, vector in zip(missing, embedded):
+            vectors[index] = np.asarray(vector, dtype=np.float32)
+            cache.put(model_name, task_type, texts[index], vectors[index])
+    return vectors
@@ -0,0 +1,336 @@
+"""
+Bulk import and export of semantic memories with COPY.
+
+Export streams semantic_memories (embeddings included) straight out of
+COPY ... TO STDOUT; import streams into a temporary staging table with
+COPY ... FROM STDIN and merges it into semantic_memories in one statement,
+so moving many users' memories never goes row by row.
+
+The bulk import bypasses MEMORY_MAX_PER_USER and the near-duplicate merge,
+so it is only offered through this CLI. Users importing their own export
+go through import_user_memories, which stores row by row via the
+VectorStore.
+
+Two formats are supported:
+    ndjson  one JSON object per line: id, user_id, content, importance,
+            embedding (array of floats), created_at
+    binary  PostgreSQL's binary COPY format of the same columns; compact
+            and fastest, but only readable by PostgreSQL with pgvector
+
+Usage (from the server directory):
+    python -m core.memory_transfer export -o memories.ndjson
+    python -m core.memory_transfer export --format binary --user <user_id> -o memories.bin
+    python -m core.memory_transfer import memories.ndjson
+"""
+
+import argparse
+import json
+import sys
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional
+
+from psycopg import sql
+
+from .database import pooled_connection
+from .vector_store import get_vector_store, STORE_LIMIT_REACHED
+
+
+FORMAT_NDJSON = "ndjson"
+FORMAT_BINARY = "binary"
+FORMATS = (FORMAT_NDJSON, FORMAT_BINARY)
+
+MEDIA_TYPES = {
+    FORMAT_NDJSON: "application/x-ndjson",
+    FORMAT_BINARY: "application/octet-stream",
+}
+
+COLUMNS = ("id", "user_id", "content", "importance", "embedding", "created_at")
+
+# semantic_memories.embedding is vector(768)
+EMBEDDING_DIMENSIONS = 768
+
+# Each JSON document is written as a single CSV field whose quote and
+# delimiter characters never occur in JSON (control characters are always
+# escaped there), so COPY emits and accepts the documents byte for byte
+_NDJSON_OPTIONS = "(FORMAT csv, QUOTE E'\\x01', DELIMITER E'\\x02')"
+
+_EXPORT_NDJSON_SQL = """
+    COPY (
+        SELECT json_build_object(
+            'id', id,
+            'user_id', user_id,
+            'content', content,
+            'importance', importance,
+            'embedding', embedding::real[],
+            'created_at', created_at
+        )
+        FROM semantic_memories
+        {where}
+    ) TO STDOUT """ + _NDJSON_OPTIONS
+
+_EXPORT_BINARY_SQL = """
+    COPY (
+        SELECT id, user_id, content, importance, embedding, created_at
+        FROM semantic_memories
+        {where}
+    ) TO STDOUT (FORMAT binary)
+"""
+
+_CREATE_STAGING_SQL = """
+    CREATE TEMP TABLE memory_import (
+        id uuid,
+        user_id uuid,
+        content text,
+        importance text,
+        embedding vector,
+        created_at timestamp
+    ) ON COMMIT DROP
+"""
+
+_CREATE_RAW_STAGING_SQL = "CREATE TEMP TABLE memory_import_raw (doc jsonb) ON COMMIT DROP"
+
+_COPY_RAW_IN_SQL = "COPY memory_import_raw (doc) FROM STDIN " + _NDJSON_OPTIONS
+
+_COPY_BINARY_IN_SQL = """
+    COPY memory_import (id, user_id, content, importance, embedding, created_at)
+    FROM STDIN (FORMAT binary)
+"""
+
+# Blank lines arrive as NULL documents
+_STAGE_NDJSON_SQL = """
+    INSERT INTO memory_import (id, user_id, content, importance, embedding, created_at)
+    SELECT coalesce((doc->>'id')::uuid, gen_random_uuid()),
+           (doc->>'user_id')::uuid,
+           doc->>'content',
+           doc->>'importance',
+           (doc->>'embedding')::vector,
+           (doc->>'created_at')::timestamp
+    FROM memory_import_raw
+    WHERE doc IS NOT NULL
+"""
+
+_ASSIGN_USER_SQL = "UPDATE memory_import SET user_id = %(user_id)s"
+
+# Rows of unknown users are skipped, and an existing id is only updated
+# when it belongs to the same user, so an import never moves memories
+# between accounts
+_MERGE_SQL = """
+    WITH merged AS (
+        INSERT INTO semantic_memories AS m (id, user_id, content, importance, embedding, created_at)
+        SELECT DISTINCT ON (s.id)
+               s.id, s.user_id, s.content, coalesce(s.importance, 'medium'),
+               s.embedding, coalesce(s.created_at, now())
+        FROM memory_import s
+        JOIN "user" u ON u.id = s.user_id
+        WHERE s.id IS NOT NULL AND s.content IS NOT NULL
+        ORDER BY s.id
+        ON CONFLICT (id) DO UPDATE
+        SET content = EXCLUDED.content,
+            importance = EXCLUDED.importance,
+            embedding = EXCLUDED.embedding
+        WHERE m.user_id = EXCLUDED.user_id
+        RETURNING (m.xmax = 0) AS inserted
+    )
+    SELECT count(*) FILTER (WHERE inserted) AS inserted,
+           count(*) FILTER (WHERE NOT inserted) AS updated
+    FROM merged
+"""
+
+
+def export_memories(fmt: str = FORMAT_NDJSON, user_ids: Optional[List[str]] = None) -> Iterator[bytes]:
+    """
+    Stream semantic memories out of the database.
+
+    A pooled connection is held until the iterator is exhausted or closed.
+
+    Args:
+        fmt: "ndjson" or "binary"
+        user_ids: Only export these users' memories; every user's by default
+
+    Yields:
+        bytes: Chunks of the export, in the order COPY produces them
+    """
+    _check_format(fmt)
+    where = sql.SQL("")
+    if user_ids:
+        where = sql.SQL("WHERE user_id = ANY({}::uuid[])").format(sql.Literal([str(u) for u in user_ids]))
+    template = _EXPORT_NDJSON_SQL if fmt == FORMAT_NDJSON else _EXPORT_BINARY_SQL
+    statement = sql.SQL(template).format(where=where)
+
+    with pooled_connection() as conn:
+        with conn.cursor() as cursor:
+            with cursor.copy(statement) as copy:
+                for data in copy:
+                    yield bytes(data)
+
+
+def import_memories(
+    chunks: Iterable[bytes],
+    fmt: str = FORMAT_NDJSON,
+    user_id: Optional[str] = None,
+) -> Dict[str, int]:
+    """
+    Load memories produced by export_memories (or written in its format).
+
+    Everything is staged and merged in one transaction: new ids are
+    inserted, known ids of the same user are updated, and other rows are
+    skipped. A malformed input rolls the whole import back.
+
+    Args:
+        chunks: The input, as bytes chunks of any size
+        fmt: "ndjson" or "binary"
+        user_id: Import every row for this user instead of the user_id in
+            the data
+
+    Returns:
+        dict: rows staged, inserted, updated and skipped
+    """
+    _check_format(fmt)
+    with pooled_connection() as conn:
+        with conn.transaction(), conn.cursor() as cursor:
+            cursor.execute(_CREATE_STAGING_SQL)
+            if fmt == FORMAT_NDJSON:
+                cursor.execute(_CREATE_RAW_STAGING_SQL)
+                _copy_in(cursor, _COPY_RAW_IN_SQL, chunks)
+                cursor.execute(_STAGE_NDJSON_SQL)
+            else:
+                _copy_in(cursor, _COPY_BINARY_IN_SQL, chunks)
+
+            if user_id is not None:
+                cursor.execute(_ASSIGN_USER_SQL, {"user_id": user_id})
+            cursor.execute("SELECT count(*) AS rows FROM memory_import")
+            staged = cursor.fetchone()["rows"]
+            cursor.execute(_MERGE_SQL)
+            merged = cursor.fetchone()
+
+    # Memories were written around the vector store
+    get_vector_store().invalidate(user_id)
+    return {
+        "rows": staged,
+        "inserted": merged["inserted"],
+        "updated": merged["updated"],
+        "skipped": staged - merged["inserted"] - merged["updated"],
+    }
+
+
+def import_user_memories(lines: Iterable[bytes], user_id: str) -> Dict[str, int]:
+    """
+    Load an NDJSON export into one user's memories through the VectorStore.
+
+    Every row is stored with VectorStore.store, so MEMORY_MAX_PER_USER and
+    the near-duplicate merge apply as for any other memory. Once the limit
+    is reached the remaining rows are skipped. Ids, owners and timestamps
+    in the data are ignored.
+
+    Args:
+        lines: NDJSON lines, as bytes
+        user_id: Owner of the imported memories
+
+    Returns:
+        dict: rows read, inserted, merged and skipped
+
+    Raises:
+        ValueError: A line is not a JSON object
+    """
+    store = get_vector_store()
+    result = {"rows": 0, "inserted": 0, "merged": 0, "skipped": 0}
+    limit_reached = False
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        result["rows"] += 1
+        if limit_reached:
+            result["skipped"] += 1
+            continue
+
+        try:
+            memory = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {number} is not valid JSON: {e}")
+        if not isinstance(memory, dict):
+            raise ValueError(f"Line {number} is not a JSON object")
+
+        content = memory.get("content")
+        embedding = memory.get("embedding")
+        if not isinstance(content, str) or not content.strip() or not _is_embedding(embedding):
+            result["skipped"] += 1
+            continue
+
+        importance = memory.get("importance") if isinstance(memory.get("importance"), str) else "medium"
+        outcome, _ = store.store(user_id, content, embedding, importance)
+        if outcome == STORE_LIMIT_REACHED:
+            limit_reached = True
+            result["skipped"] += 1
+        else:
+            result[outcome] += 1
+    return result
+
+
+def read_chunks(file: BinaryIO, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+    """Read a binary file object in fixed size chunks."""
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _is_embedding(value) -> bool:
+    return (
+        isinstance(value, list)
+        and len(value) == EMBEDDING_DIMENSIONS
+        and all(isinstance(x, (int, float)) and not isinstance(x, bool) for x in value)
+    )
+
+
+def _copy_in(cursor, statement: str, chunks: Iterable[bytes]) -> None:
+    with cursor.copy(statement) as copy:
+        for chunk in chunks:
+            copy.write(chunk)
+
+
+def _check_format(fmt: str) -> None:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown memory format {fmt!r}, expected one of {', '.join(FORMATS)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Write memories to a file or stdout")
+    export_parser.add_argument("--format", choices=FORMATS, default=FORMAT_NDJSON)
+    export_parser.add_argument("--user", action="append", default=[],
+                               help="Only export this user's memories (repeatable)")
+    export_parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+
+    import_parser = commands.add_parser("import", help="Load memories from a file or stdin")
+    import_parser.add_argument("input", nargs="?", help="Input file (default: stdin)")
+    import_parser.add_argument("--format", choices=FORMATS, default=FORMAT_NDJSON)
+    import_parser.add_argument("--user", help="Import every memory for this user")
+
+    args = parser.parse_args()
+
+    if args.command == "export":
+        output = open(args.output, "wb") if args.output else sys.stdout.buffer
+        try:
+            for chunk in export_memories(args.format, args.user):
+                output.write(chunk)
+        finally:
+            if args.output:
+                output.close()
+    else:
+        source = open(args.input, "rb") if args.input else sys.stdin.buffer
+        try:
+            result = import_memories(read_chunks(source), args.format, args.user)
+        finally:
+            if args.input:
+                source.close()
+        print(
+            f"{result['rows']} rows: {result['inserted']} inserted, "
+            f"{result['updated']} updated, {result['skipped']} skipped",
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    main()
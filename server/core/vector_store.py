@@ -0,0 +1,765 @@
+"""
+Vector store for Helion's semantic memories.
+Memory search and writes go through a VectorStore so the backend can be
+swapped: PgVectorStore queries semantic_memories directly, and
+InMemoryVectorStore answers searches from per-user NumPy matrices while
+writing through to Postgres.
+"""
+
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from . import constants
+from .database import pooled_connection
+
+
+# The distance is computed once; ordering by it lets the HNSW index serve
+# the top-k, and the similarity threshold is applied to those candidates
+_SEARCH_SQL = """
+    SELECT id, user_id, content, importance, created_at, 1 - distance AS similarity
+    FROM (
+        SELECT id, user_id, content, importance, created_at,
+               embedding <=> %(embedding)s::vector AS distance
+        FROM semantic_memories
+        WHERE user_id = %(user_id)s
+        ORDER BY distance
+        LIMIT %(top_k)s
+    ) AS candidates
+    WHERE distance < 1 - %(threshold)s
+    ORDER BY distance
+"""
+
+# One statement for several queries: each query embedding gets its own
+# index-ordered top-k through the LATERAL subquery
+_SEARCH_MANY_SQL = """
+    SELECT queries.ordinality - 1 AS query_index,
+           candidates.id, candidates.user_id, candidates.content, candidates.importance,
+           candidates.created_at, 1 - candidates.distance AS similarity
+    FROM unnest(%(embeddings)s::text[]) WITH ORDINALITY AS queries(embedding, ordinality)
+    CROSS JOIN LATERAL (
+        SELECT id, user_id, content, importance, created_at,
+               embedding <=> queries.embedding::vector AS distance
+        FROM semantic_memories
+        WHERE user_id = %(user_id)s
+        ORDER BY distance
+        LIMIT %(top_k)s
+    ) AS candidates
+    WHERE candidates.distance < 1 - %(threshold)s
+    ORDER BY queries.ordinality, candidates.distance
+"""
+
+# Compact storage modes: the candidate pass orders by one of the compact
+# expression indexes (halfvec / binary_quantize, see migration f2a3b4c5d6e7)
+# and only the candidates are reranked by the exact distance on the full
+# vector. The ORDER BY expressions must match the index expressions
+STORAGE_FULL = "full"
+STORAGE_HALFVEC = "halfvec"
+STORAGE_BINARY = "binary"
+
+_CANDIDATE_ORDER = {
+    STORAGE_HALFVEC: "embedding::halfvec(768) <=> {query}::halfvec(768)",
+    STORAGE_BINARY: "binary_quantize(embedding)::bit(768) <~> binary_quantize({query})",
+}
+
+_RERANK_SEARCH_SQL = """
+    SELECT id, user_id, content, importance, created_at, 1 - distance AS similarity
+    FROM (
+        SELECT id, user_id, content, importance, created_at,
+               embedding <=> %(embedding)s::vector AS distance
+        FROM (
+            SELECT id, user_id, content, importance, created_at, embedding
+            FROM semantic_memories
+            WHERE user_id = %(user_id)s
+            ORDER BY {candidate_order}
+            LIMIT %(candidates)s
+        ) AS candidates
+        ORDER BY distance
+        LIMIT %(top_k)s
+    ) AS ranked
+    WHERE distance < 1 - %(threshold)s
+    ORDER BY distance
+"""
+
+_RERANK_SEARCH_MANY_SQL = """
+    SELECT queries.ordinality - 1 AS query_index,
+           ranked.id, ranked.user_id, ranked.content, ranked.importance,
+           ranked.created_at, 1 - ranked.distance AS similarity
+    FROM unnest(%(embeddings)s::text[]) WITH ORDINALITY AS queries(embedding, ordinality)
+    CROSS JOIN LATERAL (
+        SELECT id, user_id, content, importance, created_at,
+               embedding <=> queries.embedding::vector AS distance
+        FROM (
+            SELECT id, user_id, content, importance, created_at, embedding
+            FROM semantic_memories
+            WHERE user_id = %(user_id)s
+            ORDER BY {candidate_order}
+            LIMIT %(candidates)s
+        ) AS candidates
+        ORDER BY distance
+        LIMIT %(top_k)s
+    ) AS ranked
+    WHERE ranked.distance < 1 - %(threshold)s
+    ORDER BY queries.ordinality, ranked.distance
+"""
+
+_INSERT_SQL = """
+    INSERT INTO semantic_memories (id, user_id, content, embedding, importance)
+    VALUES (%(id)s, %(user_id)s, %(content)s, %(embedding)s::vector, %(importance)s)
+    RETURNING id, user_id, content, importance, created_at
+"""
+
+_UPDATE_SQL = """
+    UPDATE semantic_memories
+    SET content = %(content)s, embedding = %(embedding)s::vector, created_at = NOW()
+    WHERE id = %(id)s AND user_id = %(user_id)s
+    RETURNING id, user_id, content, importance, created_at
+"""
+
+_DELETE_SQL = """
+    DELETE FROM semantic_memories
+    WHERE id = %(id)s AND user_id = %(user_id)s
+"""
+
+_COUNT_SQL = """
+    SELECT COUNT(*) AS count FROM semantic_memories WHERE user_id = %(user_id)s
+"""
+
+_MERGE_SQL = """
+    UPDATE semantic_memories
+    SET content = %(content)s, importance = %(importance)s,
+        embedding = %(embedding)s::vector, created_at = NOW()
+    WHERE id = %(id)s
+    RETURNING id, user_id, content, importance, created_at
+"""
+
+# Serializes stores per user so two concurrent writes of the same fact
+# cannot both miss each other and insert twice
+_LOCK_USER_SQL = "SELECT pg_advisory_xact_lock(hashtextextended(%(user_id)s, 0))"
+
+# real[] comes back as a list without registering the pgvector adapter
+_LOAD_USER_SQL = """
+    SELECT id, user_id, content, importance, created_at, embedding::real[] AS embedding
+    FROM semantic_memories
+    WHERE user_id = %(user_id)s
+    ORDER BY created_at, id
+"""
+
+# Largest hnsw.ef_search pgvector accepts
+MAX_EF_SEARCH = 1000
+
+# Outcomes of VectorStore.store
+STORE_INSERTED = "inserted"
+STORE_MERGED = "merged"
+STORE_LIMIT_REACHED = "limit_reached"
+
+_IMPORTANCE_RANK = {"low": 0, "medium": 1, "high": 2}
+
+
+def merge_memory(existing: Dict[str, Any], content: str, importance: str) -> Tuple[str, str]:
+    """
+    Combine a near-duplicate memory with a new one.
+
+    The newer statement wins unless the existing one already contains it;
+    importance is the higher of the two.
+
+    Returns:
+        tuple: (content, importance) of the merged memory
+    """
+    if content.strip().lower() in existing["content"].strip().lower():
+        content = existing["content"]
+    current = existing.get("importance") or "medium"
+    if _IMPORTANCE_RANK.get(current, 1) > _IMPORTANCE_RANK.get(importance, 1):
+        importance = current
+    return content, importance
+
+
+def nearest(matrix: np.ndarray, query: np.ndarray) -> Tuple[Optional[int], float]:
+    """Row of an L2-normalized matrix most cosine-similar to a normalized query."""
+    if matrix.shape[0] == 0 or matrix.shape[1] != query.shape[0]:
+        return None, -1.0
+    scores = matrix @ query
+    best = int(np.argmax(scores))
+    return best, float(scores[best])
+
+
+class VectorStore(ABC):
+    """
+    Storage and similarity search for a user's memories.
+
+    Memories are plain dicts keyed like the semantic_memories columns (id,
+    user_id, content, importance, created_at); search results also carry
+    their cosine similarity to the query.
+    """
+
+    @abstractmethod
+    def add(
+        self,
+        user_id: str,
+        content: str,
+        embedding: Sequence[float],
+        importance: str = "medium",
+    ) -> Dict[str, Any]:
+        """
+        Store a memory.
+
+        Args:
+            user_id: Owner of the memory
+            content: Memory text
+            embedding: Document embedding of content
+            importance: "low", "medium" or "high"
+
+        Returns:
+            The stored memory
+        """
+
+    @abstractmethod
+    def store(
+        self,
+        user_id: str,
+        content: str,
+        embedding: Sequence[float],
+        importance: str = "medium",
+        max_memories: int = constants.MEMORY_MAX_PER_USER,
+        duplicate_threshold: float = constants.MEMORY_DUPLICATE_THRESHOLD,
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Store a memory unless the user already has it.
+
+        A memory at least duplicate_threshold similar to the new one is
+        merged with it (see merge_memory) instead of inserting a row; the
+        duplicate check, the limit check and the write are atomic per user.
+
+        Args:
+            user_id: Owner of the memory
+            content: Memory text
+            embedding: Document embedding of content
+            importance: "low", "medium" or "high"
+            max_memories: Memories the user may keep
+            duplicate_threshold: Cosine similarity at which memories merge
+
+        Returns:
+            tuple: (STORE_INSERTED | STORE_MERGED | STORE_LIMIT_REACHED,
+            the written memory or None)
+        """
+
+    @abstractmethod
+    def search(
+        self,
+        user_id: str,
+        embedding: Sequence[float],
+        top_k: int = 3,
+        similarity_threshold: float = 0.0,
+        ef_search: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Find a user's memories nearest to an embedding.
+
+        Args:
+            user_id: Owner of the memories
+            embedding: Query embedding
+            top_k: Maximum number of memories to return
+            similarity_threshold: Minimum cosine similarity of a result
+            ef_search: HNSW candidate list size, for backends that use one
+
+        Returns:
+            Memories with their similarity, most similar first
+        """
+
+    def search_many(
+        self,
+        user_id: str,
+        embeddings: Sequence[Sequence[float]],
+        top_k: int = 3,
+        similarity_threshold: float = 0.0,
+        ef_search: Optional[int] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Run search for several query embeddings at once.
+
+        Returns:
+            One result list per embedding, in the same order
+        """
+        return [
+            self.search(user_id, embedding, top_k, similarity_threshold, ef_search)
+            for embedding in embeddings
+        ]
+
+    @abstractmethod
+    def update(
+        self,
+        user_id: str,
+        memory_id: str,
+        content: str,
+        embedding: Sequence[float],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Replace a memory's content and embedding.
+
+        Returns:
+            The updated memory, or None if the user has no such memory
+        """
+
+    @abstractmethod
+    def delete(self, user_id: str, memory_id: str) -> bool:
+        """
+        Delete a memory.
+
+        Returns:
+            bool: True if the memory existed
+        """
+
+    @abstractmethod
+    def count(self, user_id: str) -> int:
+        """Number of memories the user has."""
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """
+        Forget anything held about a user's memories outside the database.
+
+        Called after memories are written around the store; a no-op for
+        backends that always read from the database.
+        """
+
+
+class PgVectorStore(VectorStore):
+    """
+    VectorStore over the semantic_memories table, using the shared sync pool.
+
+    Args:
+        storage_mode: Index the searches walk; "full", "halfvec" or "binary"
+        rerank_factor: Candidates per result reranked in the compact modes
+    """
+
+    def __init__(
+        self,
+        storage_mode: str = constants.VECTOR_STORAGE_MODE,
+        rerank_factor: int = constants.MEMORY_RERANK_FACTOR,
+    ):
+        if storage_mode == STORAGE_FULL:
+            self._search_sql, self._search_many_sql = _SEARCH_SQL, _SEARCH_MANY_SQL
+        elif storage_mode in _CANDIDATE_ORDER:
+            order = _CANDIDATE_ORDER[storage_mode]
+            self._search_sql = _RERANK_SEARCH_SQL.format(
+                candidate_order=order.format(query="%(embedding)s::vector"))
+            self._search_many_sql = _RERANK_SEARCH_MANY_SQL.format(
+                candidate_order=order.format(query="queries.embedding::vector"))
+        else:
+            raise ValueError(f"Unknown vector storage mode {storage_mode!r}")
+        self.storage_mode = storage_mode
+        self.rerank_factor = max(rerank_factor, 1)
+
+    def add(self, user_id, content, embedding, importance="medium"):
+        params = {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "content": content,
+            "embedding": _as_list(embedding),
+            "importance": importance,
+        }
+        with pooled_connection() as conn:
+            return conn.execute(_INSERT_SQL, params).fetchone()
+
+    def store(self, user_id, content, embedding, importance="medium",
+              max_memories=constants.MEMORY_MAX_PER_USER,
+              duplicate_threshold=constants.MEMORY_DUPLICATE_THRESHOLD):
+        query = _normalize(embedding)
+        with pooled_connection() as conn, conn.transaction():
+            conn.execute(_LOCK_USER_SQL, {"user_id": str(user_id)})
+            # One read gives both the count and the embeddings to compare
+            rows = conn.execute(_LOAD_USER_SQL, {"user_id": user_id}).fetchall()
+            vectors = [row["embedding"] for row in rows]
+            index = _UserIndex.from_rows(rows, dim=query.shape[0])
+
+            position, similarity = nearest(index.matrix, query)
+            if position is not None and similarity >= duplicate_threshold:
+                existing = index.records[position]
+                merged_content, merged_importance = merge_memory(existing, content, importance)
+                # Keeping the existing text keeps its embedding too
+                vector = embedding if merged_content == content else vectors[position]
+                record = conn.execute(_MERGE_SQL, {
+                    "id": existing["id"],
+                    "content": merged_content,
+                    "importance": merged_importance,
+                    "embedding": _as_list(vector),
+                }).fetchone()
+                return STORE_MERGED, record
+
+            if len(rows) >= max_memories:
+                return STORE_LIMIT_REACHED, None
+
+            record = conn.execute(_INSERT_SQL, {
+                "id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "content": content,
+                "embedding": _as_list(embedding),
+                "importance": importance,
+            }).fetchone()
+            return STORE_INSERTED, record
+
+    def search(self, user_id, embedding, top_k=3, similarity_threshold=0.0, ef_search=None):
+        with pooled_connection() as conn:
+            with conn.transaction(), conn.cursor() as cursor:
+                candidates = self._candidates(top_k)
+                _set_search_options(cursor, ef_search, candidates)
+                cursor.execute(self._search_sql, {
+                    "embedding": _as_list(embedding),
+                    "user_id": user_id,
+                    "top_k": top_k,
+                    "candidates": candidates,
+                    "threshold": similarity_threshold,
+                })
+                return cursor.fetchall()
+
+    def search_many(self, user_id, embeddings, top_k=3, similarity_threshold=0.0, ef_search=None):
+        if len(embeddings) == 0:
+            return []
+
+        results = [[] for _ in embeddings]
+        with pooled_connection() as conn:
+            with conn.transaction(), conn.cursor() as cursor:
+                candidates = self._candidates(top_k)
+                _set_search_options(cursor, ef_search, candidates)
+                cursor.execute(self._search_many_sql, {
+                    "embeddings": [_vector_literal(embedding) for embedding in embeddings],
+                    "user_id": user_id,
+                    "top_k": top_k,
+                    "candidates": candidates,
+                    "threshold": similarity_threshold,
+                })
+                for row in cursor.fetchall():
+                    results[row.pop("query_index")].append(row)
+        return results
+
+    def update(self, user_id, memory_id, content, embedding):
+        params = {
+            "id": memory_id,
+            "user_id": user_id,
+            "content": content,
+            "embedding": _as_list(embedding),
+        }
+        with pooled_connection() as conn:
+            return conn.execute(_UPDATE_SQL, params).fetchone()
+
+    def delete(self, user_id, memory_id):
+        with pooled_connection() as conn:
+            return conn.execute(_DELETE_SQL, {"id": memory_id, "user_id": user_id}).rowcount > 0
+
+    def count(self, user_id):
+        with pooled_connection() as conn:
+            return conn.execute(_COUNT_SQL, {"user_id": user_id}).fetchone()["count"]
+
+    def _candidates(self, top_k: int) -> int:
+        """Rows the index pass must return: top_k, or more to rerank."""
+        return top_k if self.storage_mode == STORAGE_FULL else top_k * self.rerank_factor
+
+    def load_user(self, user_id: str) -> List[Dict[str, Any]]:
+        """All of a user's memories, with their embeddings, oldest first."""
+        with pooled_connection() as conn:
+            return conn.execute(_LOAD_USER_SQL, {"user_id": user_id}).fetchall()
+
+
+class _UserIndex:
+    """A user's memories and their normalized embeddings, one row per memory."""
+
+    def __init__(self, records: List[Dict[str, Any]], matrix: np.ndarray):
+        self.records = records
+        self.matrix = matrix
+        self.loaded_at = time.monotonic()
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]], dim: Optional[int] = None) -> "_UserIndex":
+        vectors = [row.pop("embedding", None) for row in rows]
+        dim = dim or next((len(vector) for vector in vectors if vector is not None), 0)
+        matrix = np.zeros((len(rows), dim), dtype=np.float32)
+        for i, vector in enumerate(vectors):
+            if vector is not None:
+                matrix[i] = _normalize(vector)
+        return cls(rows, matrix)
+
+    def position(self, memory_id) -> Optional[int]:
+        memory_id = str(memory_id)
+        for i, record in enumerate(self.records):
+            if str(record["id"]) == memory_id:
+                return i
+        return None
+
+    def append(self, record: Dict[str, Any], vector: np.ndarray) -> None:
+        if self.matrix.shape[1] != vector.shape[0]:
+            # Only an empty index can be reshaped to a new dimension
+            self.matrix = np.zeros((0, vector.shape[0]), dtype=np.float32)
+        self.records.append(record)
+        self.matrix = np.vstack([self.matrix, vector[np.newaxis, :]])
+
+    def replace(self, position: int, record: Dict[str, Any], vector: np.ndarray) -> None:
+        self.records[position] = record
+        self.matrix[position] = vector
+
+    def remove(self, position: int) -> None:
+        del self.records[position]
+        self.matrix = np.delete(self.matrix, position, axis=0)
+
+
+class InMemoryVectorStore(VectorStore):
+    """
+    Searches a user's memories in process memory.
+
+    Each user's embeddings are kept as one contiguous, L2-normalized float32
+    matrix, so a search is a single matrix-vector product and an
+    argpartition for the top-k. Users are loaded from the backing store on
+    first use, reloaded after ttl_seconds (to see writes from other
+    workers) and evicted least recently used beyond max_users. Writes go to
+    the backing store first and are then applied locally.
+
+    With backing=None nothing is persisted, which lets tests and
+    benchmarks run without Postgres or pgvector.
+    """
+
+    def __init__(
+        self,
+        backing: Optional[PgVectorStore] = None,
+        max_users: int = constants.VECTOR_STORE_MAX_USERS,
+        ttl_seconds: int = constants.VECTOR_STORE_TTL_SECONDS,
+    ):
+        self.backing = backing
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.RLock()
+        self._users: "OrderedDict[str, _UserIndex]" = OrderedDict()
+        # Bumped by invalidate(); a load that overlapped one is not cached
+        self._invalidations = 0
+
+    def add(self, user_id, content, embedding, importance="medium"):
+        vector = np.asarray(embedding, dtype=np.float32)
+        if self.backing is not None:
+            record = self.backing.add(user_id, content, vector, importance)
+        else:
+            record = {
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "content": content,
+                "importance": importance,
+                "created_at": datetime.now(),
+            }
+
+        with self._lock:
+            # A user that is not loaded yet picks the row up when loaded
+            index = self._index(user_id, load=self.backing is None)
+            if index is not None:
+                index.append(dict(record), _normalize(vector))
+        return record
+
+    def store(self, user_id, content, embedding, importance="medium",
+              max_memories=constants.MEMORY_MAX_PER_USER,
+              duplicate_threshold=constants.MEMORY_DUPLICATE_THRESHOLD):
+        if self.backing is not None:
+            # Postgres decides under its per-user lock, which also covers
+            # other workers; the user is reloaded on next use
+            outcome, record = self.backing.store(
+                user_id, content, embedding, importance, max_memories, duplicate_threshold
+            )
+            if outcome != STORE_LIMIT_REACHED:
+                self.invalidate(user_id)
+            return outcome, record
+
+        query = _normalize(embedding)
+        with self._lock:
+            index = self._index(user_id)
+            position, similarity = nearest(index.matrix, query)
+            if position is not None and similarity >= duplicate_threshold:
+                existing = index.records[position]
+                merged_content, merged_importance = merge_memory(existing, content, importance)
+                record = {
+                    **existing,
+                    "content": merged_content,
+                    "importance": merged_importance,
+                    "created_at": datetime.now(),
+                }
+                vector = query if merged_content == content else index.matrix[position]
+                index.replace(position, record, vector)
+                return STORE_MERGED, dict(record)
+
+            if len(index.records) >= max_memories:
+                return STORE_LIMIT_REACHED, None
+
+            record = {
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "content": content,
+                "importance": importance,
+                "created_at": datetime.now(),
+            }
+            index.append(record, query)
+            return STORE_INSERTED, dict(record)
+
+    def search(self, user_id, embedding, top_k=3, similarity_threshold=0.0, ef_search=None):
+        return self.search_many(user_id, [embedding], top_k, similarity_threshold)[0]
+
+    def search_many(self, user_id, embeddings, top_k=3, similarity_threshold=0.0, ef_search=None):
+        if len(embeddings) == 0:
+            return []
+        queries = np.stack([_normalize(embedding) for embedding in embeddings])
+        index = self._index(user_id, load=self.backing is not None)
+        with self._lock:
+            if index is None or not index.records or top_k <= 0 or index.matrix.shape[1] != queries.shape[1]:
+                return [[] for _ in embeddings]
+            # One matrix product scores every query against every memory
+            scores = queries @ index.matrix.T
+            return [_top_k(index.records, row, top_k, similarity_threshold) for row in scores]
+
+    def update(self, user_id, memory_id, content, embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        record = None
+        if self.backing is not None:
+            record = self.backing.update(user_id, memory_id, content, vector)
+
+        with self._lock:
+            index = self._index(user_id, load=False)
+            position = index.position(memory_id) if index is not None else None
+            if position is None:
+                return record
+            if self.backing is None:
+                record = {**index.records[position], "content": content, "created_at": datetime.now()}
+            if record is not None:
+                index.replace(position, dict(record), _normalize(vector))
+        return record
+
+    def delete(self, user_id, memory_id):
+        deleted = False
+        if self.backing is not None:
+            deleted = self.backing.delete(user_id, memory_id)
+
+        with self._lock:
+            index = self._index(user_id, load=False)
+            position = index.position(memory_id) if index is not None else None
+            if position is not None:
+                index.remove(position)
+                deleted = True
+        return deleted
+
+    def count(self, user_id):
+        index = self._index(user_id, load=self.backing is not None)
+        with self._lock:
+            return len(index.records) if index is not None else 0
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """Drop one user's (or every user's) loaded memories."""
+        with self._lock:
+            self._invalidations += 1
+            if user_id is None:
+                self._users.clear()
+            else:
+                self._users.pop(str(user_id), None)
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "users": len(self._users),
+                "memories": sum(len(index.records) for index in self._users.values()),
+                "bytes": sum(index.matrix.nbytes for index in self._users.values()),
+            }
+
+    def _index(self, user_id: str, load: bool = True) -> Optional[_UserIndex]:
+        """
+        The user's index. Missing or expired users are loaded from the
+        backing store (or start empty without one) only when load is set.
+
+        The backing store is queried without holding the lock, so other
+        users are never blocked behind a cold load; callers that may load
+        must not hold the lock themselves.
+        """
+        key = str(user_id)
+        with self._lock:
+            index = self._cached(key)
+            if index is not None or not load:
+                return index
+            if self.backing is None:
+                return self._install(key, _UserIndex([], np.zeros((0, 0), dtype=np.float32)))
+            invalidations = self._invalidations
+
+        loaded = _UserIndex.from_rows(self.backing.load_user(user_id))
+
+        with self._lock:
+            index = self._cached(key)
+            if index is not None:
+                # Another thread loaded the user meanwhile
+                return index
+            if invalidations != self._invalidations:
+                # A write landed during the load; serve it once, reload next time
+                return loaded
+            return self._install(key, loaded)
+
+    def _cached(self, key: str) -> Optional[_UserIndex]:
+        index = self._users.get(key)
+        if index is not None and self.backing is not None and \
+                time.monotonic() - index.loaded_at > self.ttl_seconds:
+            del self._users[key]
+            return None
+        if index is not None:
+            self._users.move_to_end(key)
+        return index
+
+    def _install(self, key: str, index: _UserIndex) -> _UserIndex:
+        self._users[key] = index
+        self._users.move_to_end(key)
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+        return index
+
+
+def _top_k(records: List[Dict[str, Any]], scores: np.ndarray, top_k: int, threshold: float) -> List[Dict[str, Any]]:
+    """The top_k records by score above threshold, best first."""
+    # argpartition is linear; only the k survivors are sorted
+    k = min(top_k, scores.shape[0])
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top], kind="stable")]
+    return [
+        {**records[i], "similarity": float(scores[i])}
+        for i in top
+        if scores[i] > threshold
+    ]
+
+
+def _as_list(embedding: Sequence[float]) -> List[float]:
+    return embedding.tolist() if isinstance(embedding, np.ndarray) else list(embedding)
+
+
+def _set_search_options(cursor, ef_search: Optional[int], limit: int) -> None:
+    """Per-query HNSW settings for the current transaction."""
+    # HNSW returns at most ef_search rows, so it must cover the LIMIT;
+    # pgvector rejects values above 1000
+    ef_search = min(max(ef_search or constants.MEMORY_HNSW_EF_SEARCH, limit), MAX_EF_SEARCH)
+    # set_config(..., true) is SET LOCAL: it ends with the transaction and
+    # never leaks into the next user of the pooled connection
+    cursor.execute("SELECT set_config('hnsw.ef_search', %s, true)", (str(ef_search),))
+    if constants.MEMORY_HNSW_ITERATIVE_SCAN:
+        cursor.execute(
+            "SELECT set_config('hnsw.iterative_scan', %s, true)",
+            (constants.MEMORY_HNSW_ITERATIVE_SCAN,),
+        )
+
+
+def _vector_literal(embedding: Sequence[float]) -> str:
+    """pgvector text form, "[x,y,...]", for passing vectors inside a text[]."""
+    return "[" + ",".join(repr(float(value)) for value in _as_list(embedding)) + "]"
+
+
+def _normalize(vector: Sequence[float]) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+@lru_cache(maxsize=1)
+def get_vector_store() -> VectorStore:
+    """Process-wide vector store for VECTOR_STORE_BACKEND."""
+    if constants.VECTOR_STORE_BACKEND == "memory":
+        return InMemoryVectorStore(backing=PgVectorStore())
+    return PgVectorStore()
@@ -6,14 +6,20 @@ from fastapi.responses import JSONResponse
 import logging
 import time
 from contextlib import asynccontextmanager
-from core.database import initialize_database
+from core.database import (
+    initialize_database,
+    open_async_pool,
+    close_async_pool,
+    close_psycopg_pool,
+    get_pool_stats,
+)
 from core import constants
 from core.exceptions import CustomException
 from api.auth.router import auth_router
 from api.memories.router import memories_router
 from api.chat.router import chat_router
 from api.middleware.AuthMiddleware import AuthMiddleware
-from agent import Agent
+from agent import Agent, get_history_manager
 
 
 @asynccontextmanager
@@ -21,13 +27,19 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     initialize_database()
+    await open_async_pool()
     app.state.agent = Agent()
+    await app.state.agent.setup()
+    # Load the history tokenizer now rather than on the first request
+    get_history_manager()
     
     logging.info("🚀 Application startup complete")
     
     yield
     
     # Shutdown
+    await close_async_pool()
+    close_psycopg_pool()
     logging.info("🛑 Application shutdown")
 
 
@@ -46,6 +58,18 @@ async def health_check():
     """Health check endpoint."""
     return {"status": "ok", "timestamp": time.time()}
 
+
+# Internals for debugging, like the docs: development only, and behind
+# AuthMiddleware since the path is not public
+if constants.ENV == "development":
+    @app.get("/api/stats")
+    async def runtime_stats():
+        """Connection pool and history tokenizer state."""
+        return {
+            "db_pools": get_pool_stats(),
+            "history_tokenizer": "exact" if get_history_manager().counter.exact else "estimated",
+        }
+
 # Add middleware
 app.add_middleware(
     TrustedHostMiddleware,
@@ -1,3 +1,7 @@
 from .user import User
 from .semantic_memory import SemanticMemory
 from .user_session import UserSession
+from .chat_message import ChatMessage
+from .chat_thread import ChatThread
+from .completion_cache import CompletionCacheEntry
+from .embedding_cache import EmbeddingCacheEntry
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, Integer, Text, DateTime
+from sqlalchemy.sql import func
+from core.database import Base
+
+
+class ChatMessage(Base):
+    """Append-only read model of the messages stored in LangGraph checkpoints."""
+
+    __tablename__ = "chat_messages"
+
+    thread_id = Column(String, primary_key=True, nullable=False)
+    # Position of the message in the thread's LangGraph message list
+    seq = Column(Integer, primary_key=True, nullable=False)
+    message_id = Column(String, nullable=True)
+    role = Column(String, nullable=False)
+    content = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
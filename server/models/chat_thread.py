@@ -0,0 +1,23 @@
+from sqlalchemy import Column, String, Integer, DateTime, Index
+from sqlalchemy.sql import func
+from core.database import Base
+
+
+class ChatThread(Base):
+    """Per-thread summary row backing the sidebar thread list."""
+
+    __tablename__ = "chat_threads"
+
+    thread_id = Column(String, primary_key=True, nullable=False)
+    # Registered user id or guest id, as set by the auth middleware
+    user_id = Column(String, nullable=False)
+    title = Column(String, nullable=False)
+    last_message_preview = Column(String, nullable=False, default="")
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    message_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # Serves the keyset-paginated listing for a user, newest first
+        Index("ix_chat_threads_user_updated", "user_id", updated_at.desc(), thread_id.desc()),
+    )
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, Integer, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from core.database import Base
+
+
+class CompletionCacheEntry(Base):
+    """Persistent tier of the exact-match LLM completion cache."""
+
+    __tablename__ = "llm_completion_cache"
+
+    # sha256 of the serialized prompt, model name and temperature
+    key = Column(String(64), primary_key=True, nullable=False)
+    model_name = Column(String, nullable=False)
+    # Streamed content chunks, replayed one by one on a hit
+    chunks = Column(JSONB, nullable=False)
+    hit_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, LargeBinary, DateTime
+from sqlalchemy.sql import func
+from core.database import Base
+
+
+class EmbeddingCacheEntry(Base):
+    """Persistent tier of the shared embedding cache."""
+
+    __tablename__ = "embedding_cache"
+
+    model = Column(String, primary_key=True, nullable=False)
+    task_type = Column(String, primary_key=True, nullable=False)
+    # sha256 of the embedded text
+    text_hash = Column(String(64), primary_key=True, nullable=False)
+    # Raw float32 bytes of the vector, so any dimension fits
+    embedding = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, String, TIMESTAMP, ForeignKey, Index
 from pgvector.sqlalchemy import Vector
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import UUID
@@ -21,3 +21,20 @@ class SemanticMemory(Base):
 
     embedding = Column(Vector(768))  # pgvector column
     created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # Serves the keyset-paginated listing for a user, newest first
+        Index("ix_semantic_memories_user_created", "user_id", created_at.desc(), id.desc()),
+        # Cosine ANN index for memory search; the user filter uses the
+        # user_id btree above. Required: it serves VECTOR_STORAGE_MODE=full.
+        # The halfvec and binary modes order their candidates by their own
+        # expression indexes (created by migration f2a3b4c5d6e7 only) and
+        # rerank on the embedding column, so neither walks this index
+        Index(
+            "ix_semantic_memories_embedding_hnsw",
+            embedding,
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+    )
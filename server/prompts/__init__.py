@@ -13,6 +13,9 @@ from .agent_prompts import (
     get_agent_prompt,
     get_system_prompt,
     get_customer_support_prompt,
+    get_tool_calling_prompt,
+    get_history_summary_prompt,
+    get_memory_extraction_prompt,
     list_available_prompts,
     register_custom_prompt,
     format_agent_variables,
@@ -25,6 +28,9 @@ __all__ = [
     'get_agent_prompt',
     'get_system_prompt', 
     'get_customer_support_prompt',
+    'get_tool_calling_prompt',
+    'get_history_summary_prompt',
+    'get_memory_extraction_prompt',
     
     # Prompt management
     'list_available_prompts',
@@ -31,6 +31,15 @@ class AgentPrompts:
         
         # System message prompt
         self._prompts['system'] = self._create_system_prompt()
+        
+        # Native function-calling prompt
+        self._prompts['tool_calling'] = self._create_tool_calling_prompt()
+        
+        # Rolling conversation summary prompt
+        self._prompts['history_summary'] = self._create_history_summary_prompt()
+        
+        # Background memory extraction prompt
+        self._prompts['memory_extraction'] = self._create_memory_extraction_prompt()
     
     def _create_fallback_react_prompt(self) -> ChatPromptTemplate:
         """Create a fallback ReAct prompt if hub loading fails."""
@@ -84,6 +93,8 @@ Action Input: the input to the action
 Observation: the result of the action
 ```
 
+If several tools are needed and their inputs do not depend on each other (for example retrieve_memory and web_search), write one Action / Action Input pair per tool in the same step, then stop before Observation. They will run together and you will get every result at once.
+
 When you have a response to say to the Human, or if you do not need to use a tool, you MUST use the format:
 
 ```
@@ -93,6 +104,8 @@ Final Answer: [your response here]
 
 Begin!
 
+{memory_context}
+
 Previous conversation history:
 {chat_history}
 
@@ -100,7 +113,7 @@ New input: {input}
 {agent_scratchpad}"""
         
         return PromptTemplate(
-            input_variables=["tools", "tool_names", "chat_history", "input", "agent_scratchpad"],
+            input_variables=["tools", "tool_names", "chat_history", "input", "agent_scratchpad", "memory_context"],
             template=template
         )
     
@@ -155,6 +168,68 @@ Key guidelines:
             MessagesPlaceholder(variable_name="messages")
         ])
     
+    def _create_tool_calling_prompt(self) -> ChatPromptTemplate:
+        """
+        Create the compact prompt for native function calling.
+        
+        Tool schemas travel through bind_tools, so no format instructions
+        or tool descriptions are repeated in the prompt text.
+        """
+        system_message = """You are Helion, a helpful assistant. Call the provided tools when they help answer the user; otherwise reply directly. Keep answers clear and natural.
+{memory_context}
+{conversation_summary}"""
+        
+        return ChatPromptTemplate.from_messages([
+            ("system", system_message),
+            MessagesPlaceholder(variable_name="messages")
+        ])
+    
+    def _create_history_summary_prompt(self) -> PromptTemplate:
+        """Create the prompt that extends the rolling conversation summary."""
+        template = """Progressively summarize the conversation, adding onto the previous summary and returning a new summary.
+
+Keep facts about the user, decisions made and open questions. Drop small talk and raw tool output. Reply with the summary only.
+
+Current summary:
+{summary}
+
+New lines of conversation:
+{new_lines}
+
+New summary:"""
+        
+        return PromptTemplate(
+            input_variables=["summary", "new_lines"],
+            template=template
+        )
+    
+    def _create_memory_extraction_prompt(self) -> PromptTemplate:
+        """Create the prompt that pulls durable user facts out of a finished turn."""
+        template = """Extract facts worth remembering about the user from this conversation turn.
+
+Keep:
+- The user's identity (name, age, role, location, background)
+- Their skills, knowledge and what they are learning
+- Their preferences, goals, interests and the tools they use
+- Important projects, work or studies
+- Anything the user explicitly asks to be remembered
+
+Ignore temporary context (meals, mood, weather, small talk), time-bound details, and anything only the assistant said.
+
+Reply with a JSON array only, one object per fact, for example:
+[{{"content": "User prefers coffee over tea", "importance": "medium"}}]
+importance is "low", "medium" or "high". Reply with [] when there is nothing to keep.
+
+Conversation turn:
+{turn}
+
+Facts:"""
+        
+        return PromptTemplate(
+            input_variables=["turn"],
+            template=template
+        )
+    
     def get_prompt(self, prompt_name: str) -> ChatPromptTemplate:
         """
         Get a specific prompt template by name.
@@ -236,6 +311,21 @@ def get_customer_support_prompt() -> ChatPromptTemplate:
     return _prompt_manager.get_prompt('customer_support')
 
 
+def get_tool_calling_prompt() -> ChatPromptTemplate:
+    """Get the compact prompt used by the native function-calling mode."""
+    return _prompt_manager.get_prompt('tool_calling')
+
+
+def get_history_summary_prompt() -> PromptTemplate:
+    """Get the prompt used to extend the rolling conversation summary."""
+    return _prompt_manager.get_prompt('history_summary')
+
+
+def get_memory_extraction_prompt() -> PromptTemplate:
+    """Get the prompt used to extract memories from a finished turn."""
+    return _prompt_manager.get_prompt('memory_extraction')
+
+
 def list_available_prompts() -> List[str]:
     """Get list of available prompt templates."""
     return _prompt_manager.get_available_prompts()
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Settings that core.constants requires; real values come from .env
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "15")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRE_DAYS", "7")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
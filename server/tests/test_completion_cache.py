@@ -0,0 +1,101 @@
+from contextlib import contextmanager
+
+import pytest
+
+from agent import completion_cache
+from agent.completion_cache import CompletionCache
+from core import database
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        self.statements.append(statement)
+
+
+class RecordedRow:
+    def __init__(self, row):
+        self.row = row
+
+    def fetchone(self):
+        return self.row
+
+
+@pytest.fixture
+def connection(monkeypatch):
+    conn = RecordingConnection()
+
+    @contextmanager
+    def pooled_connection():
+        yield conn
+
+    monkeypatch.setattr(database, "pooled_connection", pooled_connection)
+    return conn
+
+
+def _purges(conn):
+    return sum(statement == completion_cache._PURGE_SQL for statement in conn.statements)
+
+
+def test_put_purges_expired_rows_at_most_once_per_interval(connection, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(completion_cache.time, "monotonic", lambda: clock[0])
+    cache = CompletionCache(max_entries=10, ttl_seconds=3600, purge_interval_seconds=60)
+
+    cache.put("a", "model", ["Hello"])
+    cache.put("b", "model", ["Hello"])
+    assert _purges(connection) == 1
+
+    clock[0] += 61
+    cache.put("c", "model", ["Hello"])
+    assert _purges(connection) == 2
+
+
+def test_put_without_postgres_tier_never_touches_the_database(connection):
+    cache = CompletionCache(max_entries=10, ttl_seconds=3600, use_db=False)
+    cache.put("a", "model", ["Hello"])
+    assert connection.statements == []
+    assert cache.get("a") == ["Hello"]
+
+
+def test_memory_entries_expire_with_the_ttl(connection, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(completion_cache.time, "monotonic", lambda: clock[0])
+    cache = CompletionCache(max_entries=10, ttl_seconds=60, use_db=False)
+
+    cache.put("a", "model", ["Hello"])
+    clock[0] += 59
+    assert cache.get("a") == ["Hello"]
+    clock[0] += 1
+    assert cache.get("a") is None
+    assert cache.stats["entries"] == 0
+
+
+def test_promoted_entry_keeps_its_database_age(connection, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(completion_cache.time, "monotonic", lambda: clock[0])
+    rows = [{"chunks": ["Hello"], "age": 50.0}, None]
+    monkeypatch.setattr(connection, "execute", lambda statement, params=None: RecordedRow(rows.pop(0)))
+    cache = CompletionCache(max_entries=10, ttl_seconds=60)
+
+    assert cache.get("a") == ["Hello"]
+    # The row had ten seconds left, and so has the promoted entry
+    clock[0] += 9
+    assert cache.get("a") == ["Hello"]
+    clock[0] += 1
+    assert cache.get("a") is None
+    assert (cache.db_hits, cache.memory_hits, cache.misses) == (1, 1, 1)
+
+
+def test_zero_ttl_means_no_expiry(connection, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(completion_cache.time, "monotonic", lambda: clock[0])
+    cache = CompletionCache(max_entries=10, ttl_seconds=0)
+
+    cache.put("a", "model", ["Hello"])
+    clock[0] += 10 ** 6
+
+    assert cache.get("a") == ["Hello"]
+    assert connection.statements == [completion_cache._INSERT_SQL]
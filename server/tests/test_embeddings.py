@@ -0,0 +1,18 @@
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import pytest
+
+from core.embeddings import EmbeddingBatcher
+
+
+def test_timed_out_embed_cancels_its_future(monkeypatch):
+    batcher = EmbeddingBatcher(max_concurrency=1)
+    # No worker, so the request stays queued past the timeout
+    monkeypatch.setattr(batcher, "_ensure_worker", lambda: None)
+
+    with pytest.raises(FutureTimeoutError):
+        batcher.embed("hello", "RETRIEVAL_QUERY", "model", timeout=0.01)
+
+    _, _, _, future = batcher._queue.get_nowait()
+    assert future.cancelled()
+    assert not future.set_running_or_notify_cancel()
@@ -0,0 +1,11 @@
+from fastapi.testclient import TestClient
+
+import main
+
+
+def test_health_reports_only_status_and_time():
+    client = TestClient(main.app)
+
+    assert set(client.get("/health").json()) == {"status", "timestamp"}
+    # Pool and tokenizer stats are development only, and never public
+    assert client.get("/api/stats").status_code in (401, 404)
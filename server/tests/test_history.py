@@ -0,0 +1,22 @@
+from agent.history import TokenCounter
+
+
+def test_missing_tokenizer_falls_back_to_estimates_and_says_so(capsys):
+    counter = TokenCounter("/nonexistent/tokenizer.json-that-is-not-on-the-hub")
+
+    assert not counter.exact
+    assert counter.count("x" * 40) == 10
+    assert "could not be loaded" in capsys.readouterr().out
+
+
+def test_local_tokenizer_file_is_used(tmp_path):
+    from tokenizers import Tokenizer, models, pre_tokenizers
+
+    tokenizer = Tokenizer(models.WordLevel({"hello": 0, "world": 1, "[UNK]": 2}, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    path = tmp_path / "tokenizer.json"
+    tokenizer.save(str(path))
+
+    counter = TokenCounter(str(path))
+    assert counter.exact
+    assert counter.count("hello big world") == 3
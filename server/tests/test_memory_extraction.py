@@ -0,0 +1,63 @@
+import threading
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from agent.memory_extraction import MemoryExtractor, parse_extracted_facts
+
+
+def test_parse_extracted_facts_reads_array_inside_code_fence():
+    reply = 'Here you go:\n```json\n[{"content": "Name is Alice", "importance": "high"}]\n```'
+    assert parse_extracted_facts(reply) == [{"content": "Name is Alice", "importance": "high"}]
+
+
+def test_parse_extracted_facts_normalizes_and_deduplicates():
+    reply = """[
+        {"content": " Lives in Lahore ", "importance": "urgent"},
+        {"content": "lives in lahore", "importance": "low"},
+        {"content": ""},
+        "not an object",
+        {"importance": "high"}
+    ]"""
+    assert parse_extracted_facts(reply) == [{"content": "Lives in Lahore", "importance": "medium"}]
+
+
+def test_parse_extracted_facts_without_valid_array_is_empty():
+    assert parse_extracted_facts("Nothing worth remembering.") == []
+    assert parse_extracted_facts("[not json]") == []
+    assert parse_extracted_facts('{"content": "Name is Alice"}') == []
+
+
+def test_submit_extracts_the_turn_as_it_was_submitted(monkeypatch):
+    extractor = MemoryExtractor(max_workers=1, max_pending=1)
+    processed = []
+    done = threading.Event()
+
+    def process_turn(user_id, turn):
+        processed.append((user_id, [message.content for message in turn]))
+        done.set()
+
+    monkeypatch.setattr(extractor, "process_turn", process_turn)
+    turn = [HumanMessage(content="I'm Alice"), AIMessage(content="Hi Alice!")]
+    # Block the only worker so the next turn arrives before extraction runs
+    blocker = threading.Event()
+    extractor._executor.submit(blocker.wait)
+
+    assert extractor.submit("user-1", turn)
+    turn.append(HumanMessage(content="A later turn"))
+    blocker.set()
+
+    assert done.wait(5)
+    assert processed == [("user-1", ["I'm Alice", "Hi Alice!"])]
+
+
+def test_submit_drops_turns_beyond_max_pending(monkeypatch):
+    extractor = MemoryExtractor(max_workers=1, max_pending=1)
+    blocker = threading.Event()
+    monkeypatch.setattr(extractor, "process_turn", lambda user_id, turn: blocker.wait())
+    turn = [HumanMessage(content="I'm Alice"), AIMessage(content="Hi Alice!")]
+
+    assert extractor.submit("user-1", turn)
+    assert not extractor.submit("user-1", turn)
+    assert not extractor.submit(None, turn)
+    blocker.set()
+    assert extractor.stats["dropped"] == 1
@@ -0,0 +1,40 @@
+from agent import memory_recall, nodes
+from agent.memory_recall import MEMORY_CONTEXT_HEADER, render_memory_context
+
+
+class WordCounter:
+    """One token per word, so budgets are easy to reason about."""
+
+    def count(self, text: str) -> int:
+        return len(text.split())
+
+
+def _memories(*contents):
+    return [{"content": content, "similarity": 0.9} for content in contents]
+
+
+def test_render_memory_context_keeps_memories_within_budget():
+    memories = _memories("Name is Alice", "Lives in Lahore", "Has two cats and a dog")
+    # "- Name is Alice" and "- Lives in Lahore" cost 4 tokens each
+    context = render_memory_context(memories, token_budget=9, counter=WordCounter())
+    assert context.splitlines() == [MEMORY_CONTEXT_HEADER, "- Name is Alice", "- Lives in Lahore"]
+
+
+def test_render_memory_context_stops_at_first_memory_that_does_not_fit():
+    memories = _memories("Has two cats and a dog", "Name is Alice")
+    assert render_memory_context(memories, token_budget=5, counter=WordCounter()) == ""
+
+
+def test_render_memory_context_without_memories_is_empty():
+    assert render_memory_context([], token_budget=100, counter=WordCounter()) == ""
+
+
+def test_recall_is_skipped_for_guests(monkeypatch):
+    searched = []
+    monkeypatch.setattr(memory_recall, "get_vector_store", lambda: searched.append(True))
+    monkeypatch.setattr(memory_recall, "embed_text", lambda *args, **kwargs: searched.append(True))
+    monkeypatch.setattr(nodes, "_turn_input", lambda state: "What's my name?")
+
+    config = {"metadata": {"user_id": "guest-1", "is_guest": True}}
+    assert nodes.recall_memories_node({"messages": []}, config) == {"memory_context": ""}
+    assert searched == []
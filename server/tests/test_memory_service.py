@@ -0,0 +1,61 @@
+import functools
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from api.memories import service as memory_service
+from api.memories.dto.dto import MemoryBatchSearchRequest, MemorySearchRequest
+from api.memories.service import MemoryService
+from core.exceptions import ValidationException
+from core.vector_store import InMemoryVectorStore
+
+VECTORS = {
+    "Likes tea": np.array([1.0, 0.0, 0.0]),
+    "Likes green tea": np.array([1.0, 0.05, 0.0]),
+    "Lives in Lahore": np.array([0.0, 1.0, 0.0]),
+    "Has a cat": np.array([0.0, 0.0, 1.0]),
+}
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = InMemoryVectorStore(backing=None)
+    monkeypatch.setattr(store, "store", functools.partial(store.store, max_memories=2, duplicate_threshold=0.9))
+    monkeypatch.setattr(memory_service, "get_vector_store", lambda: store)
+    monkeypatch.setattr(memory_service, "embed_text", lambda content, task_type: VECTORS[content])
+    return store
+
+
+def test_add_memory_merges_duplicates_and_enforces_the_limit(store):
+    service = MemoryService(db=None)
+
+    first = service.add_memory("user-1", "Likes tea")
+    merged = service.add_memory("user-1", "Likes green tea", importance="high")
+    service.add_memory("user-1", "Lives in Lahore")
+
+    assert merged["id"] == first["id"]
+    assert merged["content"] == "Likes green tea"
+    assert merged["importance"] == "high"
+    with pytest.raises(ValidationException):
+        service.add_memory("user-1", "Has a cat")
+    assert store.count("user-1") == 2
+
+
+@pytest.mark.parametrize("fields", [
+    {"top_k": 0},
+    {"top_k": 5000},
+    {"similarity_threshold": 1.5},
+    {"search_text": ""},
+])
+def test_search_request_is_bounded(fields):
+    with pytest.raises(ValidationError):
+        MemorySearchRequest(**{"search_text": "tea", **fields})
+
+
+def test_batch_search_request_bounds_the_number_of_texts():
+    assert len(MemoryBatchSearchRequest(search_texts=["tea"] * 20).search_texts) == 20
+    with pytest.raises(ValidationError):
+        MemoryBatchSearchRequest(search_texts=["tea"] * 21)
+    with pytest.raises(ValidationError):
+        MemoryBatchSearchRequest(search_texts=[])
@@ -0,0 +1,56 @@
+import functools
+import json
+
+import numpy as np
+import pytest
+
+from core import memory_transfer
+from core.vector_store import InMemoryVectorStore
+
+
+def _line(content, vector, **extra):
+    return (json.dumps({"content": content, "embedding": vector.tolist(), **extra}) + "\n").encode()
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = InMemoryVectorStore(backing=None)
+    monkeypatch.setattr(memory_transfer, "get_vector_store", lambda: store)
+    return store
+
+
+def _unit(seed):
+    vector = np.random.default_rng(seed).standard_normal(memory_transfer.EMBEDDING_DIMENSIONS)
+    return vector / np.linalg.norm(vector)
+
+
+def test_import_user_memories_applies_limit_and_merge(store, monkeypatch):
+    monkeypatch.setattr(store, "store", functools.partial(store.store, max_memories=2, duplicate_threshold=0.9))
+    lines = [
+        _line("Likes tea", _unit(1), user_id="someone-else"),
+        _line("Likes green tea", _unit(1)),
+        b"\n",
+        _line("Lives in Lahore", _unit(2)),
+        _line("Has a cat", _unit(3)),
+        _line("Has a dog", _unit(4)),
+    ]
+
+    result = memory_transfer.import_user_memories(lines, "user-1")
+
+    assert result == {"rows": 5, "inserted": 2, "merged": 1, "skipped": 2}
+    assert store.count("user-1") == 2
+    assert store.count("someone-else") == 0
+
+
+def test_import_user_memories_skips_rows_without_a_valid_embedding(store):
+    lines = [
+        json.dumps({"content": "No vector"}).encode(),
+        json.dumps({"content": "Short vector", "embedding": [0.1, 0.2]}).encode(),
+    ]
+    assert memory_transfer.import_user_memories(lines, "user-1")["skipped"] == 2
+    assert store.count("user-1") == 0
+
+
+def test_import_user_memories_rejects_invalid_json(store):
+    with pytest.raises(ValueError, match="Line 2"):
+        memory_transfer.import_user_memories([_line("Likes tea", _unit(1)), b"{not json"], "user-1")
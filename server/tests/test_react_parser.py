@@ -0,0 +1,56 @@
+import pytest
+
+from utils.react_parser import ReActStreamParser
+
+ANSWER = "Thought: I know this.\nFinal Answer: Tea is best brewed at 80°C.\n```\n"
+
+ACTIONS = (
+    "Thought: I should look both up.\n"
+    "Action: web_search\nAction Input: green tea temperature\n"
+    "Action: web_search\nAction Input: black tea temperature\n```\n"
+    "Observation: made up result\nFinal Answer: never grounded\n"
+)
+
+
+def _stream(content, size):
+    parser = ReActStreamParser()
+    emitted = [parser.feed(content[i:i + size]) for i in range(0, len(content), size)]
+    emitted.append(parser.close())
+    return parser, "".join(emitted)
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_chunked_answer_matches_one_shot_parse(size):
+    parser, emitted = _stream(ANSWER, size)
+    whole = ReActStreamParser.parse(ANSWER)
+
+    assert emitted == whole.final_answer == parser.final_answer == "Tea is best brewed at 80°C."
+    assert parser.actions == whole.actions == []
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_chunked_actions_match_one_shot_parse(size):
+    parser, emitted = _stream(ACTIONS, size)
+    whole = ReActStreamParser.parse(ACTIONS)
+
+    assert emitted == ""
+    assert parser.actions == whole.actions == [
+        {"action": "web_search", "action_input": "green tea temperature"},
+        {"action": "web_search", "action_input": "black tea temperature"},
+    ]
+    # Parsing stopped at the hallucinated Observation
+    assert not parser.has_final_answer
+    assert "made up result" not in parser.text
+
+
+def test_answer_written_after_an_action_is_discarded():
+    parser = ReActStreamParser.parse("Action: web_search\nAction Input: tea\nFinal Answer: guess")
+
+    assert parser.action_info == {"action": "web_search", "action_input": "tea"}
+    assert not parser.has_final_answer
+
+
+def test_text_without_react_markers_becomes_the_answer():
+    parser, emitted = _stream("Just a plain reply.", 4)
+
+    assert emitted == parser.final_answer == "Just a plain reply."
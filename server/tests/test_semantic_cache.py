@@ -0,0 +1,78 @@
+import numpy as np
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from agent import nodes
+from agent.semantic_cache import SemanticResponseCache
+
+
+GUEST = {"metadata": {"user_id": "guest-1", "is_guest": True}}
+USER = {"metadata": {"user_id": "user-1", "is_guest": False}}
+
+
+def _turn(answer="Your name is Alice."):
+    return [HumanMessage(content="What's my name?"), AIMessage(content=answer)]
+
+
+def _cache():
+    return SemanticResponseCache(threshold=0.9, ttl_seconds=60, max_entries=10, skip_tools=["retrieve_memory"])
+
+
+def test_plain_turn_is_cacheable():
+    assert _cache().is_cacheable(_turn())
+
+
+def test_turn_with_personal_tool_is_not_cacheable():
+    turn = [
+        HumanMessage(content="What's my name?"),
+        ToolMessage(content="Alice", name="retrieve_memory", tool_call_id="1"),
+        AIMessage(content="Your name is Alice."),
+    ]
+    assert not _cache().is_cacheable(turn)
+
+
+def test_turn_with_recalled_memories_is_not_cacheable():
+    assert not _cache().is_cacheable(_turn(), memory_context="- The user's name is Alice")
+
+
+def test_cache_response_node_skips_turns_with_recalled_memories(monkeypatch):
+    cache = _cache()
+    monkeypatch.setattr(nodes, "get_semantic_cache", lambda: cache)
+    question = "What's my name?"
+    cache.lookup(question, np.ones(4, dtype=np.float32))
+
+    nodes.cache_response_node({"messages": _turn(), "memory_context": "- The user's name is Alice"}, USER)
+    assert cache.stats["entries"] == 0
+
+    nodes.cache_response_node({"messages": _turn(), "memory_context": ""}, USER)
+    assert cache.stats["entries"] == 1
+
+
+def _ask(cache, monkeypatch, config, memory_context=""):
+    """Run one opening turn through the cache nodes; returns whether it was a hit."""
+    monkeypatch.setattr(nodes, "get_semantic_cache", lambda: cache)
+    monkeypatch.setattr(nodes, "embed_text", lambda text: np.ones(4, dtype=np.float32))
+    monkeypatch.setattr(nodes, "get_stream_writer", lambda: lambda chunk: None)
+    state = {"messages": [HumanMessage(content="What's my name?")], "memory_context": memory_context}
+    update = nodes.check_cache_node(state, config)
+    if not update["cache_hit"]:
+        answer = "I don't know your name." if config["metadata"]["is_guest"] else "Your name is Alice."
+        nodes.cache_response_node({**state, "messages": _turn(answer)}, config)
+    return update["cache_hit"]
+
+
+def test_guest_answers_are_not_served_to_signed_in_users(monkeypatch):
+    cache = _cache()
+
+    assert not _ask(cache, monkeypatch, GUEST)
+    assert not _ask(cache, monkeypatch, USER)
+    # Each scope now answers its own askers from the cache
+    assert _ask(cache, monkeypatch, GUEST)
+    assert _ask(cache, monkeypatch, USER)
+
+
+def test_turn_with_recalled_memories_skips_the_lookup(monkeypatch):
+    cache = _cache()
+    assert not _ask(cache, monkeypatch, USER)
+
+    assert not _ask(cache, monkeypatch, USER, memory_context="- The user's name is Bob")
+    assert cache.stats["hits"] == 0
@@ -0,0 +1,43 @@
+import asyncio
+
+from agent import nodes
+
+
+def _echo(tool_name, tool_args):
+    return f"{tool_name}: {tool_args}"
+
+
+async def _aecho(tool_name, tool_args):
+    return _echo(tool_name, tool_args)
+
+
+REACT_ACTIONS = [
+    {"action": "web_search", "action_input": "first"},
+    {"action": "web_search", "action_input": "second"},
+]
+
+
+def test_react_calls_to_the_same_tool_get_distinct_ids(monkeypatch):
+    monkeypatch.setattr(nodes, "execute_tool", _echo)
+
+    messages = nodes.tool_node({"actions": REACT_ACTIONS})["messages"]
+
+    assert [m.tool_call_id for m in messages] == ["web_search-0", "web_search-1"]
+    assert [m.content for m in messages] == ["web_search: first", "web_search: second"]
+
+
+def test_async_react_calls_to_the_same_tool_get_distinct_ids(monkeypatch):
+    monkeypatch.setattr(nodes, "aexecute_tool", _aecho)
+
+    messages = asyncio.run(nodes.atool_node({"actions": REACT_ACTIONS}))["messages"]
+
+    assert [m.tool_call_id for m in messages] == ["web_search-0", "web_search-1"]
+
+
+def test_structured_call_ids_are_kept(monkeypatch):
+    monkeypatch.setattr(nodes, "execute_tool", _echo)
+    actions = [{"action": "web_search", "action_input": {"q": "x"}, "tool_call_id": "call_1"}]
+
+    messages = nodes.tool_node({"actions": actions})["messages"]
+
+    assert messages[0].tool_call_id == "call_1"
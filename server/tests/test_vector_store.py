@@ -0,0 +1,136 @@
+import threading
+
+import numpy as np
+import pytest
+
+from core.vector_store import (
+    InMemoryVectorStore,
+    STORE_INSERTED,
+    STORE_LIMIT_REACHED,
+    STORE_MERGED,
+    merge_memory,
+    _set_search_options,
+)
+
+
+class SlowBacking:
+    """Backing store whose load_user blocks until released."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.loading = threading.Event()
+        self.release = threading.Event()
+        self.loads = 0
+
+    def load_user(self, user_id):
+        self.loads += 1
+        if user_id == "cold":
+            self.loading.set()
+            assert self.release.wait(5)
+        return [dict(row, embedding=list(row["embedding"])) for row in self.rows.get(user_id, [])]
+
+
+def _row(memory_id, user_id, vector):
+    return {"id": memory_id, "user_id": user_id, "content": memory_id, "importance": "medium",
+            "created_at": None, "embedding": vector}
+
+
+def test_cold_load_does_not_block_other_users():
+    backing = SlowBacking({"warm": [_row("m1", "warm", [1.0, 0.0])], "cold": [_row("m2", "cold", [0.0, 1.0])]})
+    store = InMemoryVectorStore(backing=backing, max_users=10, ttl_seconds=300)
+    assert store.count("warm") == 1
+
+    loader = threading.Thread(target=store.count, args=("cold",))
+    loader.start()
+    assert backing.loading.wait(5)
+    results = []
+    searcher = threading.Thread(
+        target=lambda: results.extend(store.search("warm", np.array([1.0, 0.0]), top_k=1)))
+    searcher.start()
+    # Served while the cold user's load is still in flight
+    searcher.join(2)
+    finished = not searcher.is_alive()
+    backing.release.set()
+    loader.join(5)
+    searcher.join(5)
+
+    assert finished
+    assert [row["id"] for row in results] == ["m1"]
+    assert store.count("cold") == 1
+
+
+def test_load_overlapping_an_invalidation_is_not_cached():
+    backing = SlowBacking({"cold": [_row("m1", "cold", [1.0, 0.0])]})
+    store = InMemoryVectorStore(backing=backing, max_users=10, ttl_seconds=300)
+
+    loader = threading.Thread(target=store.count, args=("cold",))
+    loader.start()
+    assert backing.loading.wait(5)
+    store.invalidate("cold")
+    backing.release.set()
+    loader.join(5)
+
+    assert store.stats["users"] == 0
+    store.count("cold")
+    assert backing.loads == 2
+
+
+def test_store_inserts_merges_near_duplicates_and_stops_at_the_limit():
+    store = InMemoryVectorStore(backing=None)
+    kwargs = {"max_memories": 2, "duplicate_threshold": 0.9}
+
+    outcome, tea = store.store("u1", "Likes tea", [1.0, 0.0, 0.0], "low", **kwargs)
+    assert outcome == STORE_INSERTED
+    outcome, merged = store.store("u1", "Likes green tea", [1.0, 0.1, 0.0], "medium", **kwargs)
+    assert outcome == STORE_MERGED
+    assert (merged["id"], merged["content"], merged["importance"]) == (tea["id"], "Likes green tea", "medium")
+
+    assert store.store("u1", "Has a cat", [0.0, 1.0, 0.0], **kwargs)[0] == STORE_INSERTED
+    assert store.store("u1", "Has a dog", [0.0, 0.0, 1.0], **kwargs) == (STORE_LIMIT_REACHED, None)
+    # A near-duplicate still merges once the user is at the limit
+    assert store.store("u1", "Has a cat", [0.0, 1.0, 0.05], **kwargs)[0] == STORE_MERGED
+    # The limit is per user
+    assert store.store("u2", "Has a dog", [0.0, 0.0, 1.0], **kwargs)[0] == STORE_INSERTED
+    assert store.count("u1") == 2
+
+
+def test_search_many_ranks_each_query_and_applies_threshold_and_top_k():
+    store = InMemoryVectorStore(backing=None)
+    for content, vector in [("tea", [1.0, 0.0]), ("coffee", [0.8, 0.6]), ("cats", [0.0, 1.0])]:
+        store.add("u1", content, vector)
+    store.add("u2", "other user", [1.0, 0.0])
+
+    tea, cats, nothing = store.search_many(
+        "u1", [[1.0, 0.0], [0.0, 2.0], [-1.0, 0.0]], top_k=2, similarity_threshold=0.5)
+
+    assert [row["content"] for row in tea] == ["tea", "coffee"]
+    assert [row["content"] for row in cats] == ["cats", "coffee"]
+    assert nothing == []
+    assert tea[0]["similarity"] == pytest.approx(1.0)
+    assert store.search_many("u1", []) == []
+    assert store.search("nobody", [1.0, 0.0]) == []
+
+
+def test_merge_memory_keeps_the_fuller_text_and_the_higher_importance():
+    existing = {"content": "Likes green tea in the morning", "importance": "high"}
+
+    assert merge_memory(existing, "likes green tea", "low") == ("Likes green tea in the morning", "high")
+    assert merge_memory(existing, "Prefers coffee now", "medium") == ("Prefers coffee now", "high")
+    assert merge_memory({"content": "Has a cat", "importance": None}, "Has two cats", "high") == ("Has two cats", "high")
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.settings = {}
+
+    def execute(self, statement, params):
+        name = statement.split("'")[1]
+        self.settings[name] = params[0]
+
+
+def test_search_options_scan_iteratively_and_cap_ef_search():
+    cursor = RecordingCursor()
+
+    _set_search_options(cursor, None, 5000)
+
+    assert cursor.settings == {"hnsw.ef_search": "1000", "hnsw.iterative_scan": "relaxed_order"}
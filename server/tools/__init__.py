@@ -12,13 +12,15 @@ from .web_search import web_search
 from .tool_registry import (
     get_all_tools,
     get_tool_names,
+    get_registry_version,
     get_tool,
     register_tool,
     unregister_tool,
     list_available_tools,
     get_tool_info,
     register_default_tools,
-    execute_tool
+    execute_tool,
+    aexecute_tool
 )
 
 __all__ = [
@@ -28,11 +30,13 @@ __all__ = [
     # Registry functions
     'get_all_tools',
     'get_tool_names', 
+    'get_registry_version',
     'get_tool',
     'register_tool',
     'unregister_tool',
     'list_available_tools',
     'get_tool_info',
     'execute_tool',
+    'aexecute_tool',
     'register_default_tools'
 ]
\ No newline at end of file
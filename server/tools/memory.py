@@ -4,13 +4,12 @@ from langchain.tools import BaseTool
 from langchain_core.runnables import RunnableConfig
 from pydantic import BaseModel, Field
 import numpy as np
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from core.database import get_psycopg_db_connection
+from core.embeddings import get_embedding_model, embed_text, RETRIEVAL_QUERY, RETRIEVAL_DOCUMENT
+from core.vector_store import get_vector_store, STORE_LIMIT_REACHED
 from utils.logger import logger
 from langgraph.runtime import get_runtime
 from dataclasses import dataclass
 import json
-from core.constants import GOOGLE_API_KEY
 
 class StoreMemoryInput(BaseModel):
     """Input schema for storing memory"""
@@ -40,13 +39,9 @@ class SemanticMemoryTools:
             db_connection: PostgreSQL connection with pgvector
         """
         
-        # Load embedding model (Google Generative AI)
-        logger.debug("Initializing Google Generative AI Embeddings...")
-        self.embedding_model = GoogleGenerativeAIEmbeddings(
-            model="models/text-embedding-004",
-            google_api_key=GOOGLE_API_KEY
-        )
-        logger.debug("embedding model loaded successfully!")
+        # The embedding client and its cache are shared process-wide
+        self.embedding_model = get_embedding_model()
+        self.vector_store = get_vector_store()
         
         
     def get_embedding(self, text: str, is_query: bool = False) -> List[float]:
@@ -58,12 +53,13 @@ class SemanticMemoryTools:
             is_query: If True, adds search_query prefix; else search_document prefix
         """
         try:
-            # Google Embeddings handles task type internally or via config, 
-            # but for simple usage we can just embed the text.
-            # text-embedding-004 is optimized for retrieval.
-            
-            embedding = self.embedding_model.embed_query(text)
-            return embedding
+            # Stored memories are documents, searches are queries. Repeated
+            # texts are served by the shared embedding cache and concurrent
+            # misses are batched into one API call.
+            embedding = embed_text(
+                text, task_type=RETRIEVAL_QUERY if is_query else RETRIEVAL_DOCUMENT
+            )
+            return embedding.tolist()
         except Exception as e:
             logger.debug(f"Error getting embedding: {e}")
             # Return zero vector of correct dimension (768 for text-embedding-004)
@@ -135,6 +131,7 @@ class SemanticMemoryTools:
         query = data["query"]
         top_k = data.get("top_k", 3)
         similarity_threshold = data.get("similarity_threshold", 0.6)
+        ef_search = data.get("ef_search")
         
         # Validate query is not empty
         if not str(query).strip():
@@ -156,12 +153,22 @@ class SemanticMemoryTools:
         except (ValueError, TypeError):
             return {}, "ERROR: similarity_threshold must be a valid number"
         
+        # Validate optional ef_search is positive integer
+        if ef_search is not None:
+            try:
+                ef_search = int(ef_search)
+                if ef_search <= 0:
+                    return {}, "ERROR: ef_search must be a positive integer"
+            except (ValueError, TypeError):
+                return {}, "ERROR: ef_search must be a valid integer"
+        
         logger.debug(f"RetrieveMemoryInput validated: query='{query}', top_k={top_k}, similarity_threshold={similarity_threshold}")
         
         return {
             "query": str(query).strip(),
             "top_k": top_k,
-            "similarity_threshold": similarity_threshold
+            "similarity_threshold": similarity_threshold,
+            "ef_search": ef_search
         }, ""
 
     def _validate_update_memory_input(self, input_data: dict) -> tuple[dict, str]:
@@ -251,58 +258,34 @@ class SemanticMemoryTools:
                 if error_msg:
                     return error_msg
                 
-                conn = get_psycopg_db_connection()
                 try:
                     embedding = memory_tools.get_embedding(
                         parsed_data["content"], is_query=False
                     )
 
+                    # Duplicate check, limit check and write in one step,
+                    # so near-identical facts update the existing memory
+                    outcome, memory = memory_tools.vector_store.store(
+                        user_id,
+                        parsed_data["content"],
+                        embedding,
+                        parsed_data["importance"],
+                    )
 
-                    # --- helper to count memories ---
-                    def get_memory_count(conn, uid: str) -> int:
-                        with conn.cursor() as cursor:
-                            cursor.execute(
-                                """SELECT COUNT(*) FROM semantic_memories WHERE user_id = %s""",
-                                (uid,)
-                            )
-                            return cursor.fetchall()[0]['count']
-
-                    memory_count = get_memory_count(conn, user_id)
-                    logger.debug(f"User {user_id} has {memory_count} stored memories.")
-
-                    if memory_count <= 10:
-                        # safe to insert
-                        with conn.cursor() as cursor:
-                            memory_id = str(uuid.uuid4())
-                            cursor.execute("""
-                                INSERT INTO semantic_memories (id, user_id, content, embedding, importance)
-                                VALUES (%s, %s, %s, %s, %s)
-                                RETURNING id
-                            """, (
-                                memory_id,
-                                user_id,
-                                parsed_data["content"],
-                                embedding,
-                                parsed_data["importance"]
-                            ))
-                            memory_id = cursor.fetchone()['id']
-                            conn.commit()
-
-                        logger.debug(f"Stored memory {memory_id} for user {user_id}")
+                    if outcome == STORE_LIMIT_REACHED:
                         return (
-                            "Saved Semantic Info. Continue the conversation in a natural way "
-                            "without letting the user know that you saved anything."
+                            "⚠️ Memory limit reached: The system has already stored the maximum number of memories. "
+                            "Continue the conversation in a natural way without letting the user know."
                         )
 
-                    # if limit exceeded
+                    logger.debug(f"Stored memory {memory['id']} for user {user_id} ({outcome})")
                     return (
-                        "⚠️ Memory limit reached: The system has already stored the maximum number of memories. "
-                        "Continue the conversation in a natural way without letting the user know."
+                        "Saved Semantic Info. Continue the conversation in a natural way "
+                        "without letting the user know that you saved anything."
                     )
 
                 except Exception as e:
                     logger.debug(f"Error storing memory: {repr(e)}")
-                    conn.rollback()
                     return f"Error storing memory: {str(e)}"
         
         return StoreMemoryTool()
@@ -345,31 +328,15 @@ class SemanticMemoryTools:
                 try:
                     query_embedding = memory_tools.get_embedding(parsed_data["query"], is_query=True)
 
-                    conn = get_psycopg_db_connection()
-
+                    results = memory_tools.vector_store.search(
+                        user_id,
+                        query_embedding,
+                        top_k=parsed_data["top_k"],
+                        similarity_threshold=parsed_data["similarity_threshold"],
+                        ef_search=parsed_data["ef_search"],
+                    )
                     
-                    with conn.cursor() as cursor:
-                        pg_vector = f"[{','.join(str(x) for x in query_embedding)}]"
-                        logger.debug(pg_vector)
-
-
-                        cursor.execute("""
-                            SELECT 
-                                id,
-                                content,
-                                importance,
-                                created_at,
-                                1 - (embedding <=> %s::vector) as similarity
-                            FROM semantic_memories
-                            WHERE user_id = %s
-                            AND 1 - (embedding <=> %s::vector) > %s
-                            ORDER BY similarity DESC
-                            LIMIT %s
-                        """, (query_embedding, user_id, query_embedding, parsed_data["similarity_threshold"], parsed_data["top_k"]))
-                        
-                        results = cursor.fetchall()
-                        
-                        logger.debug(results)
+                    logger.debug(results)
                     
                     if not results:
                         logger.debug(f"No relevant memories found for query: {parsed_data['query']}")
@@ -385,7 +352,6 @@ class SemanticMemoryTools:
                     
                 except Exception as e:
                     logger.debug(f"Error retrieving memories: {str(e)} {(e)}")
-                    conn.rollback()
                     return f"Error retrieving memories: {str(e)}"
         
         return RetrieveMemoryTool()
@@ -410,25 +376,17 @@ class SemanticMemoryTools:
             args_schema: type[BaseModel] = UpdateMemoryInput
             
             def _run(self, memory_id: int, new_content: str, user_id: str) -> str:
-                conn = get_psycopg_db_connection()
                 try:
                     new_embedding = memory_tools.get_embedding(new_content, is_query=False)
                     
-                    with conn.cursor() as cursor:
-                        cursor.execute("""
-                            UPDATE semantic_memories 
-                            SET content = %s, embedding = %s, created_at = NOW()
-                            WHERE id = %s AND user_id = %s
-                            RETURNING id
-                        """, (new_content, new_embedding, memory_id, user_id))
-                        
-                        result = cursor.fetchone()
-                        conn.commit()
-                        
-                        if result:
-                            return f"Memory {memory_id} updated successfully with new content: '{new_content[:100]}...'"
-                        else:
-                            return f"Memory {memory_id} not found or access denied"
+                    result = memory_tools.vector_store.update(
+                        user_id, memory_id, new_content, new_embedding
+                    )
+                    
+                    if result:
+                        return f"Memory {memory_id} updated successfully with new content: '{new_content[:100]}...'"
+                    else:
+                        return f"Memory {memory_id} not found or access denied"
                     
                 except Exception as e:
                     return f"Error updating memory: {str(e)}"
@@ -10,6 +10,7 @@ from .web_search import web_search
 from .date_time import get_date_and_time
 from .city_weather import get_weather
 from .memory import create_memory_tools
+from core import constants
 
 
 class ToolRegistry:
@@ -19,12 +20,17 @@ class ToolRegistry:
         """Initialize the tool registry."""
         self._tools = {}
         self._tool_descriptions = {}
+        # Bumped whenever the tool set changes so cached LLM bindings rebuild
+        self._version = 0
     
     def register_default_tools(self):
         """Register the default set of tools."""
 
         memory_tools = create_memory_tools()
         for tool in memory_tools:
+            # Memories are extracted after each turn in background mode
+            if tool.name == "store_memory" and constants.MEMORY_WRITE_MODE == "background":
+                continue
             self.register_tool(tool, tool.description)
 
         # self.get_tool("store_memory").invoke('{"content": "User name is Yahya", "importance": "medium"}')
@@ -42,6 +48,8 @@ class ToolRegistry:
             description: Optional description of the tool's purpose
         """
         tool_name = tool.name
+        if self._tools.get(tool_name) is not tool:
+            self._version += 1
         self._tools[tool_name] = tool
         
         if description:
@@ -60,6 +68,7 @@ class ToolRegistry:
         """
         if tool_name in self._tools:
             del self._tools[tool_name]
+            self._version += 1
             if tool_name in self._tool_descriptions:
                 del self._tool_descriptions[tool_name]
     
@@ -128,6 +137,11 @@ class ToolRegistry:
         
         return "\n".join(tool_list)
     
+    @property
+    def version(self) -> int:
+        """Monotonic counter identifying the current tool set."""
+        return self._version
+
     def tool_exists(self, tool_name: str) -> bool:
         """
         Check if a tool exists in the registry.
@@ -156,6 +170,11 @@ def get_all_tools() -> List[BaseTool]:
     return _tool_registry.get_all_tools()
 
 
+def get_registry_version() -> int:
+    """Get the version of the current tool set."""
+    return _tool_registry.version
+
+
 def get_tool_names() -> List[str]:
     """Get names of all registered tools."""
     return _tool_registry.get_tool_names()
@@ -202,3 +221,22 @@ def execute_tool(tool_name: str, tool_args: Dict[str, Any]) -> Any:
         raise ValueError(f"Tool '{tool_name}' not found in registry.")
     
     return tool.invoke(tool_args)
+
+
+async def aexecute_tool(tool_name: str, tool_args: Dict[str, Any]) -> Any:
+    """
+    Async counterpart of execute_tool.
+    
+    Args:
+        tool_name: Name of the tool to execute
+        tool_args: Arguments to pass to the tool
+        
+    Returns:
+        The output from the executed tool
+    """
+    tool = _tool_registry.get_tool(tool_name)
+    
+    if not tool:
+        raise ValueError(f"Tool '{tool_name}' not found in registry.")
+    
+    return await tool.ainvoke(tool_args)
@@ -6,6 +6,14 @@ Exposes utility functions for database, conversation, and streaming operations.
 # Streaming utilities
 from .streaming import (
     stream_response,
+    astream_response,
+    replay_response,
+    stream_tool_calling_response,
+    astream_tool_calling_response,
+)
+
+from .react_parser import (
+    ReActStreamParser,
 )
 
 from .logger import (
@@ -15,5 +23,10 @@ from .logger import (
 __all__ = [    
     # Streaming
     "stream_response",
+    "astream_response",
+    "replay_response",
+    "stream_tool_calling_response",
+    "astream_tool_calling_response",
+    "ReActStreamParser",
     "logger"
 ]
\ No newline at end of file
@@ -0,0 +1,245 @@
+"""
+Incremental parser for ReAct formatted LLM output.
+Classifies a token stream into thought, action, action-input and
+final-answer segments in a single linear pass.
+"""
+
+from typing import List, Optional
+
+THOUGHT = "thought"
+ACTION = "action"
+ACTION_INPUT = "action_input"
+OBSERVATION = "observation"
+FINAL_ANSWER = "final_answer"
+
+# Ordered so that a longer marker wins when two could start at the same index
+_MARKERS = (
+    ("Final Answer:", FINAL_ANSWER),
+    ("Action Input:", ACTION_INPUT),
+    ("Action:", ACTION),
+    ("Observation:", OBSERVATION),
+    ("Thought:", THOUGHT),
+)
+_MAX_MARKER_LEN = max(len(marker) for marker, _ in _MARKERS)
+
+# Characters held back at the end of the final answer until more text
+# arrives, so a closing ``` fence can be dropped without un-sending it
+_ANSWER_TAIL_CHARS = "` \t\r\n"
+
+
+class ReActStreamParser:
+    """
+    Streaming state machine over ReAct text.
+
+    feed() accepts chunks as they arrive and returns the final-answer text
+    that is safe to forward to the client. Markers split across chunk
+    boundaries are held back until they can be classified, so every
+    character is inspected a constant number of times.
+
+    Parsing stops at the first "Observation:" marker: anything after it is
+    the model hallucinating a tool result and is discarded.
+    """
+
+    def __init__(self):
+        self._segments: List[list] = [[THOUGHT, []]]
+        self._pending = ""
+        self._answer_started = False
+        self._answer_tail = ""
+        self._stopped = False
+        self._closed = False
+
+    @classmethod
+    def parse(cls, content: str) -> "ReActStreamParser":
+        """Parse a complete response in one pass."""
+        parser = cls()
+        parser.feed(content)
+        parser.close()
+        return parser
+
+    @property
+    def segment(self) -> str:
+        """Kind of the segment currently being read."""
+        return self._segments[-1][0]
+
+    def feed(self, text: str) -> str:
+        """
+        Consume the next chunk of model output.
+
+        Args:
+            text: Newly streamed text
+
+        Returns:
+            str: Final-answer text that can be emitted now (may be empty)
+        """
+        if not text or self._stopped:
+            return ""
+        if self.segment == FINAL_ANSWER:
+            return self._feed_answer(text)
+
+        buffer = self._pending + text
+        self._pending = ""
+        position = 0
+        next_index = {marker: buffer.find(marker) for marker, _ in _MARKERS}
+
+        while True:
+            found_marker, found_kind, found_index = None, None, -1
+            for marker, kind in _MARKERS:
+                index = next_index[marker]
+                if index != -1 and index < position:
+                    index = buffer.find(marker, position)
+                    next_index[marker] = index
+                if index != -1 and (found_index == -1 or index < found_index):
+                    found_marker, found_kind, found_index = marker, kind, index
+            if found_marker is None:
+                break
+
+            self._append(buffer[position:found_index])
+            position = found_index + len(found_marker)
+
+            # An answer written after a tool request was never grounded in
+            # the tool's result, so it is discarded like an Observation
+            if found_kind == OBSERVATION or (
+                found_kind == FINAL_ANSWER and self._has_segment(ACTION_INPUT)
+            ):
+                self._stopped = True
+                return ""
+            self._segments.append([found_kind, []])
+            if found_kind == FINAL_ANSWER:
+                return self._feed_answer(buffer[position:])
+
+        keep = self._partial_marker_length(buffer, position)
+        self._append(buffer[position:len(buffer) - keep])
+        self._pending = buffer[len(buffer) - keep:]
+        return ""
+
+    def close(self) -> str:
+        """
+        Flush any held-back text once the stream has ended.
+
+        Returns:
+            str: Remaining final-answer text to emit (may be empty)
+        """
+        if self._closed:
+            return ""
+        self._closed = True
+
+        if self.segment == FINAL_ANSWER:
+            tail = self._answer_tail.rstrip()
+            if tail.endswith("```"):
+                tail = tail[:-3].rstrip()
+            self._answer_tail = ""
+            self._append(tail)
+            return tail
+
+        self._append(self._pending)
+        self._pending = ""
+
+        # The model ignored the ReAct format entirely: treat its text as the answer
+        if not self.has_final_answer and self.action_info is None:
+            answer = self._joined(THOUGHT).strip()
+            self._segments = [[FINAL_ANSWER, [answer]]]
+            return answer
+        return ""
+
+    @property
+    def has_final_answer(self) -> bool:
+        return self._has_segment(FINAL_ANSWER)
+
+    @property
+    def final_answer(self) -> str:
+        """Final answer text seen so far."""
+        return self._joined(FINAL_ANSWER)
+
+    @property
+    def text(self) -> str:
+        """The ReAct text up to (not including) any hallucinated Observation."""
+        parts = []
+        for kind, chunks in self._segments:
+            if kind == THOUGHT and not parts:
+                parts.append("".join(chunks))
+            else:
+                parts.append(_marker_for(kind) + "".join(chunks))
+        return "".join(parts).strip()
+
+    @property
+    def actions(self) -> List[dict]:
+        """
+        Every Action / Action Input pair, in the order the model wrote them.
+
+        Returns:
+            List[dict]: [{"action": ..., "action_input": ...}, ...]
+        """
+        actions = []
+        action = None
+        for kind, chunks in self._segments:
+            if kind == ACTION:
+                action = _first_line("".join(chunks))
+            elif kind == ACTION_INPUT and action:
+                action_input = _clean_action_input("".join(chunks))
+                if action_input:
+                    actions.append({"action": action, "action_input": action_input})
+                action = None
+        return actions
+
+    @property
+    def action_info(self) -> Optional[dict]:
+        """
+        The first Action / Action Input pair, if the model requested a tool.
+
+        Returns:
+            dict: {"action": ..., "action_input": ...} or None
+        """
+        actions = self.actions
+        return actions[0] if actions else None
+
+    def _feed_answer(self, text: str) -> str:
+        if not self._answer_started:
+            text = text.lstrip()
+            if not text:
+                return ""
+            self._answer_started = True
+        text = self._answer_tail + text
+        body = text.rstrip(_ANSWER_TAIL_CHARS)
+        self._answer_tail = text[len(body):]
+        self._append(body)
+        return body
+
+    def _append(self, text: str) -> None:
+        if text:
+            self._segments[-1][1].append(text)
+
+    def _has_segment(self, segment_kind: str) -> bool:
+        return any(kind == segment_kind for kind, _ in self._segments)
+
+    def _joined(self, segment_kind: str) -> str:
+        return "".join(
+            "".join(chunks) for kind, chunks in self._segments if kind == segment_kind
+        )
+
+    @staticmethod
+    def _partial_marker_length(buffer: str, start: int) -> int:
+        """Length of the longest buffer suffix that could begin a marker."""
+        longest = min(_MAX_MARKER_LEN - 1, len(buffer) - start)
+        for length in range(longest, 0, -1):
+            suffix = buffer[-length:]
+            if any(marker.startswith(suffix) for marker, _ in _MARKERS):
+                return length
+        return 0
+
+
+def _marker_for(segment_kind: str) -> str:
+    for marker, kind in _MARKERS:
+        if kind == segment_kind:
+            return marker
+    return ""
+
+
+def _first_line(text: str) -> str:
+    return text.strip().split("\n", 1)[0].strip()
+
+
+def _clean_action_input(text: str) -> str:
+    text = text.strip()
+    if text.endswith("```"):
+        text = text[:-3].rstrip()
+    return text
@@ -3,40 +3,124 @@ Streaming utilities for real-time response display.
 Handles different types of streaming output for better user experience.
 """
 
-from typing import Any
+from typing import Any, Callable, Optional
 from langchain.schema import BaseMessage, PromptValue, AIMessage
 from langchain.schema.runnable import Runnable
+from langchain_core.messages import AIMessageChunk
+from langchain_core.messages.ai import add_ai_message_chunks, add_usage
 from typing import Sequence, Any
-from utils.response_extractor import extract_final_answer
+from utils.react_parser import ReActStreamParser
 
+TokenCallback = Callable[[str], None]
 
-def stream_response(llm_with_tools:Runnable[PromptValue | str | Sequence[BaseMessage | list[str] | tuple[str, str] | str | dict[str, Any]], BaseMessage], formatted_prompt) -> None:
-    found_final_answer = False
-    buffer = ""
-    streamed_content = ""
+
+def _emit(on_token: Optional[TokenCallback], text: str) -> None:
+    if text and on_token:
+        on_token(text)
+
+
+def _to_message(parser: ReActStreamParser, usage=None) -> AIMessage:
+    """Build the AIMessage stored in state from a finished parse."""
+    content = parser.final_answer if parser.has_final_answer else parser.text
+    return AIMessage(content=content, name="agent", usage_metadata=usage)
+
+
+def _merge_tool_calling_chunks(chunks: list[AIMessageChunk]) -> AIMessage:
+    """Merge streamed chunks once at the end, assembling structured tool_calls."""
+    if not chunks:
+        return AIMessage(content="", name="agent")
+    merged = add_ai_message_chunks(chunks[0], *chunks[1:]) if len(chunks) > 1 else chunks[0]
+    return AIMessage(
+        content=merged.content,
+        tool_calls=merged.tool_calls,
+        invalid_tool_calls=merged.invalid_tool_calls,
+        usage_metadata=merged.usage_metadata,
+        name="agent",
+    )
+
+
+def stream_response(llm_with_tools:Runnable[PromptValue | str | Sequence[BaseMessage | list[str] | tuple[str, str] | str | dict[str, Any]], BaseMessage], formatted_prompt, on_token: Optional[TokenCallback] = None, record: Optional[list] = None) -> tuple[AIMessage, ReActStreamParser]:
+    """
+    Stream a ReAct completion, forwarding only Final Answer tokens.
+
+    Args:
+        llm_with_tools: Chat model to stream from
+        formatted_prompt: Prompt value sent to the model
+        on_token: Called with each piece of final-answer text as it arrives
+        record: If given, every content chunk is appended to it so the
+            completion can be cached and replayed with replay_response
+
+    Returns:
+        tuple: (AIMessage for the graph state, parser holding the segments)
+    """
+    parser = ReActStreamParser()
+    usage = None
     for chunk in llm_with_tools.stream(formatted_prompt):
         if chunk.content:
-            # print(chunk.content, end='', flush=True)
-            streamed_content += chunk.content
-            buffer += chunk.content
-            # Check if we've hit "Final Answer:" and haven't started streaming yet
-            if not found_final_answer and "Final Answer:" in buffer:
-                found_final_answer = True
-                # Find the position after "Final Answer:"
-                final_answer_pos = buffer.find("Final Answer:") + len("Final Answer:")
-                # Get content after "Final Answer:" and stream it
-                after_final_answer = buffer[final_answer_pos:].strip()
-                if after_final_answer:
-                    print(after_final_answer, end='', flush=True)
-                    # ai_message = AIMessage(content=after_final_answer)
-            
-            # If we're already streaming, display new tokens
-            elif found_final_answer:
-                print(chunk.content, end='', flush=True)
-
-    if found_final_answer:
-        clean_answer = extract_final_answer(streamed_content)
-        ai_message = AIMessage(content=clean_answer, name="agent")
-        return ai_message
-    else:
-        return AIMessage(content=streamed_content, name="agent")
+            if record is not None:
+                record.append(chunk.content)
+            _emit(on_token, parser.feed(chunk.content))
+        if getattr(chunk, "usage_metadata", None):
+            usage = add_usage(usage, chunk.usage_metadata)
+    _emit(on_token, parser.close())
+    return _to_message(parser, usage), parser
+
+
+async def astream_response(llm_with_tools:Runnable[PromptValue | str | Sequence[BaseMessage | list[str] | tuple[str, str] | str | dict[str, Any]], BaseMessage], formatted_prompt, on_token: Optional[TokenCallback] = None, record: Optional[list] = None) -> tuple[AIMessage, ReActStreamParser]:
+    """Async counterpart of stream_response, consumes llm.astream on the event loop."""
+    parser = ReActStreamParser()
+    usage = None
+    async for chunk in llm_with_tools.astream(formatted_prompt):
+        if chunk.content:
+            if record is not None:
+                record.append(chunk.content)
+            _emit(on_token, parser.feed(chunk.content))
+        if getattr(chunk, "usage_metadata", None):
+            usage = add_usage(usage, chunk.usage_metadata)
+    _emit(on_token, parser.close())
+    return _to_message(parser, usage), parser
+
+
+def replay_response(chunks: list[str], on_token: Optional[TokenCallback] = None) -> tuple[AIMessage, ReActStreamParser]:
+    """
+    Replay a cached ReAct completion chunk by chunk.
+
+    The chunks go through the same parser as a live stream, so the client
+    receives the same Final Answer tokens and the graph the same actions.
+
+    Returns:
+        tuple: (AIMessage for the graph state, parser holding the segments)
+    """
+    parser = ReActStreamParser()
+    for content in chunks:
+        _emit(on_token, parser.feed(content))
+    _emit(on_token, parser.close())
+    return _to_message(parser), parser
+
+
+def stream_tool_calling_response(llm_with_tools:Runnable[PromptValue | str | Sequence[BaseMessage | list[str] | tuple[str, str] | str | dict[str, Any]], BaseMessage], formatted_prompt, on_token: Optional[TokenCallback] = None) -> AIMessage:
+    """
+    Stream a native function-calling completion.
+
+    Text content is forwarded as-is (there is no ReAct markup to strip);
+    tool-call chunks are collected and merged into structured tool_calls.
+
+    Returns:
+        AIMessage: The complete response, including any tool_calls
+    """
+    chunks = []
+    for chunk in llm_with_tools.stream(formatted_prompt):
+        chunks.append(chunk)
+        if isinstance(chunk.content, str):
+            _emit(on_token, chunk.content)
+    return _merge_tool_calling_chunks(chunks)
+
+
+async def astream_tool_calling_response(llm_with_tools:Runnable[PromptValue | str | Sequence[BaseMessage | list[str] | tuple[str, str] | str | dict[str, Any]], BaseMessage], formatted_prompt, on_token: Optional[TokenCallback] = None) -> AIMessage:
+    """Async counterpart of stream_tool_calling_response."""
+    chunks = []
+    async for chunk in llm_with_tools.astream(formatted_prompt):
+        chunks.append(chunk)
+        if isinstance(chunk.content, str):
+            _emit(on_token, chunk.content)
+    return _merge_tool_calling_chunks(chunks)